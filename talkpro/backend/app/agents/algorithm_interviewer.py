@@ -1,6 +1,11 @@
 import json
 import uuid
 from app.services.claude import ClaudeService
+from app.services.question_bank import question_bank
+from app.services.question_calibration import question_calibration, ADAPTIVE
+from app.services.judge import judge, Verdict
+from app.services.complexity import complexity_profiler, ComplexityProfile
+from app.services.code_versions import code_versions, CodeSubmission
 from app.models.session import InterviewSession, SessionType, SessionStatus
 
 
@@ -24,68 +29,72 @@ Evaluation criteria:
 - Complexity analysis
 - Edge case consideration
 
+Only the latest version of the candidate's code is shown, with a summary of
+what changed since their previous submission.
+Submitted code has already been run against the test cases by a judge; its
+verdict follows the code. Trust the verdict for correctness instead of tracing
+the code by hand, and point the candidate at the failing case when there is one.
+For a failing hidden test only its number and status are given; ask which edge
+case it might cover instead of guessing its input.
+For accepted code a profiler line reports the measured time and extra-space
+growth; when it does not match the complexity the candidate claimed, challenge
+the claim.
+
 Keep your responses concise and focused. Ask one follow-up question at a time."""
 
-    def __init__(self):
-        self.claude = ClaudeService()
-        self.questions = self._load_questions()
+    def __init__(self, claude: ClaudeService | None = None):
+        self.claude = claude or ClaudeService()
+        self.bank = question_bank
 
-    def _load_questions(self):
-        """Load questions from JSON file"""
-        try:
-            with open("data/questions.json", "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading questions: {e}")
-            return []
+    @property
+    def questions(self) -> list[dict]:
+        """Raw question data (shared question bank)"""
+        return [q.data for q in self.bank.all()]
 
     async def start_interview(
-        self, difficulty: str
+        self,
+        difficulty: str,
+        exclude_ids: set[str] | None = None,
+        ability: float | None = None,
     ) -> tuple[InterviewSession, str]:
         """
         Start an algorithm interview.
 
         Args:
-            difficulty: easy, medium, or hard
+            difficulty: easy, medium, hard, or adaptive (any difficulty)
+            exclude_ids: Question IDs to avoid (e.g. already answered by the user)
+            ability: Calibrated user ability; picks the question closest to it
 
         Returns:
             (session, question_text)
         """
-        # Filter questions by difficulty
-        filtered_questions = [
-            q for q in self.questions if q["difficulty"] == difficulty.lower()
-        ]
-
-        if not filtered_questions:
+        question = None
+        if ability is not None:
+            question = question_calibration.select(difficulty, ability, exclude_ids=exclude_ids)
+        if question is None:
+            if difficulty.lower() == ADAPTIVE:
+                difficulty = "medium"
+            question = self.bank.select(difficulty, exclude_ids=exclude_ids)
+        if question is None:
             raise ValueError(f"No questions found for difficulty: {difficulty}")
 
-        # Select a question (randomly for now, can be smarter later)
-        import random
-        question = random.choice(filtered_questions)
-
         # Create session
         session = InterviewSession(
             id=str(uuid.uuid4()),
             type=SessionType.ALGORITHM,
-            question_id=question["id"],
-            messages=[
-                {
-                    "role": "assistant",
-                    "content": f"## {question['title']}\n\n{question['content']}\n\n### 示例:\n" +
-                               "\n".join([
-                                   f"- 输入: {ex['input']}\n  输出: {ex['output']}" +
-                                   (f"\n  说明: {ex.get('explanation', '')}" if ex.get('explanation') else "")
-                                   for ex in question.get("examples", [])
-                               ])
-                }
-            ],
+            question_id=question.id,
+            messages=[{"role": "assistant", "content": question.opening}],
             status=SessionStatus.IN_PROGRESS,
         )
 
         return session, session.messages[0]["content"]
 
     async def process_answer(
-        self, session: InterviewSession, user_input: str, code: str = None
+        self,
+        session: InterviewSession,
+        user_input: str,
+        code: str = None,
+        submission: CodeSubmission | None = None,
     ) -> tuple[str, bool]:
         """
         Process user's answer and generate follow-up question.
@@ -93,25 +102,22 @@ Keep your responses concise and focused. Ask one follow-up question at a time.""
         Args:
             session: Current interview session
             user_input: User's text response
-            code: Optional code submission
+            code: Optional full code submission
+            submission: Code already stored via submit_code (takes precedence over code)
 
         Returns:
             (ai_response, is_complete)
         """
-        # Build conversation history
-        messages = [{"role": "system", "content": self.SYSTEM_PROMPT}]
-        messages.extend(session.messages)
-
-        # Add user's answer
-        user_message = f"Answer: {user_input}"
-        if code:
-            user_message += f"\n\nCode:\n```\n{code}\n```"
-        messages.append({"role": "user", "content": user_message})
+        if submission is None and code:
+            submission = await self.submit_code(session, code=code)
+        code = submission.code if submission else None
+        verdict = await self.judge_code(session, code) if code else None
+        profile = await self.profile_code(session, code, user_input, verdict)
 
         # Get Claude's response
         full_response = ""
         async for chunk in self.claude.send_message_stream(
-            "\n".join([m["content"] for m in messages])
+            self._build_conversation(session, user_input, submission, verdict, profile)
         ):
             full_response += chunk
 
@@ -119,13 +125,86 @@ Keep your responses concise and focused. Ask one follow-up question at a time.""
         is_complete = "INTERVIEW_COMPLETE" in full_response
 
         # Update session messages
-        session.messages.append({"role": "user", "content": user_input})
+        session.messages.append(self.user_turn(user_input, profile, submission))
         session.messages.append({"role": "assistant", "content": full_response})
 
         return full_response, is_complete
 
+    async def submit_code(
+        self,
+        session: InterviewSession,
+        code: str | None = None,
+        diff: str | None = None,
+        base_version: int | None = None,
+    ) -> CodeSubmission:
+        """
+        Store a code submission, given in full or as a unified diff against
+        base_version.
+
+        Raises:
+            CodeConflictError: The diff does not apply to the latest version;
+                the client should resend the full code
+        """
+        return await code_versions.submit(session.id, code=code, diff=diff, base_version=base_version)
+
+    async def judge_code(self, session: InterviewSession, code: str) -> Verdict | None:
+        """
+        Run a code submission against the question's test cases.
+
+        Returns:
+            The verdict, or None if the question has no judge configuration
+        """
+        if not judge.supports(session.question_id):
+            return None
+        try:
+            return await judge.judge(session.question_id, code)
+        except Exception as e:
+            print(f"Error judging submission: {e}")
+            return None
+
+    async def profile_code(
+        self,
+        session: InterviewSession,
+        code: str | None,
+        user_input: str,
+        verdict: Verdict | None,
+    ) -> ComplexityProfile | None:
+        """
+        Measure the empirical complexity of accepted code and compare it with
+        the complexity claimed in the answer.
+
+        Returns:
+            The profile, or None if the code was not accepted or cannot be profiled
+        """
+        if not code or verdict is None or verdict.status != "accepted":
+            return None
+        try:
+            return await complexity_profiler.profile(session.question_id, code, user_input)
+        except Exception as e:
+            print(f"Error profiling submission: {e}")
+            return None
+
+    @staticmethod
+    def user_turn(
+        user_input: str,
+        profile: ComplexityProfile | None = None,
+        submission: CodeSubmission | None = None,
+    ) -> dict:
+        """Session message for a candidate turn, with the code version and complexity estimate attached"""
+        message = {"role": "user", "content": user_input}
+        if submission:
+            message["code_version"] = submission.version
+        if profile:
+            message["complexity"] = profile.to_dict()
+        return message
+
     def _build_conversation(
-        self, session: InterviewSession, user_input: str, code: str = None
+        self,
+        session: InterviewSession,
+        user_input: str,
+        submission: CodeSubmission | None = None,
+        verdict: Verdict | None = None,
+        profile: ComplexityProfile | None = None,
     ) -> str:
         """
         Build conversation for streaming.
@@ -133,7 +212,9 @@ Keep your responses concise and focused. Ask one follow-up question at a time.""
         Args:
             session: Current interview session
             user_input: User's text response
-            code: Optional code submission
+            submission: Latest code version, if code was submitted this turn
+            verdict: Judge verdict for the code, if it was run
+            profile: Empirical complexity of the code, if it was measured
 
         Returns:
             Conversation as string
@@ -143,8 +224,21 @@ Keep your responses concise and focused. Ask one follow-up question at a time.""
 
         # Add user's answer
         user_message = f"Answer: {user_input}"
-        if code:
-            user_message += f"\n\nCode:\n```\n{code}\n```"
+        if submission:
+            if submission.previous_version is None:
+                header = f"Code (version {submission.version})"
+            elif not submission.changed:
+                header = f"Code (version {submission.version}, unchanged)"
+            else:
+                header = (
+                    f"Code (version {submission.version}; changes since "
+                    f"version {submission.previous_version}: {submission.summary})"
+                )
+            user_message += f"\n\n{header}:\n```\n{submission.code}\n```"
+        if verdict:
+            user_message += f"\n\n{verdict.summary()}"
+        if profile:
+            user_message += f"\n{profile.summary()}"
         messages.append({"role": "user", "content": user_message})
 
         return "\n".join([m["content"] for m in messages])
@@ -162,13 +256,18 @@ Keep your responses concise and focused. Ask one follow-up question at a time.""
             Dictionary with scores and feedback
         """
         # Build evaluation prompt
+        final_code = ""
+        latest = await code_versions.latest(session.id)
+        if latest:
+            final_code = f"\nFinal code (version {latest[0]}):\n```\n{latest[1]}\n```\n"
+
         evaluation_prompt = f"""Evaluate the following interview performance and provide a JSON response:
 
 Question: {session.messages[0]['content']}
 
 Conversation:
 {json.dumps(session.messages[1:], ensure_ascii=False, indent=2)}
-
+{final_code}
 Provide evaluation in this exact JSON format:
 {{
   "algorithm": <0-10 score for algorithm correctness>,
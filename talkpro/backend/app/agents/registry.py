@@ -0,0 +1,142 @@
+import asyncio
+import inspect
+import threading
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional, Union
+
+if TYPE_CHECKING:
+    from app.agents.algorithm_interviewer import AlgorithmInterviewer
+    from app.agents.system_design_agent import SystemDesignAgent
+    from app.agents.workplace_agent import WorkplaceAgent
+    from app.services.claude import ClaudeService
+    from app.services.resume_parser import ResumeParser
+
+Hook = Callable[[Any], Union[None, Awaitable[None]]]
+
+
+class AgentRegistry:
+    """Process-wide agents, constructed on first use
+
+    Agents load data files and create an API client when constructed, so
+    they are built lazily and shared by every router and websocket handler
+    instead of one copy per module. warm_up() constructs them ahead of the
+    first request and runs their warm-up hooks; shutdown() runs the shutdown
+    hooks of the agents that were actually constructed.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._warm_up_hooks: Dict[str, Hook] = {}
+        self._shutdown_hooks: Dict[str, Hook] = {}
+        self._instances: Dict[str, Any] = {}
+        # One lock per agent, so agents can be constructed in parallel and a
+        # factory can get() the agents it depends on
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        warm_up: Optional[Hook] = None,
+        shutdown: Optional[Hook] = None,
+    ) -> None:
+        self._factories[name] = factory
+        if warm_up:
+            self._warm_up_hooks[name] = warm_up
+        if shutdown:
+            self._shutdown_hooks[name] = shutdown
+
+    def get(self, name: str) -> Any:
+        """The shared instance, constructed on first call"""
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._guard:
+                lock = self._locks.setdefault(name, threading.Lock())
+            with lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = self._instances[name] = self._factories[name]()
+        return instance
+
+    def constructed(self, name: str) -> bool:
+        return name in self._instances
+
+    async def warm_up(self, *names: str) -> None:
+        """Construct the named agents (all when none given) and run their warm-up hooks
+
+        Construction loads data files and imports client libraries, so it
+        runs in worker threads, all agents at once.
+        """
+        async def warm_up_one(name: str) -> None:
+            instance = await asyncio.to_thread(self.get, name)
+            await _call(self._warm_up_hooks.get(name), instance)
+
+        await asyncio.gather(*(warm_up_one(name) for name in names or list(self._factories)))
+
+    async def shutdown(self) -> None:
+        for name, hook in self._shutdown_hooks.items():
+            if name in self._instances:
+                await _call(hook, self._instances[name])
+
+
+async def _call(hook: Optional[Hook], instance: Any) -> None:
+    if hook is None:
+        return
+    result = hook(instance)
+    if inspect.isawaitable(result):
+        await result
+
+
+def _claude() -> "ClaudeService":
+    from app.services.claude import ClaudeService
+    return ClaudeService()
+
+
+def _algorithm() -> "AlgorithmInterviewer":
+    from app.agents.algorithm_interviewer import AlgorithmInterviewer
+    return AlgorithmInterviewer(claude=agents.get("claude"))
+
+
+def _system_design() -> "SystemDesignAgent":
+    from app.agents.system_design_agent import SystemDesignAgent
+    return SystemDesignAgent(claude=agents.get("claude"))
+
+
+def _workplace() -> "WorkplaceAgent":
+    from app.agents.workplace_agent import WorkplaceAgent
+    return WorkplaceAgent(claude=agents.get("claude"))
+
+
+def _resume_parser() -> "ResumeParser":
+    from app.services.resume_parser import ResumeParser
+    return ResumeParser(claude=agents.get("claude"))
+
+
+agents = AgentRegistry()
+agents.register("claude", _claude, warm_up=lambda claude: asyncio.to_thread(claude.warm_up))
+agents.register("algorithm", _algorithm)
+agents.register("system_design", _system_design)
+agents.register(
+    "workplace",
+    _workplace,
+    warm_up=lambda agent: agent.warm_up(),
+    shutdown=lambda agent: agent.openers.stop(),
+)
+agents.register("resume_parser", _resume_parser)
+
+
+# FastAPI dependencies: `agent: AlgorithmInterviewer = Depends(get_algorithm_agent)`
+def get_algorithm_agent() -> "AlgorithmInterviewer":
+    return agents.get("algorithm")
+
+
+def get_system_design_agent() -> "SystemDesignAgent":
+    return agents.get("system_design")
+
+
+def get_workplace_agent() -> "WorkplaceAgent":
+    return agents.get("workplace")
+
+
+def get_resume_parser() -> "ResumeParser":
+    return agents.get("resume_parser")
@@ -0,0 +1,148 @@
+import re
+from typing import Dict, Optional, Tuple
+
+from app.core.text_matcher import MultiPatternMatcher
+
+STAGES = ("requirements", "architecture", "deep_dive", "summary")
+
+# Keyword weights per stage; longer phrases win over their substrings (高可用 over 可用)
+STAGE_KEYWORDS: Dict[str, Dict[str, float]] = {
+    "requirements": {
+        "需求": 2.0, "QPS": 2.0, "TPS": 2.0, "DAU": 2.0, "数据量": 2.0, "用户量": 1.5,
+        "读写比": 2.0, "峰值": 1.0, "约束": 1.5, "功能": 1.0, "非功能": 1.5, "估算": 1.5,
+        "假设": 1.0, "范围": 1.0,
+    },
+    "architecture": {
+        "架构": 2.0, "组件": 1.5, "模块": 1.5, "服务": 1.0, "微服务": 1.5, "接口": 1.5,
+        "API": 1.5, "数据库": 1.0, "存储": 1.0, "缓存": 1.0, "消息队列": 1.5, "负载均衡": 1.5,
+        "网关": 1.5, "表结构": 1.5, "数据模型": 1.5, "流程": 1.0, "设计": 0.5,
+    },
+    "deep_dive": {
+        "扩展": 1.5, "水平扩展": 2.0, "分片": 2.0, "分库分表": 2.0, "容错": 2.0, "一致性": 2.0,
+        "可用": 1.5, "高可用": 2.0, "单点": 2.0, "故障": 1.5, "降级": 2.0, "限流": 2.0,
+        "熔断": 2.0, "容灾": 2.0, "副本": 1.5, "瓶颈": 1.5, "热点": 2.0, "CAP": 2.0,
+    },
+    "summary": {
+        "总结": 3.0, "回顾": 2.5, "整体来看": 2.5, "权衡": 1.0, "trade-off": 1.5, "改进": 1.0,
+    },
+}
+
+# Evidence from earlier turns fades by this factor every turn
+DECAY = 0.5
+# Evidence a single turn can add to one stage, so a keyword-dense answer cannot dominate
+TURN_CAP = 6.0
+# A stage needs this much evidence before the tracker moves to it
+MIN_SCORE = 2.0
+# Moving on: the new turn must favour a later stage by this margin.
+# Going back: the accumulated score must lead by the larger margin.
+FORWARD_MARGIN = 1.5
+BACKWARD_MARGIN = 3.0
+
+STAGE_TAG_RE = re.compile(r"\s*\[STAGE:\s*([a-z_]+)\s*\]\s*", re.IGNORECASE)
+STAGE_TAG_PREFIX = "[STAGE:"
+
+_matcher = MultiPatternMatcher(
+    (keyword, (stage, weight), False)
+    for stage, keywords in STAGE_KEYWORDS.items()
+    for keyword, weight in keywords.items()
+)
+
+
+def split_stage_tag(text: str) -> Tuple[str, Optional[str]]:
+    """Remove [STAGE:x] tags from model output, returning (text, last valid stage)"""
+    stage = None
+    for m in STAGE_TAG_RE.finditer(text):
+        if m.group(1).lower() in STAGES:
+            stage = m.group(1).lower()
+    if stage is None and STAGE_TAG_PREFIX not in text.upper():
+        return text, None
+    return STAGE_TAG_RE.sub("\n", text).strip(), stage
+
+
+class StageTagFilter:
+    """Strips [STAGE:x] tags from a streamed response
+
+    Text that may be the start of a tag is held back until it can be decided,
+    so streamed chunks never show the tag to the user.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self.stage: Optional[str] = None
+
+    def feed(self, chunk: str) -> str:
+        self._buffer += chunk
+        for m in STAGE_TAG_RE.finditer(self._buffer):
+            if m.group(1).lower() in STAGES:
+                self.stage = m.group(1).lower()
+        self._buffer = STAGE_TAG_RE.sub("\n", self._buffer)
+
+        hold = self._buffer.rfind("[")
+        if hold != -1:
+            tail = self._buffer[hold:].upper()
+            if not (STAGE_TAG_PREFIX.startswith(tail) or (tail.startswith(STAGE_TAG_PREFIX) and "]" not in tail)):
+                hold = -1
+        if hold == -1:
+            text, self._buffer = self._buffer, ""
+        else:
+            text, self._buffer = self._buffer[:hold], self._buffer[hold:]
+        return text
+
+    def flush(self) -> str:
+        text, self._buffer = self._buffer, ""
+        return text
+
+
+class StageTracker:
+    """Per-session interview stage state machine
+
+    Each turn only the new text is scanned (one Aho–Corasick pass); keyword
+    weights accumulate into per-stage scores that decay every turn. The stage
+    changes only when another stage clearly leads the current one, so a
+    passing mention of "需求" late in the interview does not pull it back.
+    A stage tag from the model overrides the keyword evidence.
+    """
+
+    def __init__(self, stage: str = STAGES[0]):
+        self.stage = stage
+        self.scores: Dict[str, float] = {s: 0.0 for s in STAGES}
+
+    def _is_forward(self, stage: str) -> bool:
+        return STAGES.index(stage) > STAGES.index(self.stage)
+
+    def update(self, text: str, tagged_stage: Optional[str] = None) -> str:
+        """Consume one new turn and return the current stage"""
+        evidence = dict.fromkeys(STAGES, 0.0)
+        for m in _matcher.find_all(text):
+            stage, weight = m.value
+            evidence[stage] += weight
+        for stage in STAGES:
+            evidence[stage] = min(evidence[stage], TURN_CAP)
+            self.scores[stage] = self.scores[stage] * DECAY + evidence[stage]
+
+        if tagged_stage in self.scores:
+            self.stage = tagged_stage
+            # The tagged stage holds until keywords clearly point elsewhere
+            self.scores[tagged_stage] = max(self.scores.values())
+            return self.stage
+
+        # Later stages mention earlier topics all the time, so moving on is
+        # judged on what this turn is mostly about
+        ahead = max((s for s in STAGES if self._is_forward(s)), key=evidence.get, default=None)
+        if (
+            ahead is not None
+            and evidence[ahead] >= MIN_SCORE
+            and evidence[ahead] - evidence[self.stage] >= FORWARD_MARGIN
+        ):
+            self.stage = ahead
+            return self.stage
+
+        behind = max(self.scores, key=self.scores.get)
+        if (
+            not self._is_forward(behind)
+            and behind != self.stage
+            and self.scores[behind] >= MIN_SCORE
+            and self.scores[behind] - self.scores[self.stage] >= BACKWARD_MARGIN
+        ):
+            self.stage = behind
+        return self.stage
@@ -1,7 +1,13 @@
 import json
 import uuid
+from collections import OrderedDict
 from app.services.claude import ClaudeService
 from app.models.session import InterviewSession, SessionType, SessionStatus
+from app.agents.stage_tracker import StageTracker, split_stage_tag
+
+# Stage trackers kept in memory; the least recently used is dropped beyond this
+# and rebuilt from the session history if that session continues
+MAX_TRACKERS = 1000
 
 
 class SystemDesignAgent:
@@ -27,11 +33,15 @@ Interview stages:
 3. Deep dive (scalability, availability, consistency)
 4. Summary
 
-Keep your responses focused and ask one question at a time."""
+Keep your responses focused and ask one question at a time.
+
+End every reply with the current stage on its own line, exactly one of:
+[STAGE:requirements] [STAGE:architecture] [STAGE:deep_dive] [STAGE:summary]"""
 
-    def __init__(self):
-        self.claude = ClaudeService()
+    def __init__(self, claude: ClaudeService | None = None):
+        self.claude = claude or ClaudeService()
         self.scenarios = self._load_scenarios()
+        self._trackers: "OrderedDict[str, StageTracker]" = OrderedDict()
 
     def _load_scenarios(self):
         """Load scenarios from JSON file"""
@@ -113,11 +123,7 @@ Keep your responses focused and ask one question at a time."""
         ):
             full_response += chunk
 
-        # Determine current stage (simplified)
-        stage = self._determine_stage(session.messages + [
-            {"role": "user", "content": user_input},
-            {"role": "assistant", "content": full_response}
-        ])
+        full_response, stage = self.track_stage(session, user_input, full_response)
 
         # Update session messages
         session.messages.append({"role": "user", "content": user_input})
@@ -125,19 +131,38 @@ Keep your responses focused and ask one question at a time."""
 
         return full_response, stage
 
-    def _determine_stage(self, messages) -> str:
-        """Determine current interview stage based on conversation"""
-        # Simplified logic - can be improved
-        text = " ".join([m["content"] for m in messages[-5:]])
+    def _tracker(self, session: InterviewSession) -> StageTracker:
+        tracker = self._trackers.get(session.id)
+        if tracker is not None:
+            self._trackers.move_to_end(session.id)
+            return tracker
+
+        # Rebuild from the history once, e.g. for a session created elsewhere
+        # or one whose tracker was evicted while it sat idle
+        tracker = self._trackers[session.id] = StageTracker()
+        history = session.messages[1:]
+        for user, assistant in zip(history[::2], history[1::2]):
+            content, tagged = split_stage_tag(assistant["content"])
+            tracker.update(user["content"] + "\n" + content, tagged)
+        if len(self._trackers) > MAX_TRACKERS:
+            self._trackers.popitem(last=False)
+        return tracker
+
+    def track_stage(
+        self, session: InterviewSession, user_input: str, response: str, tagged_stage: str | None = None
+    ) -> tuple[str, str]:
+        """
+        Update the session's stage with a new turn.
+
+        Call before appending the turn to session.messages.
 
-        if any(word in text for word in ["需求", "QPS", "数据量", "约束"]):
-            return "requirements"
-        elif any(word in text for word in ["架构", "设计", "组件", "模块"]):
-            return "architecture"
-        elif any(word in text for word in ["扩展", "容错", "一致性", "可用"]):
-            return "deep_dive"
-        else:
-            return "discussion"
+        Returns:
+            (response without the stage tag, stage)
+        """
+        tracker = self._tracker(session)
+        response, tag = split_stage_tag(response)
+        stage = tracker.update(user_input + "\n" + response, tagged_stage or tag)
+        return response, stage
 
     async def generate_report(
         self, session: InterviewSession
@@ -151,6 +176,8 @@ Keep your responses focused and ask one question at a time."""
         Returns:
             Dictionary with scores and feedback
         """
+        self._trackers.pop(session.id, None)
+
         # Get scenario info
         scenario_id = session.scenario_id
         scenario = next((s for s in self.scenarios if s["id"] == scenario_id), None)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.schemas import (
     AlgorithmStartRequest,
@@ -9,12 +9,13 @@ from app.api.schemas import (
     QuestionInfo,
 )
 from app.agents.algorithm_interviewer import AlgorithmInterviewer
+from app.agents.registry import get_algorithm_agent
+from app.services.code_versions import code_versions, CodeConflictError
 from app.models.session import InterviewSession, SessionStatus
 from app.database import async_session
 import json
 
 router = APIRouter(prefix="/api/algorithm", tags=["algorithm"])
-agent = AlgorithmInterviewer()
 
 
 # In-memory session storage (can be replaced with database later)
@@ -22,7 +23,10 @@ sessions: dict[str, InterviewSession] = {}
 
 
 @router.post("/start", response_model=AlgorithmStartResponse)
-async def start_interview(request: AlgorithmStartRequest):
+async def start_interview(
+    request: AlgorithmStartRequest,
+    agent: AlgorithmInterviewer = Depends(get_algorithm_agent),
+):
     """Start an algorithm interview"""
     try:
         session, question = await agent.start_interview(request.difficulty)
@@ -39,24 +43,44 @@ async def start_interview(request: AlgorithmStartRequest):
 
 
 @router.post("/{session_id}/answer", response_model=AlgorithmAnswerResponse)
-async def submit_answer(session_id: str, request: AlgorithmAnswerRequest):
+async def submit_answer(
+    session_id: str,
+    request: AlgorithmAnswerRequest,
+    agent: AlgorithmInterviewer = Depends(get_algorithm_agent),
+):
     """Submit an answer and get follow-up question"""
     if session_id not in sessions:
         raise HTTPException(status_code=404, detail="Session not found")
 
     session = sessions[session_id]
 
+    submission = None
+    if request.code is not None or request.codeDiff is not None:
+        try:
+            submission = await agent.submit_code(
+                session, code=request.code, diff=request.codeDiff, base_version=request.baseVersion
+            )
+        except CodeConflictError as e:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": str(e), "latestVersion": e.latest_version},
+            )
+
     try:
         reply, completed = await agent.process_answer(
-            session, request.content, request.code
+            session, request.content, submission=submission
+        )
+        return AlgorithmAnswerResponse(
+            reply=reply,
+            completed=completed,
+            codeVersion=submission.version if submission else None,
         )
-        return AlgorithmAnswerResponse(reply=reply, completed=completed)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/{session_id}/end", response_model=AlgorithmReport)
-async def end_interview(session_id: str):
+async def end_interview(session_id: str, agent: AlgorithmInterviewer = Depends(get_algorithm_agent)):
     """End interview and get evaluation report"""
     if session_id not in sessions:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -68,13 +92,14 @@ async def end_interview(session_id: str):
         report = await agent.generate_report(session)
         session.score = report
         session.feedback = report.get("feedback", "")
+        code_versions.forget(session_id)
         return AlgorithmReport(**report)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/questions", response_model=list[QuestionInfo])
-async def get_questions():
+async def get_questions(agent: AlgorithmInterviewer = Depends(get_algorithm_agent)):
     """Get all available questions"""
     questions = []
     for q in agent.questions:
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, WebSocket
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
+from datetime import datetime
 
 from app.api.schemas import (
     AlgorithmStartRequest,
@@ -11,34 +12,55 @@ from app.api.schemas import (
     QuestionInfo,
 )
 from app.agents.algorithm_interviewer import AlgorithmInterviewer
+from app.agents.registry import get_algorithm_agent
+from app.services.question_bank import question_bank, answered_question_ids
+from app.services.question_calibration import question_calibration
+from app.services.code_versions import code_versions, CodeConflictError
+from app.services.job_queue import job_queue, JobContext
 from app.models.session import InterviewSession, SessionStatus
 from app.models.user import User
-from app.api.auth import get_current_user
+from app.api.auth import authenticate_token, get_current_user
+from app.api.websocket import serve_algorithm_session
 from app.database import async_session
+from app.services.report_jobs import enqueue_report, report_generator
+from app.api.schemas_job import JobSubmitResponse
 import json
 
 router = APIRouter(prefix="/api/algorithm", tags=["algorithm"])
-agent = AlgorithmInterviewer()
 
 
 # In-memory session storage (can be replaced with database later)
 sessions: dict[str, InterviewSession] = {}
 
 
+@job_queue.handler("question_calibrate", concurrency=1)
+async def run_question_calibrate(ctx: JobContext) -> dict:
+    """Background job: refit question difficulty and user ability from all sessions"""
+    await ctx.progress(10, "Calibrating question difficulty")
+    return await question_calibration.recalibrate()
+
+
 @router.post("/start", response_model=AlgorithmStartResponse)
 async def start_interview(
     request: AlgorithmStartRequest,
     current_user: User = Depends(get_current_user),
+    agent: AlgorithmInterviewer = Depends(get_algorithm_agent),
 ):
     """Start an algorithm interview"""
     try:
-        session, question = await agent.start_interview(request.difficulty)
+        # Avoid questions the user has already answered
+        answered = await answered_question_ids(current_user.id)
+        ability = await question_calibration.ability(current_user.id)
+        session, question = await agent.start_interview(
+            request.difficulty, exclude_ids=answered, ability=ability
+        )
         session.user_id = current_user.id  # Associate with user
         sessions[session.id] = session
+        selected = question_bank.get(session.question_id)
         return AlgorithmStartResponse(
             sessionId=session.id,
             question=question,
-            difficulty=request.difficulty,
+            difficulty=selected.difficulty if selected else request.difficulty,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -51,6 +73,7 @@ async def submit_answer(
     session_id: str,
     request: AlgorithmAnswerRequest,
     current_user: User = Depends(get_current_user),
+    agent: AlgorithmInterviewer = Depends(get_algorithm_agent),
 ):
     """Submit an answer and get follow-up question"""
     if session_id not in sessions:
@@ -62,53 +85,125 @@ async def submit_answer(
     if session.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
+    submission = None
+    if request.code is not None or request.codeDiff is not None:
+        try:
+            submission = await agent.submit_code(
+                session, code=request.code, diff=request.codeDiff, base_version=request.baseVersion
+            )
+        except CodeConflictError as e:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": str(e), "latestVersion": e.latest_version},
+            )
+
     try:
         reply, completed = await agent.process_answer(
-            session, request.content, request.code
+            session, request.content, submission=submission
+        )
+        return AlgorithmAnswerResponse(
+            reply=reply,
+            completed=completed,
+            codeVersion=submission.version if submission else None,
         )
-        return AlgorithmAnswerResponse(reply=reply, completed=completed)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/{session_id}/end", response_model=AlgorithmReport)
+@router.websocket("/{session_id}/ws")
+async def answer_websocket(websocket: WebSocket, session_id: str):
+    """Streamed alternative to /answer; code may be sent as a diff against the last accepted version
+
+    Authenticates with the token query parameter, since browsers cannot set
+    headers on a websocket.
+    """
+    await websocket.accept()
+
+    principal = await authenticate_token(websocket.query_params.get("token") or "")
+    if not principal:
+        await websocket.send_json({"type": "error", "message": "Invalid token"})
+        await websocket.close()
+        return
+
+    session = sessions.get(session_id)
+    if session is None or session.user_id != principal.id:
+        await websocket.send_json({"type": "error", "message": "Session not found"})
+        await websocket.close()
+        return
+
+    await serve_algorithm_session(websocket, session)
+
+
+@router.post("/{session_id}/end", response_model=JobSubmitResponse)
 async def end_interview(
     session_id: str,
     current_user: User = Depends(get_current_user),
 ):
-    """End interview and get evaluation report"""
-    if session_id not in sessions:
+    """End interview; the report is generated in the background
+
+    Track the returned job via /api/jobs/{job_id}/events, its result is the
+    report. Calling again returns the same job.
+    """
+    session = sessions.get(session_id)
+    if session is None:
+        # Already ended (e.g. a retried request): look it up in the database
+        async with async_session() as db:
+            session = await db.get(InterviewSession, session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    session = sessions[session_id]
-
     # Verify session belongs to current user
     if session.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    session.status = SessionStatus.COMPLETED
-
-    try:
-        report = await agent.generate_report(session)
-        session.score = report
-        session.feedback = report.get("feedback", "")
+    if session.status != SessionStatus.COMPLETED:
+        session.status = SessionStatus.COMPLETED
+        session.ended_at = datetime.utcnow()
 
         # Save to database (persistence)
         async with async_session() as db:
-            db.add(session)
+            await db.merge(session)
             await db.commit()
+    sessions.pop(session_id, None)
+    code_versions.forget(session_id)
+
+    job = await enqueue_report("algorithm", session.id, current_user.id)
+    return JobSubmitResponse(message="Report is being generated", job_id=job.id, status=job.status)
+
+
+@report_generator("algorithm")
+async def generate_algorithm_report(session_id: str, ctx: JobContext) -> dict:
+    """Generate and save the algorithm report of an ended session"""
+    async with async_session() as db:
+        session = await db.get(InterviewSession, session_id)
+    if session is None:
+        raise ValueError(f"Session not found: {session_id}")
+    if session.score:
+        return session.score  # Retried job: the report was already saved
+
+    agent = get_algorithm_agent()
+    report = AlgorithmReport(**(await agent.generate_report(session))).model_dump()
+    async with async_session() as db:
+        await db.execute(
+            update(InterviewSession)
+            .where(InterviewSession.id == session_id)
+            .values(score=report, feedback=report.get("feedback", ""))
+        )
+        await db.commit()
 
-        return AlgorithmReport(**report)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # Update ability / difficulty estimates for adaptive selection
+    await question_calibration.record(session.user_id, session.question_id, report)
+
+    return report
 
 
 @router.get("/questions", response_model=list[QuestionInfo])
-async def get_questions(current_user: User = Depends(get_current_user)):
+async def get_questions(
+    current_user: User = Depends(get_current_user),
+    agent: AlgorithmInterviewer = Depends(get_algorithm_agent),
+):
     """Get all available questions"""
-    questions = []
-    for q in agent.questions:
-        questions.append(
-            QuestionInfo(id=q["id"], title=q["title"], difficulty=q["difficulty"])
-        )
-    return questions
+    return [
+        QuestionInfo(id=q.id, title=q.title, difficulty=q.difficulty)
+        for q in question_bank.all()
+    ]
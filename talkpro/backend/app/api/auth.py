@@ -3,15 +3,75 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.api.schemas_user import UserRegister, UserLogin, UserResponse, TokenResponse, UserUpdate
+from typing import Optional
+
 from app.models.user import User
-from app.database import get_session
-from app.core.security import hash_password, verify_password, create_access_token, decode_access_token
+from app.database import get_session, async_session
+from app.core.security import (
+    PasswordHasherBusy,
+    create_access_token,
+    decode_access_token,
+    hash_password_async,
+    verify_password_async,
+)
+from app.core.principal import Principal, principal_cache
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
-async def get_current_user(token: str, db: AsyncSession) -> User:
-    """从 Token 获取当前用户"""
+def _hasher_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+# Principal 只需要的列，避免加载 resume_data / target_jd_data 等大字段
+PRINCIPAL_COLUMNS = (
+    User.id,
+    User.email,
+    User.name,
+    User.years_of_experience,
+    User.current_company,
+    User.current_role,
+    User.target_role,
+    User.resume_uploaded_at,
+    User.target_jd_created_at,
+    User.created_at,
+)
+
+
+async def load_principal(email: str) -> Optional[Principal]:
+    """按邮箱获取 Principal，优先读缓存"""
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    async with async_session() as db:
+        result = await db.execute(select(*PRINCIPAL_COLUMNS).where(User.email == email))
+        row = result.first()
+
+    if not row:
+        return None
+
+    principal = Principal(**row._asdict())
+    principal_cache.set(email, principal)
+    return principal
+
+
+async def authenticate_token(token: str) -> Optional[Principal]:
+    """校验 Token 并返回 Principal，失败返回 None（供 WebSocket 等非 HTTP 场景使用）"""
+    payload = decode_access_token(token)
+    if not payload or "sub" not in payload:
+        return None
+    return await load_principal(payload["sub"])
+
+
+async def get_current_user(token: str) -> Principal:
+    """从 Token 获取当前用户
+
+    返回精简的 Principal；需要完整用户资料（简历、JD）的接口请按 id 自行查询 User。
+    """
     payload = decode_access_token(token)
 
     if not payload or "sub" not in payload:
@@ -20,18 +80,15 @@ async def get_current_user(token: str, db: AsyncSession) -> User:
             detail="Invalid authentication credentials",
         )
 
-    email = payload["sub"]
-
-    result = await db.execute(select(User).where(User.email == email))
-    user = result.scalar_one_or_none()
+    principal = await load_principal(payload["sub"])
 
-    if not user:
+    if not principal:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
 
-    return user
+    return principal
 
 
 @router.post("/register", response_model=TokenResponse)
@@ -47,10 +104,15 @@ async def register(user_data: UserRegister, db: AsyncSession = Depends(get_sessi
             detail="Email already registered"
         )
 
-    # 创建新用户
+    # 创建新用户（bcrypt 在独立线程池中执行）
+    try:
+        password_hash = await hash_password_async(user_data.password)
+    except (PasswordHasherBusy, TimeoutError):
+        raise _hasher_unavailable()
+
     new_user = User(
         email=user_data.email,
-        password_hash=hash_password(user_data.password),
+        password_hash=password_hash,
         name=user_data.name
     )
 
@@ -74,24 +136,36 @@ async def login(user_data: UserLogin, db: AsyncSession = Depends(get_session)):
     result = await db.execute(select(User).where(User.email == user_data.email))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(user_data.password, user.password_hash):
+    verified = False
+    if user:
+        try:
+            verified, new_hash = await verify_password_async(user_data.password, user.password_hash)
+        except (PasswordHasherBusy, TimeoutError):
+            raise _hasher_unavailable()
+
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # 哈希参数（如 bcrypt 轮数）变化后，登录时透明地重新计算并保存
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+
     # 生成 Token
     access_token = create_access_token(data={"sub": user.email})
 
     return TokenResponse(
         access_token=access_token,
-        user=UserResponse.model_validate(user_user)
+        user=UserResponse.model_validate(user)
     )
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: Principal = Depends(get_current_user)):
     """获取当前用户信息"""
     return UserResponse.model_validate(current_user)
 
@@ -99,10 +173,14 @@ async def get_me(current_user: User = Depends(get_current_user)):
 @router.put("/me", response_model=UserResponse)
 async def update_me(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
+    principal: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_session)
 ):
     """更新用户信息"""
+    current_user = await db.get(User, principal.id)
+    if not current_user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
     # 更新字段
     if user_update.name is not None:
         current_user.name = user_update.name
@@ -117,5 +195,6 @@ async def update_me(
 
     await db.commit()
     await db.refresh(current_user)
+    principal_cache.invalidate_user(current_user.id)
 
     return UserResponse.model_validate(current_user)
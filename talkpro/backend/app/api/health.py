@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.config import settings
+from app.core.loop_monitor import loop_monitor
+from app.services.readiness import readiness_probe
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/livez")
+async def liveness():
+    """The process is alive and its event loop is serving requests; dependencies are not checked"""
+    return {"status": "alive"}
+
+
+@router.get("/readyz")
+async def readiness():
+    """Ready to take traffic: warmed up, dependencies reachable and not overloaded; 503 otherwise"""
+    ready, checks = await readiness_probe.check()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "unready", "checks": checks},
+    )
+
+
+if settings.debug:
+    @router.get("/debug/event-loop")
+    async def event_loop_stats():
+        """Event-loop lag histograms and the stacks of recent slow callbacks (debug builds only)"""
+        return loop_monitor.snapshot()
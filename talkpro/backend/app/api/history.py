@@ -1,9 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import Optional
-
-from app.api.schemas_history import TrainingSessionResponse, TrainingHistoryList, SessionDetailResponse
+from sqlalchemy import select, func, column, Integer, JSON
+from typing import Literal, Optional
+import json
+
+from app.api.schemas_history import (
+    TrainingSessionResponse,
+    TrainingHistoryList,
+    SessionDetailResponse,
+    SessionHeaderResponse,
+    SessionMessage,
+    SessionMessagesPage,
+)
 from app.models.session import InterviewSession, SessionType, SessionStatus
 from app.models.user import User
 from app.api.auth import get_current_user
@@ -11,6 +20,49 @@ from app.database import async_session
 
 router = APIRouter(prefix="/api/history", tags=["history"])
 
+# 导出时每次从数据库读取的消息条数
+EXPORT_PAGE_SIZE = 200
+
+
+def _message_rows():
+    """messages JSON 数组展开为 (key, value) 行，key 即消息的 seq"""
+    return func.json_each(InterviewSession.messages).table_valued(
+        column("key", Integer),
+        column("value", JSON),
+        joins_implicitly=True,
+    )
+
+
+async def _get_session_header(
+    db: AsyncSession, session_id: str, user_id: str
+) -> SessionHeaderResponse:
+    """读取会话概要，只取消息条数而不加载消息内容"""
+    result = await db.execute(
+        select(
+            InterviewSession.id,
+            InterviewSession.type,
+            InterviewSession.scenario_id,
+            InterviewSession.score,
+            InterviewSession.feedback,
+            InterviewSession.status,
+            InterviewSession.created_at,
+            InterviewSession.ended_at,
+            func.coalesce(func.json_array_length(InterviewSession.messages), 0).label("message_count"),
+        )
+        .where(InterviewSession.id == session_id)
+        .where(InterviewSession.user_id == user_id)
+    )
+    row = result.first()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    return SessionHeaderResponse.model_validate(row)
+
+
+def _to_message(seq: int, value: dict) -> SessionMessage:
+    return SessionMessage(**{"role": "", "content": "", **value, "seq": seq})
+
 
 @router.get("", response_model=TrainingHistoryList)
 async def get_training_history(
@@ -73,6 +125,99 @@ async def get_session_detail(
         return SessionDetailResponse.model_validate(session)
 
 
+@router.get("/{session_id}/header", response_model=SessionHeaderResponse)
+async def get_session_header(
+    session_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    """获取会话概要（评分、状态、消息条数），不返回消息内容"""
+    async with async_session() as db:
+        return await _get_session_header(db, session_id, current_user.id)
+
+
+@router.get("/{session_id}/messages", response_model=SessionMessagesPage)
+async def get_session_messages(
+    session_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    before_seq: Optional[int] = None,
+    after_seq: Optional[int] = None,
+    order: Literal["desc", "asc"] = "desc",
+    current_user: User = Depends(get_current_user),
+):
+    """分页获取会话消息，默认最新的在前
+
+    - before_seq / after_seq: 只返回 seq 小于 / 大于该值的消息（游标分页）
+    - offset / limit: 在上述范围内按 order 排序后的偏移和条数
+    """
+    async with async_session() as db:
+        header = await _get_session_header(db, session_id, current_user.id)
+
+        rows = _message_rows()
+        query = (
+            select(rows.c.key, rows.c.value)
+            .where(InterviewSession.id == session_id)
+            .where(InterviewSession.user_id == current_user.id)
+        )
+        if before_seq is not None:
+            query = query.where(rows.c.key < before_seq)
+        if after_seq is not None:
+            query = query.where(rows.c.key > after_seq)
+
+        query = query.order_by(rows.c.key.desc() if order == "desc" else rows.c.key.asc())
+        # 多取一条用于判断是否还有下一页
+        query = query.offset(offset).limit(limit + 1)
+
+        result = await db.execute(query)
+        items = [_to_message(key, value) for key, value in result.all()]
+
+        return SessionMessagesPage(
+            session_id=session_id,
+            total=header.message_count,
+            messages=items[:limit],
+            has_more=len(items) > limit,
+        )
+
+
+@router.get("/{session_id}/export")
+async def export_session(
+    session_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    """以 NDJSON 流式导出完整会话：首行为会话概要，之后每行一条消息"""
+    async with async_session() as db:
+        header = await _get_session_header(db, session_id, current_user.id)
+
+    async def generate():
+        yield header.model_dump_json() + "\n"
+
+        last_seq = -1
+        async with async_session() as db:
+            while True:
+                rows = _message_rows()
+                result = await db.execute(
+                    select(rows.c.key, rows.c.value)
+                    .where(InterviewSession.id == session_id)
+                    .where(InterviewSession.user_id == current_user.id)
+                    .where(rows.c.key > last_seq)
+                    .order_by(rows.c.key.asc())
+                    .limit(EXPORT_PAGE_SIZE)
+                )
+                page = result.all()
+                if not page:
+                    break
+
+                for key, value in page:
+                    yield json.dumps(_to_message(key, value).model_dump(), ensure_ascii=False) + "\n"
+                last_seq = page[-1][0]
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="session-{session_id}.ndjson"'},
+    )
+
+
 @router.delete("/{session_id}")
 async def delete_session(
     session_id: str,
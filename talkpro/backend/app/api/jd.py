@@ -1,16 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
-from typing import Optional
-from pydantic import BaseModel
+from sqlalchemy import select, update, delete
+from typing import List, Optional
+from pydantic import BaseModel, Field
 from datetime import datetime
-
-from ..core.database import async_session, User
-from ..dependencies import get_current_user
-from ..services.resume_parser import ResumeParser
+import asyncio
+import json
+
+from ..database import async_session
+from ..models.user import User
+from .auth import get_current_user
+from ..agents.registry import get_resume_parser
+from ..services.match_scorer import match_scorer
+from ..services.jd_analyzer import jd_analyzer, save_user_jd
+from ..services.skill_taxonomy import skill_taxonomy
+from ..models.user_jd import UserJD
+from ..config import settings
+from ..services.job_queue import job_queue, JobContext
+from ..core.principal import principal_cache
+from .schemas_job import JobSubmitResponse
 
 router = APIRouter(prefix="/jd", tags=["jd"])
-parser = ResumeParser()
+
+# 批量排序单次最多的简历数
+MAX_RANK_RESUMES = 1000
 
 
 class JDAnalyzeRequest(BaseModel):
@@ -20,109 +34,224 @@ class JDAnalyzeRequest(BaseModel):
     url: Optional[str] = None
 
 
-@router.post("/analyze")
+class JDBatchRequest(BaseModel):
+    items: List[JDAnalyzeRequest] = Field(..., min_length=1, max_length=settings.jd_batch_max_items)
+
+
+class RankResumeItem(BaseModel):
+    id: str
+    resume_data: dict
+
+
+class JDRankRequest(BaseModel):
+    jd_data: Optional[dict] = None  # 不传则使用当前用户的目标JD
+    resumes: List[RankResumeItem] = Field(..., min_length=1, max_length=MAX_RANK_RESUMES)
+
+
+@job_queue.handler("jd_analyze")
+async def run_jd_analyze(ctx: JobContext) -> dict:
+    """后台任务：分析JD，加入用户JD库并设为目标JD"""
+    await ctx.progress(10, "正在分析JD")
+    jd_hash, jd_data, _ = await jd_analyzer.analyze(
+        ctx.payload["jd_text"],
+        ctx.payload.get("company"),
+        ctx.payload.get("position"),
+    )
+    await save_user_jd(ctx.user_id, jd_hash, ctx.payload["jd_text"], jd_data, ctx.payload.get("url"))
+
+    # 保存到用户数据
+    async with async_session() as db:
+        await db.execute(
+            update(User)
+            .where(User.id == ctx.user_id)
+            .values(
+                target_jd_data=jd_data,
+                target_jd_created_at=datetime.utcnow()
+            )
+        )
+        await db.commit()
+    principal_cache.invalidate_user(ctx.user_id)
+
+    return jd_data
+
+
+@job_queue.handler("jd_compare")
+async def run_jd_compare(ctx: JobContext) -> dict:
+    """后台任务：对比简历和JD，生成差距分析"""
+    async with async_session() as db:
+        result = await db.execute(
+            select(User.resume_data, User.target_jd_data).where(User.id == ctx.user_id)
+        )
+        user = result.first()
+
+    if not user or not user.resume_data or not user.target_jd_data:
+        raise ValueError("请先上传简历并分析JD")
+
+    await ctx.progress(10, "正在生成差距分析")
+    # 使用resume_parser中的对比功能
+    return await get_resume_parser().analyze_resume_against_jd(
+        user.resume_data,
+        user.target_jd_data
+    )
+
+
+@router.post("/analyze", response_model=JobSubmitResponse)
 async def analyze_jd(
     request: JDAnalyzeRequest,
     current_user: User = Depends(get_current_user)
 ):
-    """分析职位描述(JD)"""
-
-    system_prompt = """你是一位专业的招聘专家和职业顾问，擅长分析职位描述(JD)。
-你的任务是深入分析JD内容，提取关键信息，识别岗位要求。"""
-
-    user_prompt = f"""请分析以下职位描述(JD)，提取关键信息：
-
-公司：{request.company or '未指定'}
-职位：{request.position or '未指定'}
-
-JD内容：
-{request.jd_text}
-
-请返回以下JSON格式：
-{{
-    "company": "公司名称",
-    "position": "职位名称",
-    "basic_requirements": {{
-        "education": "学历要求",
-        "experience": "经验要求",
-        "location": "工作地点",
-        "salary": "薪资范围"
-    }},
-    "skills": {{
-        "required": ["必需技能1", "必需技能2"],
-        "preferred": ["加分技能1", "加分技能2"]
-    }},
-    "responsibilities": ["职责1", "职责2", "职责3"],
-    "requirements": {{
-        "technical": ["技术要求1", "技术要求2"],
-        "soft_skills": ["软技能要求1", "软技能要求2"],
-        "certifications": ["认证要求"]
-    }},
-    "team_info": {{
-        "team_size": "团队规模",
-        "team_structure": "团队结构",
-        "tech_stack": "技术栈"
-    }},
-    "highlights": ["亮点1", "亮点2", "亮点3"],
-    "keywords": ["关键词1", "关键词2", "关键词3"]
-}}
-
-注意：
-- 如果某项信息不存在，返回空数组或null
-- 技能要区分必需和加分项
-- 职责要具体可量化
-- 提取所有关键技能
-- 识别岗位亮点
-- 只返回JSON，不要有其他文字"""
-
-    try:
-        response = await parser.claude.chat(
-            messages=[{"role": "user", "content": user_prompt}],
-            system_prompt=system_prompt
+    """分析职位描述(JD)
+
+    分析在后台执行，立即返回任务ID；通过 /api/jobs/{job_id} 查询结果。
+    """
+    job = await job_queue.enqueue(
+        "jd_analyze",
+        payload=request.model_dump(),
+        user_id=current_user.id,
+    )
+    return JobSubmitResponse(message="JD分析任务已提交", job_id=job.id, status=job.status)
+
+
+@router.post("/batch")
+async def analyze_jd_batch(
+    request: JDBatchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """批量分析JD并加入JD库
+
+    各JD并行分析（模型调用总并发受 jd_analyzer 限制，重复JD复用已有结果），
+    按完成顺序逐行返回 NDJSON，最后一行为汇总。
+    """
+    user_id = current_user.id
+
+    async def analyze_one(index: int, item: JDAnalyzeRequest) -> dict:
+        try:
+            jd_hash, jd_data, cached = await jd_analyzer.analyze(item.jd_text, item.company, item.position)
+            jd_id = await save_user_jd(user_id, jd_hash, item.jd_text, jd_data, item.url)
+            return {
+                "index": index,
+                "status": "ok",
+                "jd_id": jd_id,
+                "company": jd_data.get("company"),
+                "position": jd_data.get("position"),
+                "cached": cached,
+            }
+        except Exception as e:
+            print(f"Failed to analyze JD #{index}: {e}")
+            return {"index": index, "status": "error", "error": str(e)}
+
+    async def stream():
+        tasks = [asyncio.create_task(analyze_one(i, item)) for i, item in enumerate(request.items)]
+        succeeded = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                succeeded += result["status"] == "ok"
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+            yield json.dumps({"done": True, "total": len(tasks), "succeeded": succeeded}) + "\n"
+        finally:
+            # 客户端断开时不再等待尚未完成的分析；已发起的模型调用继续执行并保存结果
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.get("/library")
+async def list_user_jds(current_user: User = Depends(get_current_user)):
+    """获取用户JD库（不含JD原文和分析详情）"""
+    async with async_session() as db:
+        result = await db.execute(
+            select(UserJD.id, UserJD.company, UserJD.position, UserJD.url, UserJD.created_at)
+            .where(UserJD.user_id == current_user.id)
+            .order_by(UserJD.created_at.desc())
         )
+        return {
+            "items": [
+                {
+                    "id": row.id,
+                    "company": row.company,
+                    "position": row.position,
+                    "url": row.url,
+                    "created_at": row.created_at.isoformat() if row.created_at else None,
+                }
+                for row in result
+            ]
+        }
 
-        # 提取JSON
-        import re
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if json_match:
-            jd_data = json.loads(json_match.group(0))
-        else:
-            raise ValueError("No JSON found in response")
-
-        # 确保所有字段存在
-        jd_data.setdefault("basic_requirements", {})
-        jd_data.setdefault("skills", {})
-        jd_data["skills"].setdefault("required", [])
-        jd_data["skills"].setdefault("preferred", [])
-        jd_data.setdefault("responsibilities", [])
-        jd_data.setdefault("requirements", {})
-        jd_data["requirements"].setdefault("technical", [])
-        jd_data["requirements"].setdefault("soft_skills", [])
-        jd_data["requirements"].setdefault("certifications", [])
-        jd_data.setdefault("team_info", {})
-        jd_data.setdefault("highlights", [])
-        jd_data.setdefault("keywords", [])
-
-        # 保存到用户数据
-        async with async_session() as db:
-            await db.execute(
-                update(User)
-                .where(User.id == current_user.id)
-                .values(
-                    target_jd_data=jd_data,
-                    target_jd_created_at=datetime.utcnow()
-                )
-            )
-            await db.commit()
+
+@router.get("/library/{jd_id}")
+async def get_user_jd(jd_id: str, current_user: User = Depends(get_current_user)):
+    """获取JD库中单个JD的分析结果"""
+    async with async_session() as db:
+        result = await db.execute(
+            select(UserJD).where(UserJD.id == jd_id, UserJD.user_id == current_user.id)
+        )
+        user_jd = result.scalar_one_or_none()
+        if not user_jd:
+            raise HTTPException(status_code=404, detail="JD不存在")
 
         return {
-            "message": "JD分析成功",
-            "data": jd_data
+            "id": user_jd.id,
+            "jd_text": user_jd.jd_text,
+            "jd_data": user_jd.jd_data,
+            "created_at": user_jd.created_at.isoformat() if user_jd.created_at else None,
         }
 
-    except Exception as e:
-        print(f"Failed to analyze JD: {e}")
-        raise HTTPException(status_code=500, detail=f"JD分析失败: {str(e)}")
+
+@router.delete("/library/{jd_id}")
+async def delete_user_jd(jd_id: str, current_user: User = Depends(get_current_user)):
+    """从JD库删除"""
+    async with async_session() as db:
+        result = await db.execute(
+            delete(UserJD)
+            .where(UserJD.id == jd_id, UserJD.user_id == current_user.id)
+            .returning(UserJD.id)
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="JD不存在")
+        await db.commit()
+
+        return {"message": "JD已删除"}
+
+
+@router.post("/library/compare")
+async def compare_resume_library(current_user: User = Depends(get_current_user)):
+    """简历与JD库中所有JD一次性对比（本地评分），按匹配度从高到低返回"""
+    async with async_session() as db:
+        resume_data = (await db.execute(
+            select(User.resume_data).where(User.id == current_user.id)
+        )).scalar_one_or_none()
+        rows = (await db.execute(
+            select(UserJD.id, UserJD.company, UserJD.position, UserJD.jd_data)
+            .where(UserJD.user_id == current_user.id)
+        )).all()
+
+    if not resume_data:
+        raise HTTPException(status_code=400, detail="请先上传简历")
+    if not rows:
+        return {"total": 0, "results": []}
+
+    labels = {row.id: row for row in rows}
+    scored = await asyncio.to_thread(
+        match_scorer.score_many, resume_data, [(row.id, row.jd_data) for row in rows]
+    )
+
+    results = []
+    for jd_id, match in scored:
+        row = labels[jd_id]
+        coverage = skill_taxonomy.jd_coverage(resume_data, row.jd_data)
+        results.append({
+            "jd_id": jd_id,
+            "company": row.company,
+            "position": row.position,
+            "match_score": match.match_score,
+            "matched_skills": coverage.matched_required + coverage.matched_preferred,
+            "missing_skills": coverage.missing_required,
+            "requirement_scores": match.to_dict()["requirements"],
+        })
+    results.sort(key=lambda r: r["match_score"], reverse=True)
+    return {"total": len(results), "results": results}
 
 
 @router.get("")
@@ -143,16 +272,16 @@ async def get_jd(current_user: User = Depends(get_current_user)):
         }
 
 
-@router.post("/compare")
+@router.post("/compare", response_model=JobSubmitResponse)
 async def compare_resume_jd(
     current_user: User = Depends(get_current_user)
 ):
-    """对比简历和JD，生成差距分析"""
+    """对比简历和JD，生成差距分析（后台任务）"""
     async with async_session() as db:
         result = await db.execute(
-            select(User).where(User.id == current_user.id)
+            select(User.resume_data, User.target_jd_data).where(User.id == current_user.id)
         )
-        user = result.scalar_one_or_none()
+        user = result.first()
 
         if not user:
             raise HTTPException(status_code=404, detail="用户不存在")
@@ -160,21 +289,36 @@ async def compare_resume_jd(
         if not user.resume_data or not user.target_jd_data:
             raise HTTPException(status_code=400, detail="请先上传简历并分析JD")
 
-        try:
-            # 使用resume_parser中的对比功能
-            gap_analysis = await parser.analyze_resume_against_jd(
-                user.resume_data,
-                user.target_jd_data
-            )
+    job = await job_queue.enqueue("jd_compare", payload={}, user_id=current_user.id)
+    return JobSubmitResponse(message="差距分析任务已提交", job_id=job.id, status=job.status)
 
-            return {
-                "message": "差距分析成功",
-                "data": gap_analysis
-            }
 
-        except Exception as e:
-            print(f"Failed to compare: {e}")
-            raise HTTPException(status_code=500, detail=f"差距分析失败: {str(e)}")
+@router.post("/rank")
+async def rank_resumes(
+    request: JDRankRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """按与JD的匹配度批量给简历排序（本地评分，不调用模型）"""
+    jd_data = request.jd_data
+    if jd_data is None:
+        async with async_session() as db:
+            result = await db.execute(
+                select(User.target_jd_data).where(User.id == current_user.id)
+            )
+            jd_data = result.scalar_one_or_none()
+        if not jd_data:
+            raise HTTPException(status_code=400, detail="请先分析JD或在请求中提供jd_data")
+
+    # 向量计算是 CPU 密集型，放到线程中执行
+    rankings = await asyncio.to_thread(
+        match_scorer.rank,
+        jd_data,
+        [(item.id, item.resume_data) for item in request.resumes],
+    )
+    return {
+        "total": len(rankings),
+        "rankings": [{"id": resume_id, "match_score": score} for resume_id, score in rankings],
+    }
 
 
 @router.delete("")
@@ -192,5 +336,6 @@ async def delete_jd(
             )
         )
         await db.commit()
+        principal_cache.invalidate_user(current_user.id)
 
         return {"message": "JD已删除"}
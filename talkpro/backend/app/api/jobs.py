@@ -0,0 +1,78 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+from typing import Optional
+
+from app.api.schemas_job import JobResponse
+from app.models.job import Job
+from app.models.user import User
+from app.api.auth import get_current_user
+from app.services.job_queue import job_queue
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+# SSE 心跳间隔，防止代理断开空闲连接
+SSE_KEEPALIVE_SECONDS = 15
+
+
+async def _get_user_job(job_id: str, user_id: str) -> Job:
+    job = await job_queue.get(job_id)
+    if not job or job.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    """查询任务状态"""
+    job = await _get_user_job(job_id, current_user.id)
+    return JobResponse.model_validate(job)
+
+
+@router.get("/{job_id}/events")
+async def job_events(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    """以 SSE 推送任务进度和中间结果，任务结束后关闭连接"""
+    await _get_user_job(job_id, current_user.id)
+
+    async def generate():
+        events = job_queue.events(job_id)
+        pending: Optional[asyncio.Future] = None
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(events.__anext__())
+                done, _ = await asyncio.wait({pending}, timeout=SSE_KEEPALIVE_SECONDS)
+                if not done:
+                    yield ": keepalive\n\n"
+                    continue
+
+                try:
+                    event = pending.result()
+                except StopAsyncIteration:
+                    break  # 任务已结束
+                pending = None
+
+                if "partial" in event:
+                    # 中间结果（如流式生成的报告片段）
+                    yield f"event: partial\ndata: {json.dumps(event['partial'], ensure_ascii=False, default=str)}\n\n"
+                else:
+                    yield f"event: job\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+        finally:
+            # 客户端断开时取消还在等待的事件，让 events() 退订
+            if pending is not None and not pending.done():
+                pending.cancel()
+                await asyncio.gather(pending, return_exceptions=True)
+            await events.aclose()
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,86 @@
+from typing import List
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.agents.registry import agents
+from app.core.metrics import Counter, Gauge, Metric, metrics
+from app.core.principal import principal_cache
+from app.core.security import password_hasher
+from app.services.code_versions import code_versions
+from app.services.complexity import complexity_profiler
+from app.services.jd_analyzer import jd_analyzer
+from app.services.job_queue import job_queue
+from app.services.judge import judge
+
+router = APIRouter(tags=["metrics"])
+
+# Starlette appends "; charset=utf-8"
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+@metrics.collector
+def collect_session_stores() -> List[Metric]:
+    """In-memory interview state; grows with open interviews and should drop back when they end"""
+    # Imported here so the v1 routers (only used by the websocket handlers) load on first use, not at startup
+    from app.api import algorithm, algorithm_v2, system_design, system_design_v2
+
+    size = Gauge("talkpro_session_store_size", "Entries held in in-memory session stores", ("store",))
+    size.set(len(algorithm_v2.sessions), "algorithm")
+    size.set(len(system_design_v2.sessions), "system_design")
+    size.set(len(algorithm.sessions), "algorithm_ws")
+    size.set(len(system_design.sessions), "system_design_ws")
+    size.set(len(code_versions._latest), "code_versions")
+    if agents.constructed("system_design"):
+        size.set(len(agents.get("system_design")._trackers), "system_design_stages")
+    return [size]
+
+
+@metrics.collector
+def collect_caches() -> List[Metric]:
+    caches = {
+        "principal": principal_cache,
+        "judge_verdict": judge,
+        "complexity_profile": complexity_profiler,
+        "code_version": code_versions,
+        "jd_analysis": jd_analyzer,
+    }
+    if agents.constructed("workplace"):
+        caches["workplace_opener"] = agents.get("workplace").openers
+
+    hits = Counter("talkpro_cache_hits_total", "Cache lookups served from the cache", ("cache",))
+    misses = Counter("talkpro_cache_misses_total", "Cache lookups that fell through", ("cache",))
+    ratio = Gauge("talkpro_cache_hit_ratio", "Hits over lookups since start", ("cache",))
+    for name, cache in caches.items():
+        hits.set(cache.hits, name)
+        misses.set(cache.misses, name)
+        lookups = cache.hits + cache.misses
+        ratio.set(cache.hits / lookups if lookups else 0, name)
+    return [hits, misses, ratio]
+
+
+@metrics.collector
+async def collect_workers() -> List[Metric]:
+    queue = Gauge("talkpro_job_queue_jobs", "Background jobs by state", ("state",))
+    queue.set(await job_queue.depth(), "queued")
+    queue.set(job_queue.running, "running")
+
+    claude = agents.get("claude") if agents.constructed("claude") else None
+    llm_in_flight = Gauge("talkpro_llm_in_flight", "Claude API requests and open streams")
+    llm_in_flight.set(claude.in_flight if claude else 0)
+
+    hash_calls = Counter("talkpro_password_hash_calls_total", "Completed password hash/verify calls")
+    hash_calls.set(password_hasher.calls)
+    hash_seconds = Counter("talkpro_password_hash_seconds_total", "Time spent in password hash/verify calls")
+    hash_seconds.set(password_hasher.total_seconds)
+    hash_rejected = Counter("talkpro_password_hash_rejected_total", "Calls rejected because the queue was full")
+    hash_rejected.set(password_hasher.rejected)
+    hash_pending = Gauge("talkpro_password_hash_pending", "Password hash/verify calls queued or running")
+    hash_pending.set(password_hasher.pending)
+    return [queue, llm_in_flight, hash_calls, hash_seconds, hash_rejected, hash_pending]
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus text exposition of request, websocket, database, LLM, cache and session-store metrics"""
+    return PlainTextResponse(await metrics.render(), media_type=CONTENT_TYPE)
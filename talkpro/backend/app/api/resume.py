@@ -1,21 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request
+from fastapi.routing import APIRoute
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
-from typing import Optional
+from typing import Callable, Optional
+import asyncio
 import os
-import uuid
 from datetime import datetime
 
-from ..core.database import async_session, User
-from ..dependencies import get_current_user
-from ..services.resume_parser import ResumeParser
+from ..database import async_session
+from ..models.user import User
+from .auth import get_current_user
+from ..agents.registry import get_resume_parser
+from ..services.resume_store import resume_store, UploadTooLarge
+from ..services.job_queue import job_queue, JobContext
+from ..core.principal import principal_cache
+from ..config import settings
+from .schemas_job import JobSubmitResponse
 
-router = APIRouter(prefix="/resume", tags=["resume"])
-parser = ResumeParser()
+# 文件大小限制（5MB）
+MAX_FILE_SIZE = settings.resume_max_file_size
+# multipart 边界和表单头的余量
+MULTIPART_OVERHEAD = 64 * 1024
 
-# 配置文件上传目录
-UPLOAD_DIR = "uploads/resumes"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+class UploadSizeLimitRoute(APIRoute):
+    """在解析请求体之前按 Content-Length 拒绝超大上传"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def limited_handler(request: Request):
+            content_length = request.headers.get("content-length")
+            if content_length and content_length.isdigit() \
+                    and int(content_length) > MAX_FILE_SIZE + MULTIPART_OVERHEAD:
+                raise HTTPException(status_code=413, detail="文件大小不能超过5MB")
+            return await handler(request)
+
+        return limited_handler
+
+
+router = APIRouter(prefix="/resume", tags=["resume"], route_class=UploadSizeLimitRoute)
 
 
 @router.post("/upload")
@@ -28,77 +52,159 @@ async def upload_resume(
     if not file.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="只支持PDF格式的简历")
 
-    # 验证文件大小（5MB限制）
-    MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail="文件大小不能超过5MB")
+    # 验证文件大小（5MB限制），已知大小时提前拒绝
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        raise HTTPException(status_code=413, detail="文件大小不能超过5MB")
 
-    # 生成唯一文件名
-    file_extension = os.path.splitext(file.filename)[1]
-    unique_filename = f"{current_user.id}_{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
+    # 分块接收文件并计算内容哈希
+    try:
+        content_hash, tmp_path, size = await resume_store.receive(file, MAX_FILE_SIZE)
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail="文件大小不能超过5MB")
 
-    # 保存文件
-    with open(file_path, "wb") as f:
-        f.write(content)
+    try:
+        async with async_session() as db:
+            result = await db.execute(
+                select(User.resume_hash, User.resume_url).where(User.id == current_user.id)
+            )
+            previous = result.first()
 
-    # 更新用户简历URL
-    async with async_session() as db:
-        await db.execute(
-            update(User)
-            .where(User.id == current_user.id)
-            .values(
-                resume_url=file_path,
-                resume_uploaded_at=datetime.utcnow(),
-                resume_data=None  # 清除旧的解析数据
+            # 相同内容只保存一份，引用计数 +1
+            blob = await resume_store.commit(db, content_hash, tmp_path, size)
+
+            # 更新用户简历URL；同一文件之前解析过则直接复用解析结果
+            await db.execute(
+                update(User)
+                .where(User.id == current_user.id)
+                .values(
+                    resume_url=blob.path,
+                    resume_hash=content_hash,
+                    resume_uploaded_at=datetime.utcnow(),
+                    resume_data=blob.parsed_data
+                )
             )
-        )
-        await db.commit()
+
+            # 释放旧简历的引用
+            if previous and previous.resume_hash:
+                await resume_store.release(db, previous.resume_hash)
+
+            await db.commit()
+    except BaseException:
+        # 临时文件还没放入存储时清理掉
+        await resume_store.discard(tmp_path)
+        raise
+    principal_cache.invalidate_user(current_user.id)
+
+    # 引用计数提交后再删除不再引用的文件
+    if previous and previous.resume_hash:
+        if previous.resume_hash != content_hash:
+            await resume_store.purge(previous.resume_hash)
+    elif previous and previous.resume_url:
+        await _remove_legacy_file(previous.resume_url)
+
+    # 未解析过的文件自动提交解析任务
+    parse_job = None
+    if blob.parsed_data is None:
+        parse_job = await _enqueue_parse(current_user.id, content_hash)
 
     return {
         "message": "简历上传成功",
-        "file_path": file_path,
-        "filename": file.filename
+        "file_path": blob.path,
+        "filename": file.filename,
+        "hash": content_hash,
+        "parsed": blob.parsed_data is not None,
+        "parse_job_id": parse_job.id if parse_job else None
     }
 
 
-@router.post("/parse")
-async def parse_resume(
-    current_user: User = Depends(get_current_user)
-):
-    """解析已上传的简历"""
+async def _remove_legacy_file(path: str) -> None:
+    """删除旧版按 uuid 命名的简历文件，忽略删除失败"""
+    try:
+        await asyncio.to_thread(os.remove, path)
+    except OSError:
+        pass
+
+
+async def _enqueue_parse(user_id: str, content_hash: Optional[str]):
+    """提交简历解析任务；同一用户同一文件的解析正在排队或运行时返回该任务
+
+    之前的任务已结束时（例如删除后重新上传，文件需要重新解析）提交新任务。
+    """
+    dedupe_key = f"resume_parse:{user_id}:{content_hash}" if content_hash else None
+    return await job_queue.enqueue(
+        "resume_parse",
+        payload={},
+        user_id=user_id,
+        dedupe_key=dedupe_key,
+    )
+
+
+@job_queue.handler("resume_parse")
+async def run_resume_parse(ctx: JobContext) -> dict:
+    """后台任务：解析用户当前的简历"""
+    parser = get_resume_parser()
     async with async_session() as db:
         result = await db.execute(
-            select(User).where(User.id == current_user.id)
+            select(User.resume_url, User.resume_hash).where(User.id == ctx.user_id)
         )
-        user = result.scalar_one_or_none()
+        user = result.first()
 
         if not user or not user.resume_url:
-            raise HTTPException(status_code=400, detail="请先上传简历")
+            raise ValueError("请先上传简历")
+
+        blob = await resume_store.get(db, user.resume_hash) if user.resume_hash else None
 
-        try:
-            # 从PDF提取文本
-            resume_text = parser.extract_text_from_pdf(user.resume_url)
+        if blob and blob.parsed_data is not None:
+            # 相同文件已解析过，跳过PDF提取和AI调用
+            resume_data = blob.parsed_data
+        else:
+            # 从PDF提取文本（进程池中执行），按文件哈希缓存
+            await ctx.progress(10, "正在提取简历文本")
+            if blob and blob.extracted_text is not None:
+                resume_text = blob.extracted_text
+            else:
+                resume_text = await parser.extract_text(user.resume_url)
+                if blob:
+                    blob.extracted_text = resume_text
+                    await db.commit()
 
             # 使用AI解析简历
+            await ctx.progress(40, "正在解析简历")
             resume_data = await parser.parse_resume(resume_text)
+            if blob:
+                blob.parsed_data = resume_data
 
-            # 更新用户简历数据
-            await db.execute(
-                update(User)
-                .where(User.id == current_user.id)
-                .values(resume_data=resume_data)
-            )
-            await db.commit()
+        # 更新用户简历数据（期间用户可能已换了简历，只写回同一份文件的结果）
+        await db.execute(
+            update(User)
+            .where(User.id == ctx.user_id)
+            .where(User.resume_url == user.resume_url)
+            .values(resume_data=resume_data)
+        )
+        await db.commit()
 
-            return {
-                "message": "简历解析成功",
-                "data": resume_data
-            }
+    return resume_data
 
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"简历解析失败: {str(e)}")
+
+@router.post("/parse", response_model=JobSubmitResponse)
+async def parse_resume(
+    current_user: User = Depends(get_current_user)
+):
+    """解析已上传的简历
+
+    解析在后台执行，立即返回任务ID；上传简历后会自动提交解析任务。
+    """
+    async with async_session() as db:
+        result = await db.execute(
+            select(User.resume_url, User.resume_hash).where(User.id == current_user.id)
+        )
+        user = result.first()
+
+        if not user or not user.resume_url:
+            raise HTTPException(status_code=400, detail="请先上传简历")
+
+    job = await _enqueue_parse(current_user.id, user.resume_hash)
+    return JobSubmitResponse(message="简历解析任务已提交", job_id=job.id, status=job.status)
 
 
 @router.get("")
@@ -136,12 +242,12 @@ async def delete_resume(
         if not user:
             raise HTTPException(status_code=404, detail="用户不存在")
 
-        # 删除文件
-        if user.resume_url and os.path.exists(user.resume_url):
-            try:
-                os.remove(user.resume_url)
-            except:
-                pass  # 忽略删除失败
+        # 下面的 update 会同步修改 user 对象，先记下文件
+        resume_hash, resume_url = user.resume_hash, user.resume_url
+
+        # 内容寻址的文件按引用计数释放
+        if resume_hash:
+            await resume_store.release(db, resume_hash)
 
         # 清除数据库记录
         await db.execute(
@@ -149,10 +255,18 @@ async def delete_resume(
             .where(User.id == current_user.id)
             .values(
                 resume_url=None,
+                resume_hash=None,
                 resume_data=None,
                 resume_uploaded_at=None
             )
         )
         await db.commit()
+        principal_cache.invalidate_user(current_user.id)
+
+        # 引用计数提交后再删除文件，旧版文件直接删除
+        if resume_hash:
+            await resume_store.purge(resume_hash)
+        elif resume_url:
+            await _remove_legacy_file(resume_url)
 
         return {"message": "简历已删除"}
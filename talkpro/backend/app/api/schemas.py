@@ -4,12 +4,14 @@ from typing import Optional, List
 
 # Algorithm Interview Schemas
 class AlgorithmStartRequest(BaseModel):
-    difficulty: str  # easy, medium, hard
+    difficulty: str  # easy, medium, hard, adaptive
 
 
 class AlgorithmAnswerRequest(BaseModel):
     content: str
     code: Optional[str] = None
+    codeDiff: Optional[str] = None  # unified diff against baseVersion, instead of code
+    baseVersion: Optional[int] = None
 
 
 class AlgorithmStartResponse(BaseModel):
@@ -21,6 +23,7 @@ class AlgorithmStartResponse(BaseModel):
 class AlgorithmAnswerResponse(BaseModel):
     reply: str
     completed: bool
+    codeVersion: Optional[int] = None
 
 
 # System Design Schemas
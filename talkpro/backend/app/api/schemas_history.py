@@ -50,3 +50,41 @@ class SessionDetailResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SessionHeaderResponse(BaseModel):
+    """会话概要（不含消息内容）"""
+    id: str
+    type: SessionType
+    scenario_id: Optional[str] = None
+    score: Optional[dict] = None
+    feedback: Optional[str] = None
+    status: SessionStatus
+    created_at: datetime
+    ended_at: Optional[datetime] = None
+    message_count: int
+
+    class Config:
+        from_attributes = True
+
+
+class SessionMessage(BaseModel):
+    """会话中的单条消息，seq 为消息在会话中的下标
+
+    消息上附带的其他字段（如 complexity、code_version）原样保留。
+    """
+    seq: int
+    role: str
+    content: str
+    timestamp: Optional[int] = None
+
+    class Config:
+        extra = "allow"
+
+
+class SessionMessagesPage(BaseModel):
+    """会话消息分页"""
+    session_id: str
+    total: int
+    messages: list[SessionMessage]
+    has_more: bool
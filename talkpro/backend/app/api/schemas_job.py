@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Optional
+
+from app.models.job import JobStatus
+
+
+class JobResponse(BaseModel):
+    """后台任务状态"""
+    id: str
+    type: str
+    status: JobStatus
+    progress: int
+    message: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class JobSubmitResponse(BaseModel):
+    """任务提交结果"""
+    message: str
+    job_id: str
+    status: JobStatus
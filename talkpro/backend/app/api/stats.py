@@ -4,9 +4,11 @@ from sqlalchemy import select, func
 from typing import Dict, Any
 from datetime import datetime, timedelta
 
-from ..core.database import async_session, User
-from ..models.interview import InterviewSession
-from ..dependencies import get_current_user
+from ..database import async_session
+from ..models.user import User
+from ..models.session import InterviewSession
+from .auth import get_current_user
+from ..services.skill_taxonomy import skill_taxonomy
 
 router = APIRouter(prefix="/stats", tags=["stats"])
 
@@ -161,11 +163,11 @@ async def get_recommendations(
 ) -> Dict[str, Any]:
     """获取个性化训练推荐（v2 - 基于简历和JD）"""
     async with async_session() as db:
-        # 获取用户数据
+        # 获取用户数据（只取推荐需要的简历和JD字段）
         result = await db.execute(
-            select(User).where(User.id == current_user.id)
+            select(User.resume_data, User.target_jd_data).where(User.id == current_user.id)
         )
-        user = result.scalar_one_or_none()
+        user = result.first()
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
@@ -176,17 +178,11 @@ async def get_recommendations(
 
         # 1. 基于简历推荐（如果有）
         if user.resume_data and user.resume_data.get('skills'):
-            skills = user.resume_data['skills']
-            all_skills = (
-                skills.get('programming_languages', []) +
-                skills.get('frameworks', []) +
-                skills.get('databases', []) +
-                skills.get('tools', [])
-            )
+            all_skills = skill_taxonomy.resume_skills(user.resume_data)
 
             # 识别薄弱技能（假设某些技能是热门但用户不具备）
             popular_skills = ['Go', 'Rust', 'Kubernetes', 'Spark', 'Flink']
-            missing_popular = [s for s in popular_skills if s not in all_skills]
+            missing_popular = skill_taxonomy.coverage(all_skills, popular_skills).missing_required
 
             if missing_popular:
                 recommendations.append({
@@ -201,22 +197,9 @@ async def get_recommendations(
         if user.target_jd_data:
             jd = user.target_jd_data
 
-            # 提取JD要求的技能
-            required_skills = jd.get('skills', {}).get('required', [])
-            preferred_skills = jd.get('skills', {}).get('preferred', [])
-
-            # 提取用户简历中的技能
-            resume_skills = []
-            if user.resume_data and user.resume_data.get('skills'):
-                resume_skills = (
-                    user.resume_data['skills'].get('programming_languages', []) +
-                    user.resume_data['skills'].get('frameworks', []) +
-                    user.resume_data['skills'].get('databases', [])
-                )
-
-            # 找出差距
-            missing_skills = [s for s in required_skills if s not in resume_skills]
-            matched_skills = [s for s in required_skills if s in resume_skills]
+            # 找出差距（同义词和上下级技能已归一化）
+            coverage = skill_taxonomy.jd_coverage(user.resume_data, jd)
+            missing_skills = coverage.missing_required
 
             if missing_skills:
                 # 推荐学习缺失的技能
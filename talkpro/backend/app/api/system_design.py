@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from app.api.schemas import (
     SystemDesignStartRequest,
     SystemDesignStartResponse,
@@ -8,17 +8,20 @@ from app.api.schemas import (
     ScenarioInfo,
 )
 from app.agents.system_design_agent import SystemDesignAgent
+from app.agents.registry import get_system_design_agent
 from app.models.session import InterviewSession, SessionStatus
 
 router = APIRouter(prefix="/api/system-design", tags=["system-design"])
-agent = SystemDesignAgent()
 
 # In-memory session storage
 sessions: dict[str, InterviewSession] = {}
 
 
 @router.post("/start", response_model=SystemDesignStartResponse)
-async def start_interview(request: SystemDesignStartRequest):
+async def start_interview(
+    request: SystemDesignStartRequest,
+    agent: SystemDesignAgent = Depends(get_system_design_agent),
+):
     """Start a system design interview"""
     try:
         session, scenario = await agent.start_interview(request.scenarioId)
@@ -35,7 +38,11 @@ async def start_interview(request: SystemDesignStartRequest):
 
 
 @router.post("/{session_id}/discuss", response_model=SystemDesignDiscussResponse)
-async def discuss_design(session_id: str, request: SystemDesignDiscussRequest):
+async def discuss_design(
+    session_id: str,
+    request: SystemDesignDiscussRequest,
+    agent: SystemDesignAgent = Depends(get_system_design_agent),
+):
     """Submit design discussion"""
     if session_id not in sessions:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -50,7 +57,7 @@ async def discuss_design(session_id: str, request: SystemDesignDiscussRequest):
 
 
 @router.post("/{session_id}/end", response_model=SystemDesignReport)
-async def end_interview(session_id: str):
+async def end_interview(session_id: str, agent: SystemDesignAgent = Depends(get_system_design_agent)):
     """End interview and get evaluation report"""
     if session_id not in sessions:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -68,7 +75,7 @@ async def end_interview(session_id: str):
 
 
 @router.get("/scenarios", response_model=list[ScenarioInfo])
-async def get_scenarios():
+async def get_scenarios(agent: SystemDesignAgent = Depends(get_system_design_agent)):
     """Get all available scenarios"""
     scenarios = []
     for s in agent.scenarios:
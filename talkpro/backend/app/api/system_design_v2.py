@@ -1,5 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import update
+from datetime import datetime
 
 from app.api.schemas import (
     SystemDesignStartRequest,
@@ -10,13 +12,16 @@ from app.api.schemas import (
     ScenarioInfo,
 )
 from app.agents.system_design_agent import SystemDesignAgent
+from app.agents.registry import get_system_design_agent
 from app.models.session import InterviewSession, SessionStatus
 from app.models.user import User
 from app.api.auth import get_current_user
 from app.database import async_session
+from app.services.report_jobs import enqueue_report, report_generator
+from app.services.job_queue import JobContext
+from app.api.schemas_job import JobSubmitResponse
 
 router = APIRouter(prefix="/api/system-design", tags=["system-design"])
-agent = SystemDesignAgent()
 
 # In-memory session storage
 sessions: dict[str, InterviewSession] = {}
@@ -26,6 +31,7 @@ sessions: dict[str, InterviewSession] = {}
 async def start_interview(
     request: SystemDesignStartRequest,
     current_user: User = Depends(get_current_user),
+    agent: SystemDesignAgent = Depends(get_system_design_agent),
 ):
     """Start a system design interview"""
     try:
@@ -48,6 +54,7 @@ async def discuss_design(
     session_id: str,
     request: SystemDesignDiscussRequest,
     current_user: User = Depends(get_current_user),
+    agent: SystemDesignAgent = Depends(get_system_design_agent),
 ):
     """Submit design discussion"""
     if session_id not in sessions:
@@ -66,40 +73,70 @@ async def discuss_design(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/{session_id}/end", response_model=SystemDesignReport)
+@router.post("/{session_id}/end", response_model=JobSubmitResponse)
 async def end_interview(
     session_id: str,
     current_user: User = Depends(get_current_user),
 ):
-    """End interview and get evaluation report"""
-    if session_id not in sessions:
+    """End interview; the report is generated in the background
+
+    Track the returned job via /api/jobs/{job_id}/events, its result is the
+    report. Calling again returns the same job.
+    """
+    session = sessions.get(session_id)
+    if session is None:
+        # Already ended (e.g. a retried request): look it up in the database
+        async with async_session() as db:
+            session = await db.get(InterviewSession, session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    session = sessions[session_id]
-
     # Verify session belongs to current user
     if session.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    session.status = SessionStatus.COMPLETED
-
-    try:
-        report = await agent.generate_report(session)
-        session.score = report
-        session.feedback = report.get("feedback", "")
+    if session.status != SessionStatus.COMPLETED:
+        session.status = SessionStatus.COMPLETED
+        session.ended_at = datetime.utcnow()
 
         # Save to database (persistence)
         async with async_session() as db:
-            db.add(session)
+            await db.merge(session)
             await db.commit()
+    sessions.pop(session_id, None)
+
+    job = await enqueue_report("system_design", session.id, current_user.id)
+    return JobSubmitResponse(message="Report is being generated", job_id=job.id, status=job.status)
+
+
+@report_generator("system_design")
+async def generate_system_design_report(session_id: str, ctx: JobContext) -> dict:
+    """Generate and save the system design report of an ended session"""
+    async with async_session() as db:
+        session = await db.get(InterviewSession, session_id)
+    if session is None:
+        raise ValueError(f"Session not found: {session_id}")
+    if session.score:
+        return session.score  # Retried job: the report was already saved
+
+    agent = get_system_design_agent()
+    report = SystemDesignReport(**(await agent.generate_report(session))).model_dump()
+    async with async_session() as db:
+        await db.execute(
+            update(InterviewSession)
+            .where(InterviewSession.id == session_id)
+            .values(score=report, feedback=report.get("feedback", ""))
+        )
+        await db.commit()
 
-        return SystemDesignReport(**report)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return report
 
 
 @router.get("/scenarios", response_model=list[ScenarioInfo])
-async def get_scenarios(current_user: User = Depends(get_current_user)):
+async def get_scenarios(
+    current_user: User = Depends(get_current_user),
+    agent: SystemDesignAgent = Depends(get_system_design_agent),
+):
     """Get all available scenarios"""
     scenarios = []
     for s in agent.scenarios:
@@ -1,10 +1,8 @@
-from fastapi import WebSocket, WebSocketDisconnect, WebSocketException
-from app.agents.algorithm_interviewer import AlgorithmInterviewer
-from app.agents.system_design_agent import SystemDesignAgent
-import json
-
-algorithm_agent = AlgorithmInterviewer()
-system_design_agent = SystemDesignAgent()
+from fastapi import WebSocket, WebSocketDisconnect
+from app.agents.registry import get_algorithm_agent, get_system_design_agent
+from app.agents.stage_tracker import StageTagFilter
+from app.services.code_versions import CodeConflictError
+from app.models.session import InterviewSession
 
 
 async def handle_algorithm_websocket(websocket: WebSocket, session_id: str):
@@ -18,7 +16,16 @@ async def handle_algorithm_websocket(websocket: WebSocket, session_id: str):
         await websocket.close()
         return
 
-    session = sessions[session_id]
+    await serve_algorithm_session(websocket, sessions[session_id])
+
+
+async def serve_algorithm_session(websocket: WebSocket, session: InterviewSession):
+    """Answer the candidate's messages on an accepted websocket until it disconnects
+
+    Code arrives in full or as a diff against an accepted version; the judge
+    verdict and complexity profile are sent before the streamed reply.
+    """
+    algorithm_agent = get_algorithm_agent()
 
     try:
         while True:
@@ -26,13 +33,38 @@ async def handle_algorithm_websocket(websocket: WebSocket, session_id: str):
             data = await websocket.receive_json()
             content = data.get("content", "")
             code = data.get("code", None)
+            code_diff = data.get("code_diff", None)
+
+            submission = None
+            if code is not None or code_diff is not None:
+                try:
+                    submission = await algorithm_agent.submit_code(
+                        session, code=code, diff=code_diff, base_version=data.get("base_version")
+                    )
+                except CodeConflictError as e:
+                    # The client resends the full code along with the answer
+                    await websocket.send_json({
+                        "type": "code_conflict",
+                        "version": e.latest_version,
+                        "message": str(e),
+                    })
+                    continue
+                await websocket.send_json({"type": "code_accepted", "version": submission.version})
+                code = submission.code
+
+            verdict = await algorithm_agent.judge_code(session, code) if code else None
+            if verdict:
+                await websocket.send_json({"type": "judge_result", "verdict": verdict.to_dict()})
+            profile = await algorithm_agent.profile_code(session, code, content, verdict)
+            if profile:
+                await websocket.send_json({"type": "complexity_profile", "profile": profile.to_dict()})
 
             # Stream response
             await websocket.send_json({"type": "message_start"})
 
             full_response = ""
             async for chunk in algorithm_agent.claude.send_message_stream(
-                algorithm_agent._build_conversation(session, content, code)
+                algorithm_agent._build_conversation(session, content, submission, verdict, profile)
             ):
                 full_response += chunk
                 await websocket.send_json({
@@ -44,7 +76,7 @@ async def handle_algorithm_websocket(websocket: WebSocket, session_id: str):
             is_complete = "INTERVIEW_COMPLETE" in full_response
 
             # Update session
-            session.messages.append({"role": "user", "content": content})
+            session.messages.append(algorithm_agent.user_turn(content, profile, submission))
             session.messages.append({"role": "assistant", "content": full_response})
 
             await websocket.send_json({
@@ -54,7 +86,7 @@ async def handle_algorithm_websocket(websocket: WebSocket, session_id: str):
             })
 
     except WebSocketDisconnect:
-        print(f"WebSocket disconnected: {session_id}")
+        print(f"WebSocket disconnected: {session.id}")
     except Exception as e:
         await websocket.send_json({"type": "error", "message": str(e)})
         await websocket.close()
@@ -72,6 +104,7 @@ async def handle_system_design_websocket(websocket: WebSocket, session_id: str):
         return
 
     session = sessions[session_id]
+    system_design_agent = get_system_design_agent()
 
     try:
         while True:
@@ -90,21 +123,25 @@ async def handle_system_design_websocket(websocket: WebSocket, session_id: str):
             messages.append({"role": "user", "content": content})
 
             full_response = ""
+            # Hide the model's stage tag from the streamed text
+            tag_filter = StageTagFilter()
             async for chunk in system_design_agent.claude.send_message_stream(
                 "\n".join([m["content"] for m in messages])
             ):
                 full_response += chunk
-                await websocket.send_json({
-                    "type": "message_chunk",
-                    "content": chunk
-                })
-
-            # Determine stage
-            stage = system_design_agent._determine_stage(
-                session.messages + [
-                    {"role": "user", "content": content},
-                    {"role": "assistant", "content": full_response}
-                ]
+                visible = tag_filter.feed(chunk)
+                if visible:
+                    await websocket.send_json({
+                        "type": "message_chunk",
+                        "content": visible
+                    })
+            tail = tag_filter.flush()
+            if tail:
+                await websocket.send_json({"type": "message_chunk", "content": tail})
+
+            # Update stage with the new turn only
+            full_response, stage = system_design_agent.track_stage(
+                session, content, full_response, tag_filter.stage
             )
 
             # Update session
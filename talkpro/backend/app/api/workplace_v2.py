@@ -1,18 +1,21 @@
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import Optional
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, HTTPException
+from sqlalchemy import select, update
 from pydantic import BaseModel
+from datetime import datetime
 import uuid
-import json
 
-from ..core.database import async_session, User
-from ..models.interview import InterviewSession, SessionType
+from ..database import async_session
+from ..models.user import User
+from ..models.session import InterviewSession, SessionType, SessionStatus
 from ..agents.workplace_agent import WorkplaceAgent
-from ..dependencies import get_current_user
+from ..agents.registry import get_workplace_agent
+from .auth import authenticate_token, get_current_user
+from .schemas_job import JobSubmitResponse
+from ..models.job import JobStatus
+from ..services.job_queue import job_queue, JobContext
+from ..services.report_jobs import enqueue_report, report_generator
 
 router = APIRouter(prefix="/workplace/v2", tags=["workplace"])
-agent = WorkplaceAgent()
 
 
 class InterviewRequest(BaseModel):
@@ -20,7 +23,10 @@ class InterviewRequest(BaseModel):
 
 
 @router.get("/scenarios")
-async def get_scenarios(current_user: User = Depends(get_current_user)):
+async def get_scenarios(
+    current_user: User = Depends(get_current_user),
+    agent: WorkplaceAgent = Depends(get_workplace_agent),
+):
     """获取所有职场场景"""
     scenarios = agent.get_scenarios()
     return {
@@ -39,7 +45,8 @@ async def get_scenarios(current_user: User = Depends(get_current_user)):
 @router.post("/interview")
 async def start_interview(
     request: InterviewRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    agent: WorkplaceAgent = Depends(get_workplace_agent),
 ):
     """开始职场场景面试"""
     try:
@@ -54,8 +61,7 @@ async def start_interview(
             id=str(uuid.uuid4()),
             user_id=current_user.id,
             type=SessionType.WORKPLACE,
-            scenario=request.scenario,
-            requirements=result["requirements"],
+            scenario_id=request.scenario,
             messages=[
                 {
                     "role": "assistant",
@@ -63,7 +69,6 @@ async def start_interview(
                     "timestamp": int(datetime.now().timestamp() * 1000)
                 }
             ],
-            is_completed=False
         )
 
         async with async_session() as db:
@@ -88,7 +93,11 @@ async def start_interview(
 
 
 @router.websocket("/{session_id}/ws")
-async def websocket_endpoint(websocket: WebSocket, session_id: str):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    session_id: str,
+    agent: WorkplaceAgent = Depends(get_workplace_agent),
+):
     """WebSocket连接用于实时对话"""
     await websocket.accept()
 
@@ -101,32 +110,26 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             await websocket.close()
             return
 
-        # 获取用户
-        from ..core.security import decode_access_token
-        payload = decode_access_token(token)
-        if not payload or "sub" not in payload:
+        # 获取用户（走 Principal 缓存，不查询完整用户资料）
+        principal = await authenticate_token(token)
+        if not principal:
             await websocket.send_json({"type": "error", "message": "Invalid token"})
             await websocket.close()
             return
 
-        email = payload["sub"]
-
         # 获取会话
         async with async_session() as db:
             result = await db.execute(
-                select(InterviewSession, User)
-                .join(User, InterviewSession.user_id == User.id)
+                select(InterviewSession)
                 .where(InterviewSession.id == session_id)
-                .where(User.email == email)
+                .where(InterviewSession.user_id == principal.id)
             )
-            row = result.first()
-            if not row:
+            session = result.scalar_one_or_none()
+            if not session:
                 await websocket.send_json({"type": "error", "message": "Session not found"})
                 await websocket.close()
                 return
 
-            session, user = row
-
         # 接收消息并发送回复
         async with async_session() as db:
             while True:
@@ -138,12 +141,12 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                     if not user_message:
                         continue
 
-                    # 添加用户消息到历史
-                    session.messages.append({
+                    # 添加用户消息到历史（整体赋值，JSON 列的原地修改不会被保存）
+                    session.messages = [*session.messages, {
                         "role": "user",
                         "content": user_message,
                         "timestamp": int(datetime.now().timestamp() * 1000)
-                    })
+                    }]
 
                     # 发送开始标记
                     await websocket.send_json({
@@ -153,7 +156,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
 
                     # 调用Agent获取回复
                     response = await agent.chat(
-                        scenario_id=session.scenario,
+                        scenario_id=session.scenario_id,
                         message=user_message,
                         conversation_history=session.messages
                     )
@@ -168,11 +171,11 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                         })
 
                     # 添加助手消息到历史
-                    session.messages.append({
+                    session.messages = [*session.messages, {
                         "role": "assistant",
                         "content": content,
                         "timestamp": int(datetime.now().timestamp() * 1000)
-                    })
+                    }]
 
                     # 发送完成标记
                     await websocket.send_json({
@@ -187,26 +190,31 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                     await db.commit()
 
                 elif message_type == "end":
-                    # 用户结束对话，生成评估
-                    await websocket.send_json({"type": "evaluating"})
-
-                    evaluation = await agent.end_interview(
-                        scenario_id=session.scenario,
-                        conversation_history=session.messages
-                    )
-
-                    # 更新会话
-                    session.score = evaluation
-                    session.is_completed = True
-                    session.completed_at = datetime.now()
-
-                    db.add(session)
-                    await db.commit()
-
-                    await websocket.send_json({
-                        "type": "session_complete",
-                        "evaluation": evaluation
-                    })
+                    # 用户结束对话：标记完成，评估在后台生成
+                    if session.status != SessionStatus.COMPLETED:
+                        session.status = SessionStatus.COMPLETED
+                        session.ended_at = datetime.utcnow()
+                        db.add(session)
+                        await db.commit()
+
+                    job = await enqueue_report("workplace", session.id, principal.id)
+                    await websocket.send_json({"type": "evaluating", "job_id": job.id})
+
+                    # 报告片段边生成边推送，最后一帧是校验后的完整报告
+                    async for event in job_queue.events(job.id):
+                        if "partial" in event:
+                            await websocket.send_json(event["partial"])
+                        elif event["status"] == JobStatus.SUCCEEDED.value:
+                            await websocket.send_json({
+                                "type": "session_complete",
+                                "evaluation": event["result"]
+                            })
+                        elif event["status"] == JobStatus.FAILED.value:
+                            await websocket.send_json({
+                                "type": "error",
+                                "message": event["error"] or "评估生成失败",
+                                "job_id": job.id
+                            })
 
                     break
 
@@ -217,12 +225,15 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         await websocket.send_json({"type": "error", "message": str(e)})
 
 
-@router.post("/{session_id}/end")
+@router.post("/{session_id}/end", response_model=JobSubmitResponse)
 async def end_interview(
     session_id: str,
     current_user: User = Depends(get_current_user)
 ):
-    """结束面试并获取评估报告"""
+    """结束面试，评估报告在后台生成
+
+    通过 /api/jobs/{job_id}/events 获取结果（任务结果即报告），重复调用返回同一个任务。
+    """
     async with async_session() as db:
         result = await db.execute(
             select(InterviewSession)
@@ -234,21 +245,44 @@ async def end_interview(
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
 
-        # 如果还没有评分，生成评估
-        if not session.score:
-            evaluation = await agent.end_interview(
-                scenario_id=session.scenario,
-                conversation_history=session.messages
-            )
-            session.score = evaluation
-            session.is_completed = True
-            session.completed_at = datetime.now()
-
+        if session.status != SessionStatus.COMPLETED:
+            session.status = SessionStatus.COMPLETED
+            session.ended_at = datetime.utcnow()
             db.add(session)
             await db.commit()
 
-        return session.score
+    job = await enqueue_report("workplace", session_id, current_user.id)
+    return JobSubmitResponse(message="评估报告生成中", job_id=job.id, status=job.status)
 
 
-# Import datetime at module level
-from datetime import datetime
+@report_generator("workplace")
+async def generate_workplace_report(session_id: str, ctx: JobContext) -> dict:
+    """流式生成并保存已结束会话的评估报告，片段通过任务事件推送"""
+    async with async_session() as db:
+        session = await db.get(InterviewSession, session_id)
+    if not session:
+        raise ValueError(f"Session not found: {session_id}")
+    if session.score:
+        return session.score  # 任务重试：报告已保存过
+
+    async def on_frame(frame: dict) -> None:
+        ctx.emit(frame)
+
+    # 重试时前端据此清空上一次收到的片段
+    ctx.emit({"type": "report_start", "attempt": ctx.attempt})
+    evaluation = await get_workplace_agent().stream_evaluation(
+        scenario_id=session.scenario_id,
+        conversation_history=session.messages,
+        on_frame=on_frame
+    )
+
+    async with async_session() as db:
+        await db.execute(
+            update(InterviewSession)
+            .where(InterviewSession.id == session_id)
+            .values(score=evaluation)
+        )
+        await db.commit()
+
+    return evaluation
+
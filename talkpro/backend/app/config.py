@@ -1,5 +1,10 @@
+from pathlib import Path
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# 数据文件目录（题库、场景、技能词典），不依赖启动时的工作目录
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
@@ -12,6 +17,64 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24  # 24 hours
 
+    # Password hashing
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 64  # 超过后直接拒绝，避免登录风暴堆积
+    password_hash_timeout_seconds: float = 10.0
+
+    # Auth principal cache
+    principal_cache_ttl_seconds: int = 60
+    principal_cache_max_size: int = 10000
+
+    # Resume upload / PDF extraction
+    resume_max_file_size: int = 5 * 1024 * 1024  # 5MB
+    pdf_extract_workers: int = 2
+    pdf_pages_per_task: int = 8  # 超过该页数的 PDF 按页分片并行提取
+    pdf_extract_timeout_seconds: float = 30.0
+
+    # Resume parsing
+    resume_llm_max_chars: int = 6000  # 发送给模型的剩余文本上限
+
+    # JD analysis
+    jd_analyze_concurrency: int = 4  # 同时进行的JD分析模型调用
+    jd_batch_max_items: int = 50
+    jd_minhash_permutations: int = 128
+    jd_lsh_bands: int = 16  # 每段 permutations / bands 行
+    jd_near_duplicate_threshold: float = 0.85  # 估计 Jaccard 相似度达到该值时复用已有分析
+
+    # Workplace scenarios
+    workplace_opener_variety: int = 3  # 每个场景保留的不同开场白数量
+    workplace_opener_ttl_minutes: int = 360  # 开场白过期后在后台重新生成
+
+    # Adaptive question selection
+    calibration_interval_minutes: int = 60  # 同一时间段内最多执行一次全量校准
+    elo_k_factor: float = 0.4  # 每次面试后在线更新的步长
+
+    # Code judge
+    judge_workers: int = 4  # 预先启动的判题子进程，也是同时运行的用例数
+    judge_cpu_seconds: int = 2  # 单个用例的 CPU 时间上限
+    judge_memory_mb: int = 256  # 单个用例的地址空间上限
+    judge_wall_seconds: float = 5.0
+    complexity_profile_seconds: float = 2.0  # 复杂度测量的耗时预算
+
+    # Background jobs
+    job_max_concurrency: int = 8  # 全部类型合计
+    job_default_concurrency: int = 2  # 单个任务类型
+    job_poll_interval_seconds: float = 1.0
+    job_retry_base_seconds: float = 2.0
+    report_generate_concurrency: int = 4  # 同时生成的面试报告
+
+    # Health checks（/readyz 超过以下上限时报告未就绪，提前把流量分给其他实例）
+    readiness_db_timeout_seconds: float = 1.0
+    readiness_cache_seconds: float = 1.0  # 探针频繁轮询时复用上一次的检查结果
+    readiness_max_loop_lag_ms: float = 250.0
+    readiness_max_job_queue_depth: int = 200
+    readiness_max_llm_in_flight: int = 64
+    readiness_max_websockets: int = 1000
+    loop_lag_interval_seconds: float = 0.05  # 采样间隔，也是慢回调检测的精度
+    slow_callback_threshold_ms: float = 100.0  # 事件循环被阻塞超过该时长时记录调用栈
+
     # App
     app_name: str = "TalkPro"
     debug: bool = True
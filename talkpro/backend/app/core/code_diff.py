@@ -0,0 +1,125 @@
+import difflib
+import re
+from typing import List, Tuple
+
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+NO_NEWLINE = "\\ No newline at end of file"
+
+
+class PatchError(ValueError):
+    """补丁格式错误或与基准版本不匹配"""
+
+
+def _split(text: str) -> List[str]:
+    return text.splitlines(keepends=True)
+
+
+def unified_diff(old: str, new: str, context: int = 3) -> str:
+    """生成 old -> new 的 unified diff（无改动时为空字符串）"""
+    lines = []
+    for line in difflib.unified_diff(_split(old), _split(new), "a", "b", n=context):
+        lines.append(line)
+        if not line.endswith("\n"):
+            lines.append("\n" + NO_NEWLINE + "\n")
+    return "".join(lines)
+
+
+def apply_unified_diff(base: str, diff: str) -> str:
+    """把 unified diff 应用到 base 上
+
+    上下文行和删除行必须与 base 完全一致，否则抛出 PatchError，
+    不做模糊匹配：基准不一致时应由客户端重新提交完整代码。
+    """
+    source = _split(base)
+    result: List[str] = []
+    pos = 0  # source 中下一行的下标
+    lines = diff.splitlines(keepends=True)
+    i = 0
+
+    while i < len(lines):
+        m = _HUNK_RE.match(lines[i])
+        if not m:
+            if lines[i].startswith(("---", "+++", "diff ", "index ")) or not lines[i].strip():
+                i += 1
+                continue
+            raise PatchError(f"无法识别的补丁行: {lines[i].rstrip()}")
+
+        old_start, old_count = int(m.group(1)), int(m.group(2) or 1)
+        new_count = int(m.group(4) or 1)
+        # 空的一侧起始行号指向其前一行
+        hunk_start = old_start - 1 if old_count else old_start
+        if hunk_start < pos or hunk_start > len(source):
+            raise PatchError(f"补丁位置超出范围: {lines[i].rstrip()}")
+        result.extend(source[pos:hunk_start])
+        pos = hunk_start
+        i += 1
+
+        old_seen = new_seen = 0
+        while i < len(lines) and (old_seen < old_count or new_seen < new_count):
+            line = lines[i]
+            tag, body = line[:1], line[1:]
+            if tag in (" ", "-"):
+                if pos >= len(source) or source[pos].rstrip("\r\n") != body.rstrip("\r\n"):
+                    raise PatchError(f"第 {pos + 1} 行与基准版本不一致")
+                if tag == " ":
+                    result.append(source[pos])
+                    new_seen += 1
+                pos += 1
+                old_seen += 1
+            elif tag == "+":
+                result.append(body)
+                new_seen += 1
+            elif line.rstrip("\r\n") == "":
+                # 部分编辑器会去掉空上下文行前面的空格
+                if pos >= len(source) or source[pos].strip():
+                    raise PatchError(f"第 {pos + 1} 行与基准版本不一致")
+                result.append(source[pos])
+                pos += 1
+                old_seen += 1
+                new_seen += 1
+            else:
+                raise PatchError(f"无法识别的补丁行: {line.rstrip()}")
+            i += 1
+            if i < len(lines) and lines[i].startswith("\\"):
+                # 上一行在文件末尾且没有换行
+                if tag in (" ", "+"):
+                    result[-1] = result[-1].rstrip("\r\n")
+                i += 1
+
+        if old_seen != old_count or new_seen != new_count:
+            raise PatchError("补丁块行数与头部不符")
+
+    result.extend(source[pos:])
+    return "".join(result)
+
+
+def change_stats(old: str, new: str) -> Tuple[int, int, List[Tuple[int, int]]]:
+    """新增行数、删除行数和新版本中改动的行范围（从 1 开始，闭区间）"""
+    matcher = difflib.SequenceMatcher(None, _split(old), _split(new), autojunk=False)
+    added = removed = 0
+    ranges: List[Tuple[int, int]] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        removed += i2 - i1
+        added += j2 - j1
+        if j2 > j1:
+            ranges.append((j1 + 1, j2))
+    return added, removed, ranges
+
+
+def summarize_change(old: str, new: str, max_ranges: int = 4) -> str:
+    """一句话描述改动，例如 "+3/-1 lines (lines 4-6, 12)" """
+    return format_change(*change_stats(old, new), max_ranges=max_ranges)
+
+
+def format_change(added: int, removed: int, ranges: List[Tuple[int, int]], max_ranges: int = 4) -> str:
+    if not added and not removed:
+        return "no changes"
+    text = f"+{added}/-{removed} lines"
+    if ranges:
+        shown = ", ".join(f"{a}-{b}" if a != b else str(a) for a, b in ranges[:max_ranges])
+        if len(ranges) > max_ranges:
+            shown += ", ..."
+        text += f" (lines {shown})"
+    return text
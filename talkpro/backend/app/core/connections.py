@@ -0,0 +1,140 @@
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.core.metrics import metrics
+
+
+class ConnectionCounter:
+    """当前打开的 websocket 连接数"""
+
+    def __init__(self):
+        self.websockets = 0
+
+
+connections = ConnectionCounter()
+
+# 请求耗时的分桶：普通接口在百毫秒以内，流式接口会持续到模型输出结束
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+http_requests = metrics.counter(
+    "talkpro_http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+)
+http_duration = metrics.histogram(
+    "talkpro_http_request_duration_seconds",
+    "HTTP request latency by route template, until the response body is fully sent",
+    ("method", "route"),
+    buckets=HTTP_BUCKETS,
+)
+ws_open = metrics.gauge("talkpro_websocket_connections", "Open websocket connections", ("endpoint",))
+ws_accepted = metrics.counter(
+    "talkpro_websocket_connections_total", "Accepted websocket connections", ("endpoint",)
+)
+ws_frames = metrics.counter(
+    "talkpro_websocket_frames_total", "Websocket frames", ("endpoint", "direction")
+)
+ws_bytes = metrics.counter(
+    "talkpro_websocket_bytes_total", "Websocket payload bytes", ("endpoint", "direction")
+)
+
+UNMATCHED = "unmatched"
+
+
+def _payload_size(message: Dict[str, Any]) -> int:
+    if message.get("bytes") is not None:
+        return len(message["bytes"])
+    text = message.get("text")
+    return len(text.encode()) if text else 0
+
+
+class MetricsMiddleware:
+    """ASGI 中间件：按路由模板统计 HTTP 请求、按端点统计 websocket 连接与收发，
+    不需要改动各个处理函数
+
+    路由模板（而不是实际路径）作为标签，session_id 之类的路径参数不会让序列数膨胀。
+    路由匹配发生在内层，匹配结果写回同一个 scope，因此在请求结束（HTTP）或
+    第一次收发（websocket）时再读取。
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._paths: Dict[Callable, str] = {}
+
+    def _route(self, scope) -> str:
+        route = scope.get("route")
+        if route is not None:
+            return route.path
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED
+        path = self._paths.get(endpoint)
+        if path is None:
+            self._paths = {
+                getattr(route, "endpoint", None): route.path
+                for route in scope["app"].routes
+                if hasattr(route, "path")
+            }
+            path = self._paths.setdefault(endpoint, UNMATCHED)
+        return path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            await self._http(scope, receive, send)
+        elif scope["type"] == "websocket":
+            await self._websocket(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def _http(self, scope, receive, send):
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = self._route(scope)
+            http_duration.observe(time.perf_counter() - started, scope["method"], route)
+            http_requests.inc(scope["method"], route, status)
+
+    async def _websocket(self, scope, receive, send):
+        endpoint: Optional[str] = None
+        accepted = False
+
+        def current_endpoint() -> str:
+            nonlocal endpoint
+            if endpoint is None:
+                endpoint = self._route(scope)
+            return endpoint
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "websocket.receive":
+                name = current_endpoint()
+                ws_frames.inc(name, "in")
+                ws_bytes.inc(name, "in", amount=_payload_size(message))
+            return message
+
+        async def counting_send(message):
+            nonlocal accepted
+            if message["type"] == "websocket.send":
+                name = current_endpoint()
+                ws_frames.inc(name, "out")
+                ws_bytes.inc(name, "out", amount=_payload_size(message))
+            elif message["type"] == "websocket.accept" and not accepted:
+                accepted = True
+                ws_open.inc(current_endpoint())
+                ws_accepted.inc(current_endpoint())
+            await send(message)
+
+        connections.websockets += 1
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            connections.websockets -= 1
+            if accepted:
+                ws_open.dec(current_endpoint())
@@ -0,0 +1,124 @@
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+
+@dataclass(frozen=True)
+class JSONFieldEvent:
+    """流式解析出的一个完整片段
+
+    kind 为 "field"（顶层字段的完整值）或 "item"（顶层数组字段中的一个元素）。
+    """
+    kind: str
+    key: str
+    value: Any
+
+
+class JSONFieldStream:
+    """增量解析模型流式输出的 JSON 对象
+
+    逐块喂入文本，每当顶层字段的值或顶层数组的元素完整时立即产出，
+    不必等整个 JSON 结束。只跟踪括号深度和字符串状态，每个字符只看一次；
+    完整片段再交给 json.loads 解析。对象之前的说明文字会被跳过。
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []  # 当前顶层对象从 "{" 开始的文本
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self.done = False
+
+        self._key: Optional[str] = None
+        self._key_start: Optional[int] = None
+        self._value_start: Optional[int] = None
+        self._item_start: Optional[int] = None
+        self._array_value = False
+
+    def _text(self, start: int, end: int) -> str:
+        return "".join(self._buffer[start:end])
+
+    def _parse(self, start: int, end: int) -> Any:
+        return json.loads(self._text(start, end))
+
+    def feed(self, chunk: str) -> List[JSONFieldEvent]:
+        events: List[JSONFieldEvent] = []
+        for ch in chunk:
+            if self.done:
+                break
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                    self._buffer.append(ch)
+                continue
+
+            pos = len(self._buffer)
+            self._buffer.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key is None and self._key_start is not None:
+                        self._key = self._parse(self._key_start, pos + 1)
+                        self._key_start = None
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None and self._value_start is None:
+                    self._key_start = pos
+                elif self._array_value and self._depth == 2 and self._item_start is None:
+                    self._item_start = pos
+            elif ch == ":" and self._depth == 1 and self._key is not None and self._value_start is None:
+                self._value_start = pos + 1
+            elif ch in "{[":
+                if self._depth == 1 and self._value_start is not None and not self._text(self._value_start, pos).strip():
+                    self._array_value = ch == "["
+                elif self._array_value and self._depth == 2 and self._item_start is None:
+                    self._item_start = pos
+                self._depth += 1
+            elif ch in "}]":
+                if self._array_value and self._depth == 2:
+                    self._emit_item(events, pos)
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit_field(events, pos)
+                    self.done = True
+            elif ch == ",":
+                if self._depth == 1:
+                    self._emit_field(events, pos)
+                elif self._array_value and self._depth == 2:
+                    self._emit_item(events, pos)
+            elif self._array_value and self._depth == 2 and self._item_start is None and not ch.isspace():
+                self._item_start = pos  # 数字、true/false/null 元素
+        return events
+
+    def _emit_item(self, events: List[JSONFieldEvent], end: int) -> None:
+        if self._item_start is not None:
+            try:
+                events.append(JSONFieldEvent("item", self._key, self._parse(self._item_start, end)))
+            except ValueError:
+                pass  # 不完整或非法的元素跳过，整体结果以最终解析为准
+            self._item_start = None
+
+    def _emit_field(self, events: List[JSONFieldEvent], end: int) -> None:
+        if self._key is not None and self._value_start is not None:
+            try:
+                events.append(JSONFieldEvent("field", self._key, self._parse(self._value_start, end)))
+            except ValueError:
+                pass
+        self._key = None
+        self._value_start = None
+        self._item_start = None
+        self._array_value = False
+
+    @property
+    def text(self) -> str:
+        """目前收到的 JSON 对象文本"""
+        return "".join(self._buffer)
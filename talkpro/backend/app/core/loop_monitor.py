@@ -0,0 +1,152 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from app.config import settings
+from app.core.metrics import metrics
+
+# 只保留提交代码所在的栈帧，去掉事件循环本身的调度帧
+_LOOP_INTERNALS = ("/asyncio/", "/uvicorn/", "/starlette/", "/anyio/")
+
+
+@dataclass
+class SlowCallback:
+    """事件循环被单个回调占住超过阈值的一次记录"""
+    detected_at: datetime
+    duration_ms: float  # 检测时为已阻塞的时长，恢复后更新为实际时长
+    stack: List[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "detected_at": self.detected_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 1),
+            "stack": self.stack,
+        }
+
+
+class LoopLagMonitor:
+    """事件循环延迟采样和慢回调检测
+
+    每隔 interval 秒 sleep 一次，实际醒来时间比预期晚的部分即为延迟：
+    同步代码或 CPU 密集任务占住事件循环时，所有请求都会被同样拖慢。
+    保留最近 window_seconds 内的样本，就绪检查取其中的最大值，单次尖峰不会
+    被漏掉，恢复后也会在一个窗口内重新就绪。
+
+    另有一个看门狗线程：事件循环超过 slow_threshold 秒没有按时醒来时，
+    抓取事件循环线程当前的调用栈，即正在阻塞的代码。延迟样本和慢回调时长
+    记入直方图。
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        slow_threshold: float,
+        window_seconds: float = 5.0,
+        max_slow_callbacks: int = 20,
+    ):
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self._samples: Deque[float] = deque(maxlen=max(1, round(window_seconds / interval)))
+        self._task: Optional[asyncio.Task] = None
+
+        self.lag_seconds = metrics.histogram(
+            "talkpro_event_loop_lag_seconds", "Event loop wake-up delay, sampled periodically"
+        )
+        self.slow_callback_seconds = metrics.histogram(
+            "talkpro_event_loop_slow_callback_seconds",
+            f"Duration of callbacks that blocked the event loop for more than {slow_threshold}s",
+        )
+        self.slow_callbacks: Deque[SlowCallback] = deque(maxlen=max_slow_callbacks)
+
+        # 看门狗线程与事件循环共享的状态
+        self._loop_thread_id: Optional[int] = None
+        self._expected_wake = 0.0
+        self._stalled: Optional[SlowCallback] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def lag_ms(self) -> float:
+        """最近一次采样的延迟"""
+        return self._samples[-1] if self._samples else 0.0
+
+    @property
+    def recent_max_ms(self) -> float:
+        return max(self._samples, default=0.0)
+
+    async def _run(self) -> None:
+        while True:
+            self._expected_wake = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - self._expected_wake)
+            self._samples.append(lag * 1000)
+            self.lag_seconds.observe(lag)
+
+            with self._lock:
+                stalled, self._stalled = self._stalled, None
+            if stalled is not None:
+                stalled.duration_ms = lag * 1000
+                self.slow_callback_seconds.observe(lag)
+                print(f"Event loop blocked for {lag * 1000:.0f}ms:\n" + "".join(stalled.stack))
+
+    def _capture_stack(self) -> List[str]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return []
+        stack = traceback.format_stack(frame)
+        own = [line for line in stack if not any(part in line for part in _LOOP_INTERNALS)]
+        return own or stack
+
+    def _watch(self) -> None:
+        poll = max(0.01, self.slow_threshold / 2)
+        while not self._stop.wait(poll):
+            blocked = time.perf_counter() - self._expected_wake
+            if blocked < self.slow_threshold:
+                continue
+            with self._lock:
+                if self._stalled is None:
+                    self._stalled = SlowCallback(
+                        detected_at=datetime.utcnow(),
+                        duration_ms=blocked * 1000,
+                        stack=self._capture_stack(),
+                    )
+                    self.slow_callbacks.append(self._stalled)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._loop_thread_id = threading.get_ident()
+            self._expected_wake = time.perf_counter() + self.interval
+            self._task = asyncio.create_task(self._run())
+            self._stop.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._stop.set()
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "lag_ms": round(self.lag_ms, 1),
+            "recent_max_lag_ms": round(self.recent_max_ms, 1),
+            "slow_threshold_ms": self.slow_threshold * 1000,
+            "lag_seconds": self.lag_seconds.snapshot(),
+            "slow_callback_seconds": self.slow_callback_seconds.snapshot(),
+            "slow_callbacks": [callback.to_dict() for callback in reversed(self.slow_callbacks)],
+        }
+
+
+loop_monitor = LoopLagMonitor(
+    settings.loop_lag_interval_seconds,
+    slow_threshold=settings.slow_callback_threshold_ms / 1000,
+)
@@ -0,0 +1,194 @@
+import bisect
+import inspect
+import threading
+from typing import Awaitable, Callable, Dict, Iterable, List, Sequence, Tuple, Union
+
+# 以秒为单位的默认分桶，覆盖 1ms 到 10s
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+class Metric:
+    """带标签的指标；标签值按 labels 的顺序以位置参数传入"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+
+    def _lines(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def expose(self) -> List[str]:
+        """Prometheus 文本格式"""
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}", *self._lines()]
+
+
+class Counter(Metric):
+    """单调递增计数；只在事件循环线程中修改，不加锁"""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def set(self, value: float, *label_values: str) -> None:
+        """直接设置累计值（由已有计数转换而来的指标）"""
+        self._values[label_values] = value
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def _lines(self) -> Iterable[str]:
+        for label_values, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """可增可减的当前值"""
+
+    type = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(Metric):
+    """累计分桶直方图（与 Prometheus histogram 的语义一致），可以在任意线程中 observe"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # 标签值 -> [各分桶计数（最后一个是 +Inf）, 总和]
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1][0] += value
+
+    def cumulative(self, *label_values: str) -> Tuple[List[int], float]:
+        """各分桶（含 +Inf）的累计计数和总和"""
+        with self._lock:
+            series = self._series.get(label_values)
+            counts, total = (list(series[0]), series[1][0]) if series else ([0] * (len(self.buckets) + 1), 0.0)
+        running, result = 0, []
+        for count in counts:
+            running += count
+            result.append(running)
+        return result, total
+
+    def snapshot(self, *label_values: str) -> Dict[str, object]:
+        cumulative, total = self.cumulative(*label_values)
+        return {
+            "count": cumulative[-1],
+            "sum": round(total, 6),
+            "buckets": {
+                **{f"{bound:g}": count for bound, count in zip(self.buckets, cumulative)},
+                "+Inf": cumulative[-1],
+            },
+        }
+
+    def _lines(self) -> Iterable[str]:
+        with self._lock:
+            label_sets = list(self._series)
+        bounds = [*self.buckets, float("inf")]
+        for label_values in label_sets:
+            cumulative, total = self.cumulative(*label_values)
+            for bound, count in zip(bounds, cumulative):
+                labels = _format_labels((*self.labels, "le"), (*label_values, _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {count}"
+            labels = _format_labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative[-1]}"
+
+
+Collector = Callable[[], Union[Iterable[Metric], Awaitable[Iterable[Metric]]]]
+
+
+class MetricsRegistry:
+    """进程内的指标
+
+    热路径上只做字典计数和分桶累加；由已有状态（缓存、会话、连接池）
+    得出的指标由 collector 在抓取时计算，平时没有任何开销。
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def collector(self, func: Collector) -> Collector:
+        """注册抓取时调用的函数（可以是协程），返回当次计算出的指标"""
+        self._collectors.append(func)
+        return func
+
+    async def render(self) -> str:
+        metrics = list(self._metrics.values())
+        for collect in self._collectors:
+            collected = collect()
+            if inspect.isawaitable(collected):
+                collected = await collected
+            metrics.extend(collected)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,77 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from app.config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """已认证用户的精简信息，不包含简历和JD等大字段"""
+    id: str
+    email: str
+    name: str
+    years_of_experience: Optional[int] = None
+    current_company: Optional[str] = None
+    current_role: Optional[str] = None
+    target_role: Optional[str] = None
+    resume_uploaded_at: Optional[datetime] = None
+    target_jd_created_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+
+class PrincipalCache:
+    """按 Token subject（邮箱）缓存 Principal 的 TTL + LRU 缓存"""
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, Principal]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, subject: str) -> Optional[Principal]:
+        entry = self._entries.get(subject)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            del self._entries[subject]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(subject)
+        self.hits += 1
+        return principal
+
+    def set(self, subject: str, principal: Principal) -> None:
+        self._entries[subject] = (time.monotonic() + self.ttl_seconds, principal)
+        self._entries.move_to_end(subject)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str) -> None:
+        """按邮箱失效"""
+        self._entries.pop(subject, None)
+
+    def invalidate_user(self, user_id: str) -> None:
+        """按用户ID失效（资料、简历或JD变更后调用）"""
+        for subject, (_, principal) in list(self._entries.items()):
+            if principal.id == user_id:
+                del self._entries[subject]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+    max_size=settings.principal_cache_max_size,
+)
@@ -1,22 +1,154 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Optional
+
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max 与默认轮数一致：轮数配置变化后，旧哈希在登录时会被标记为需要重新计算
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
+
+
+class PasswordHasherBusy(Exception):
+    """密码哈希队列已满"""
+
+
+class PasswordHasher:
+    """在独立的有界线程池中执行 bcrypt，避免阻塞事件循环
+
+    bcrypt 计算期间会释放 GIL，线程池即可并行；排队中的任务数超过
+    max_queue 时直接抛出 PasswordHasherBusy。
+    """
+
+    def __init__(self, workers: int, max_queue: int, timeout: float):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+
+        # 计时指标
+        self.calls = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self._pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusy("Password hashing queue is full")
+
+        loop = asyncio.get_running_loop()
+        future = self._get_executor().submit(func, *args)
+        self._pending += 1
+        # 超时只是不再等待，线程里的 bcrypt 仍在运行，等它真正结束才释放名额
+        future.add_done_callback(lambda _: self._release(loop))
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.calls += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        """任务结束时在工作线程中调用，计数只在事件循环线程中修改"""
+        def release():
+            self._pending -= 1
+
+        try:
+            loop.call_soon_threadsafe(release)
+        except RuntimeError:
+            pass  # 事件循环已关闭
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, Optional[str]]:
+        """校验密码；如果哈希参数已过期，同时返回新的哈希"""
+        verified, new_hash = await self._run(
+            pwd_context.verify_and_update, plain_password, hashed_password
+        )
+        if verified and new_hash:
+            self.rehashed += 1
+        return verified, new_hash
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+            "avg_ms": round(self.total_seconds / self.calls * 1000, 2) if self.calls else 0,
+            "max_ms": round(self.max_seconds * 1000, 2),
+        }
+
+    async def warm_up(self) -> None:
+        """启动线程池并加载 bcrypt 后端，第一次登录不再承担这部分延迟"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._get_executor(), pwd_context.handler().get_backend)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+    timeout=settings.password_hash_timeout_seconds,
+)
 
 
 def hash_password(password: str) -> str:
-    """加密密码"""
+    """加密密码（同步，会阻塞调用方；异步代码请使用 password_hasher.hash）"""
     return pwd_context.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证密码"""
+    """验证密码（同步，会阻塞调用方；异步代码请使用 password_hasher.verify_and_update）"""
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def hash_password_async(password: str) -> str:
+    """在密码哈希线程池中加密密码"""
+    return await password_hasher.hash(password)
+
+
+async def verify_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """在密码哈希线程池中验证密码，返回 (是否通过, 需要更新的新哈希或 None)"""
+    return await password_hasher.verify_and_update(plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """创建 JWT Token"""
     to_encode = data.copy()
@@ -0,0 +1,106 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+# 英文词边界：命中两侧不能紧挨这些字符（避免 Java 命中 JavaScript、C 命中 C++）
+WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789+#")
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def ascii_lower(text: str) -> str:
+    """只转换 ASCII 大小写，保证下标与原文一一对应"""
+    return text.translate(_ASCII_LOWER)
+
+
+@dataclass(frozen=True)
+class Match:
+    start: int
+    end: int
+    surface: str
+    value: Any
+
+
+class MultiPatternMatcher:
+    """Aho–Corasick 多模式匹配
+
+    所有模式编译成一个自动机，对文本只扫描一遍即可找出全部命中。
+    匹配默认忽略 ASCII 大小写；case_sensitive 的模式在命中后再校验原文。
+    结果按最左最长原则去重叠，并对英文模式做词边界检查。
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, Any, bool]]):
+        # 每个状态：转移表、失败指针、输出（模式下标）
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._patterns: List[Tuple[str, Any, bool]] = []
+
+        for surface, value, case_sensitive in patterns:
+            if surface:
+                self._add(surface, value, case_sensitive)
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def _add(self, surface: str, value: Any, case_sensitive: bool) -> None:
+        state = 0
+        for ch in ascii_lower(surface):
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(len(self._patterns))
+        self._patterns.append((surface, value, case_sensitive))
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _scan(self, text: str) -> Iterator[Match]:
+        state = 0
+        for i, ch in enumerate(ascii_lower(text)):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for index in self._out[state]:
+                surface, value, case_sensitive = self._patterns[index]
+                start = i + 1 - len(surface)
+                if case_sensitive and text[start:i + 1] != surface:
+                    continue
+                if not self._at_boundary(text, start, i + 1):
+                    continue
+                yield Match(start, i + 1, text[start:i + 1], value)
+
+    @staticmethod
+    def _at_boundary(text: str, start: int, end: int) -> bool:
+        if text[start] in WORD_CHARS and start > 0:
+            before = text[start - 1]
+            if before in WORD_CHARS or before == ".":
+                return False
+        if text[end - 1] in WORD_CHARS and end < len(text) and text[end] in WORD_CHARS:
+            return False
+        return True
+
+    def find_all(self, text: str) -> List[Match]:
+        """返回不重叠的命中（最左最长），按出现顺序排列"""
+        matches = sorted(self._scan(text), key=lambda m: (m.start, m.start - m.end))
+        result: List[Match] = []
+        last_end = 0
+        for m in matches:
+            if m.start >= last_end:
+                result.append(m)
+                last_end = m.end
+        return result
@@ -0,0 +1,95 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+WarmupStep = Callable[[], Awaitable[None]]
+
+# 失败的步骤按指数退避重试
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 60.0
+
+
+class Warmup:
+    """启动预热
+
+    各步骤并行执行（有先后依赖的初始化放在同一个步骤里顺序执行），
+    必需步骤全部成功后才标记为就绪。预热在后台运行，进程可以先开始接受连接，
+    健康检查在就绪前返回 503，负载均衡不会把流量导到还在预热的实例。
+
+    失败的步骤在后台按指数退避重试，直到成功：必需步骤（如数据库）恢复后实例
+    随即就绪；可选步骤只是提前加载首次使用时也会完成的工作，失败时实例照常就绪，
+    状态为 degraded，错误记录在 errors 中。
+    """
+
+    def __init__(self):
+        self._steps: Dict[str, Tuple[WarmupStep, bool]] = {}
+        self._pending_required: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.ready = False
+        self.durations: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.attempts: Dict[str, int] = {}
+
+    def step(self, name: str, required: bool = True) -> Callable[[WarmupStep], WarmupStep]:
+        """注册预热步骤的装饰器；required=False 的步骤失败不影响就绪"""
+        def decorator(func: WarmupStep) -> WarmupStep:
+            self._steps[name] = (func, required)
+            return func
+        return decorator
+
+    @property
+    def status(self) -> str:
+        if self.ready:
+            return "degraded" if self.errors else "ready"
+        if self.errors:
+            return "retrying"
+        return "starting"
+
+    async def _run_step(self, name: str, func: WarmupStep, required: bool) -> None:
+        while True:
+            self.attempts[name] = self.attempts.get(name, 0) + 1
+            started = time.perf_counter()
+            try:
+                await func()
+            except Exception as e:
+                self.errors[name] = f"{type(e).__name__}: {e}"
+                print(f"Warmup step {name} failed (attempt {self.attempts[name]}): {e}")
+            else:
+                self.errors.pop(name, None)
+                break
+            finally:
+                self.durations[name] = time.perf_counter() - started
+            await asyncio.sleep(min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (self.attempts[name] - 1)))
+
+        if required:
+            self._pending_required.discard(name)
+            if not self._pending_required:
+                self._mark_ready()
+
+    def _mark_ready(self) -> None:
+        self.ready = True
+        timings = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.durations.items())
+        print(f"Warmup {self.status}: {timings}")
+
+    async def run(self) -> None:
+        started = time.perf_counter()
+        self._pending_required = {name for name, (_, required) in self._steps.items() if required}
+        if not self._pending_required:
+            self._mark_ready()
+        await asyncio.gather(*(
+            self._run_step(name, func, required) for name, (func, required) in self._steps.items()
+        ))
+        self.durations["total"] = time.perf_counter() - started
+
+    def start(self) -> None:
+        """在后台开始预热，不阻塞启动事件"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+warmup = Warmup()
@@ -1,7 +1,9 @@
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
-import aiosqlite
-import asyncio
+import time
+
+from app.core.metrics import metrics
 
 
 class Base(DeclarativeBase):
@@ -17,6 +19,51 @@ engine = create_async_engine(
     echo=False,
 )
 
+db_query_duration = metrics.histogram(
+    "talkpro_db_query_duration_seconds", "Database statement latency by SQL verb", ("operation",)
+)
+db_errors = metrics.counter("talkpro_db_errors_total", "Failed database statements", ("operation",))
+db_connections_in_use = metrics.gauge("talkpro_db_connections_in_use", "Connections checked out of the pool")
+db_connections_opened = metrics.counter("talkpro_db_connections_opened_total", "New DBAPI connections")
+
+
+def _operation(statement: str) -> str:
+    words = statement.split(None, 1)
+    return words[0].upper() if words else "UNKNOWN"
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is not None:
+        db_query_duration.observe(time.perf_counter() - started, _operation(statement))
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _record_query_error(exception_context):
+    db_errors.inc(_operation(exception_context.statement or ""))
+
+
+@event.listens_for(engine.sync_engine.pool, "connect")
+def _record_connect(dbapi_connection, connection_record):
+    db_connections_opened.inc()
+
+
+@event.listens_for(engine.sync_engine.pool, "checkout")
+def _record_checkout(dbapi_connection, connection_record, connection_proxy):
+    db_connections_in_use.inc()
+
+
+@event.listens_for(engine.sync_engine.pool, "checkin")
+def _record_checkin(dbapi_connection, connection_record):
+    db_connections_in_use.dec()
+
+
 # Create async session maker
 async_session = async_sessionmaker(
     engine,
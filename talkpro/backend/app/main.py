@@ -1,10 +1,21 @@
 from fastapi import FastAPI, WebSocket
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.database import init_db
+from app.core.security import password_hasher
+from app.services.pdf_extractor import pdf_extractor
+from app.services.job_queue import job_queue
+from app.services.jd_dedupe import jd_near_duplicates
+from app.services.question_calibration import question_calibration
+from app.services.judge import judge
+from app.agents.registry import agents
+from app.core.warmup import warmup
+from app.core.loop_monitor import loop_monitor
+from app.core.connections import MetricsMiddleware
 # Import v2 APIs with authentication
 from app.api import algorithm_v2 as algorithm, system_design_v2 as system_design, auth, history, workplace_v2, resume, jd
-from app.api import stats
+from app.api import stats, jobs, health, metrics
 
 app = FastAPI(
     title=settings.app_name,
@@ -20,6 +31,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # Include routers (v2 with authentication)
 app.include_router(algorithm.router)
@@ -30,18 +42,74 @@ app.include_router(jd.router)
 app.include_router(auth.router)
 app.include_router(history.router)
 app.include_router(stats.router)
+app.include_router(jobs.router)
+app.include_router(health.router)
+app.include_router(metrics.router)
+
+
+# Only the database is required: the optional steps preload what is otherwise done on first use,
+# so their failures are retried in the background and reported as "degraded" without failing readiness
+@warmup.step("database")
+async def warm_up_database():
+    """Create tables, then start what reads from them"""
+    await init_db()
+    await job_queue.start()
+    jd_near_duplicates.start()
+    await question_calibration.load()
+    await question_calibration.schedule()
+
+
+@warmup.step("agents", required=False)
+async def warm_up_agents():
+    """Construct the interview agents and the API client; fills the workplace opener pool"""
+    await agents.warm_up("claude", "algorithm", "system_design", "workplace")
+
+
+@warmup.step("judge", required=False)
+async def warm_up_judge():
+    await judge.pool.start()
+
+
+@warmup.step("password_hasher", required=False)
+async def warm_up_password_hasher():
+    await password_hasher.warm_up()
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup"""
-    await init_db()
+    """Warm up in the background; /health and /readyz report ready once the required steps are done"""
+    loop_monitor.start()
+    warmup.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release worker pools on shutdown"""
+    await warmup.stop()
+    await loop_monitor.stop()
+    await job_queue.stop()
+    await jd_near_duplicates.stop()
+    await agents.shutdown()
+    await judge.pool.stop()
+    password_hasher.shutdown()
+    pdf_extractor.shutdown()
 
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "app": settings.app_name, "version": "0.2.0"}
+    """Health check endpoint; 503 until the required warmup steps are done"""
+    if not warmup.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": warmup.status, "errors": warmup.errors},
+        )
+    return {
+        "status": "healthy",
+        "app": settings.app_name,
+        "version": "0.2.0",
+        "warmup": warmup.status,
+        "warmup_errors": warmup.errors,
+    }
 
 
 @app.websocket("/ws/algorithm/{session_id}")
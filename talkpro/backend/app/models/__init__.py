@@ -1,4 +1,13 @@
 from app.models.user import User
 from app.models.session import InterviewSession, SessionType, SessionStatus
+from app.models.resume_blob import ResumeBlob
+from app.models.job import Job, JobStatus
+from app.models.jd_analysis import JDAnalysis
+from app.models.user_jd import UserJD
+from app.models.jd_signature import JDSignature
+from app.models.question_stat import QuestionStat
+from app.models.user_ability import UserAbility
+from app.models.code_version import CodeVersion
 
-__all__ = ["User", "InterviewSession", "SessionType", "SessionStatus"]
+__all__ = ["User", "InterviewSession", "SessionType", "SessionStatus", "ResumeBlob", "Job", "JobStatus", "JDAnalysis", "UserJD", "JDSignature",
+           "QuestionStat", "UserAbility", "CodeVersion"]
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime
+from app.database import Base
+from datetime import datetime
+
+
+class CodeVersion(Base):
+    """算法面试中提交的代码版本
+
+    每隔若干版本保存一次完整代码（code），其余版本只保存相对上一版本的
+    unified diff（diff），读取时从最近的完整版本依次应用补丁还原。
+    """
+    __tablename__ = "code_versions"
+
+    session_id = Column(String, primary_key=True)
+    version = Column(Integer, primary_key=True)  # 从 1 开始
+    code = Column(Text, nullable=True)  # 完整代码，仅关键版本
+    diff = Column(Text, nullable=True)  # 相对 version - 1 的补丁
+    sha256 = Column(String(64), nullable=False)
+    lines_added = Column(Integer, nullable=False, default=0)
+    lines_removed = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
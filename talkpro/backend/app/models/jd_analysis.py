@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from sqlalchemy.dialects.sqlite import JSON
+from app.database import Base
+from datetime import datetime
+
+
+class JDAnalysis(Base):
+    """按JD文本哈希缓存的分析结果，相同JD只调用一次模型"""
+    __tablename__ = "jd_analyses"
+
+    hash = Column(String(64), primary_key=True)  # 规范化后 jd_text 的 sha256
+    jd_data = Column(JSON, nullable=False)
+    hit_count = Column(Integer, nullable=False, default=0)  # 命中缓存的次数
+
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Integer, LargeBinary, DateTime
+from app.database import Base
+from datetime import datetime
+
+
+class JDSignature(Base):
+    """已分析JD的 MinHash 签名，用于近似重复检测"""
+    __tablename__ = "jd_signatures"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)  # 内存索引中的文档编号
+    jd_hash = Column(String(64), nullable=False, unique=True)  # jd_analyses.hash
+    signature = Column(LargeBinary, nullable=False)  # uint32 数组
+
+    created_at = Column(DateTime, default=datetime.utcnow)
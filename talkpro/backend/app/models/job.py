@@ -0,0 +1,45 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, Enum as SQLEnum, Index, text
+from sqlalchemy.dialects.sqlite import JSON
+from app.database import Base
+from datetime import datetime
+import uuid
+import enum
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(Base):
+    """后台任务（简历解析、JD分析等耗时的 LLM 调用）"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # 并发提交相同 dedupe_key 的任务时由数据库保证只有一个排队中或运行中的任务
+        Index(
+            "uq_jobs_active_dedupe_key", "dedupe_key",
+            unique=True, sqlite_where=text("status IN ('QUEUED', 'RUNNING')"),
+        ),
+    )
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    type = Column(String, nullable=False, index=True)
+    user_id = Column(String, nullable=True, index=True)
+    dedupe_key = Column(String, nullable=True, index=True)  # 相同 key 的排队中或运行中任务只保留一个
+
+    status = Column(SQLEnum(JobStatus), nullable=False, default=JobStatus.QUEUED, index=True)
+    payload = Column(JSON, nullable=False, default=dict)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    progress = Column(Integer, nullable=False, default=0)  # 0-100
+    message = Column(String, nullable=True)  # 当前进度说明
+
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, default=datetime.utcnow)  # 重试退避
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
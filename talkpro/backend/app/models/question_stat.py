@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Integer, Float, DateTime
+from app.database import Base
+from datetime import datetime
+
+
+class QuestionStat(Base):
+    """根据历史得分校准的题目难度（Rasch 模型的 b 参数）"""
+    __tablename__ = "question_stats"
+
+    question_id = Column(String, primary_key=True)
+    difficulty = Column(Float, nullable=False, default=0.0)
+    observations = Column(Integer, nullable=False, default=0)  # 参与校准的作答次数
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime
+from sqlalchemy.dialects.sqlite import JSON
+from app.database import Base
+from datetime import datetime
+
+
+class ResumeBlob(Base):
+    """按内容哈希存储的简历文件，缓存提取文本和解析结果"""
+    __tablename__ = "resume_blobs"
+
+    hash = Column(String(64), primary_key=True)  # sha256
+    path = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)  # 引用该文件的用户数
+
+    extracted_text = Column(Text, nullable=True)  # PDF提取的文本
+    parsed_data = Column(JSON, nullable=True)  # AI解析结果
+
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum as SQLEnum
 from sqlalchemy.dialects.sqlite import JSON
 from app.database import Base
 from datetime import datetime
@@ -21,6 +21,7 @@ class InterviewSession(Base):
     __tablename__ = "interview_sessions"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, ForeignKey("users.id"), nullable=True, index=True)
     type = Column(SQLEnum(SessionType), nullable=False)
     question_id = Column(String, nullable=True)  # For algorithm interviews
     scenario_id = Column(String, nullable=True)  # For system design
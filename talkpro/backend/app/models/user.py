@@ -20,6 +20,7 @@ class User(Base):
 
     # 简历相关字段
     resume_url = Column(String, nullable=True)  # 简历文件路径
+    resume_hash = Column(String(64), nullable=True, index=True)  # 简历文件内容哈希（resume_blobs.hash）
     resume_data = Column(JSON, nullable=True)  # 解析后的简历数据
     resume_uploaded_at = Column(DateTime, nullable=True)  # 简历上传时间
 
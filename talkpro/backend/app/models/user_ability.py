@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey
+from app.database import Base
+from datetime import datetime
+
+
+class UserAbility(Base):
+    """根据历史得分估计的用户算法能力（Rasch 模型的 θ 参数）"""
+    __tablename__ = "user_abilities"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    ability = Column(Float, nullable=False, default=0.0)
+    observations = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.sqlite import JSON
+from app.database import Base
+import uuid
+from datetime import datetime
+
+
+class UserJD(Base):
+    """用户的JD库（可保存多个目标JD）"""
+    __tablename__ = "user_jds"
+    __table_args__ = (UniqueConstraint("user_id", "jd_hash", name="uq_user_jds_user_hash"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    jd_hash = Column(String(64), nullable=False)  # jd_analyses.hash
+
+    company = Column(String, nullable=True)
+    position = Column(String, nullable=True)
+    url = Column(String, nullable=True)
+    jd_text = Column(Text, nullable=False)
+    jd_data = Column(JSON, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
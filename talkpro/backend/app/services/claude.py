@@ -1,12 +1,108 @@
-from anthropic import AsyncAnthropic
+import asyncio
+import sys
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Iterator
 from app.config import settings
+from app.core.metrics import metrics
+
+if TYPE_CHECKING:
+    from anthropic import AsyncAnthropic
+
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0, 128.0)
+
+llm_requests = metrics.counter(
+    "talkpro_llm_requests_total", "Claude API calls by call site and outcome", ("site", "outcome")
+)
+llm_errors = metrics.counter("talkpro_llm_errors_total", "Failed Claude API calls by error type", ("site", "error"))
+llm_duration = metrics.histogram(
+    "talkpro_llm_request_duration_seconds",
+    "Claude API call latency, until the last chunk for streams",
+    ("site",),
+    buckets=LLM_BUCKETS,
+)
+llm_ttft = metrics.histogram(
+    "talkpro_llm_time_to_first_token_seconds", "Time to the first streamed chunk", ("site",), buckets=LLM_BUCKETS
+)
+llm_tokens = metrics.counter("talkpro_llm_tokens_total", "Tokens billed by call site", ("site", "direction"))
+
+
+def _call_site(depth: int = 2) -> str:
+    """Qualified name of the function calling into the service, e.g. AlgorithmInterviewer.process_answer"""
+    frame = sys._getframe(depth)
+    # Skip comprehensions and lambdas wrapping the call
+    while frame.f_back is not None and frame.f_code.co_name.startswith("<"):
+        frame = frame.f_back
+    return getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+
+
+class _Call:
+    """Timing and token accounting for one API call"""
+
+    def __init__(self, site: str):
+        self.site = site
+        self.started = time.perf_counter()
+        self._first_token = False
+
+    def first_token(self) -> None:
+        if not self._first_token:
+            self._first_token = True
+            llm_ttft.observe(time.perf_counter() - self.started, self.site)
+
+    def usage(self, usage: Any) -> None:
+        if usage is not None:
+            llm_tokens.inc(self.site, "input", amount=getattr(usage, "input_tokens", 0) or 0)
+            llm_tokens.inc(self.site, "output", amount=getattr(usage, "output_tokens", 0) or 0)
+
+    async def stream_usage(self, stream: Any) -> None:
+        get_final_message = getattr(stream, "get_final_message", None)
+        if get_final_message is not None:
+            self.usage(getattr(await get_final_message(), "usage", None))
 
 
 class ClaudeService:
     """Claude API service wrapper"""
 
     def __init__(self):
-        self.client = AsyncAnthropic(api_key=settings.anthropic_api_key)
+        self._client: "AsyncAnthropic | None" = None
+        self.in_flight = 0  # Requests (including open streams) currently waiting on the API
+
+    @property
+    def client(self) -> "AsyncAnthropic":
+        """API client, created on first use (importing anthropic takes ~0.3s)"""
+        if self._client is None:
+            from anthropic import AsyncAnthropic
+            self._client = AsyncAnthropic(api_key=settings.anthropic_api_key)
+        return self._client
+
+    @property
+    def client_created(self) -> bool:
+        return self._client is not None
+
+    @contextmanager
+    def _track(self, site: str) -> Iterator[_Call]:
+        """Count the call as in flight and record its latency and outcome under the caller's name"""
+        call = _Call(site)
+        outcome = "ok"
+        self.in_flight += 1
+        try:
+            yield call
+        except (asyncio.CancelledError, GeneratorExit):
+            # The consumer went away (websocket closed, request cancelled) before the call finished
+            outcome = "cancelled"
+            raise
+        except Exception as e:
+            outcome = "error"
+            llm_errors.inc(site, type(e).__name__)
+            raise
+        finally:
+            self.in_flight -= 1
+            llm_requests.inc(site, outcome)
+            llm_duration.observe(time.perf_counter() - call.started, site)
+
+    def warm_up(self) -> None:
+        """Import anthropic and create the client (and its connection pool) ahead of the first call"""
+        self.client
 
     async def send_message(
         self,
@@ -25,16 +121,18 @@ class ClaudeService:
         Returns:
             Claude's response text
         """
-        try:
-            response = await self.client.messages.create(
-                model=model,
-                max_tokens=max_tokens,
-                messages=[{"role": "user", "content": message}],
-            )
-            return response.content[0].text
-        except Exception as e:
-            print(f"Error calling Claude API: {e}")
-            raise
+        with self._track(_call_site()) as call:
+            try:
+                response = await self.client.messages.create(
+                    model=model,
+                    max_tokens=max_tokens,
+                    messages=[{"role": "user", "content": message}],
+                )
+                call.usage(getattr(response, "usage", None))
+                return response.content[0].text
+            except Exception as e:
+                print(f"Error calling Claude API: {e}")
+                raise
 
     async def send_message_stream(
         self,
@@ -53,14 +151,79 @@ class ClaudeService:
         Yields:
             Chunks of Claude's response text
         """
-        try:
-            async with self.client.messages.stream(
-                model=model,
-                max_tokens=max_tokens,
-                messages=[{"role": "user", "content": message}],
-            ) as stream:
-                async for text in stream.text_stream:
-                    yield text
-        except Exception as e:
-            print(f"Error calling Claude API stream: {e}")
-            raise
+        with self._track(_call_site()) as call:
+            try:
+                async with self.client.messages.stream(
+                    model=model,
+                    max_tokens=max_tokens,
+                    messages=[{"role": "user", "content": message}],
+                ) as stream:
+                    async for text in stream.text_stream:
+                        call.first_token()
+                        yield text
+                    await call.stream_usage(stream)
+            except Exception as e:
+                print(f"Error calling Claude API stream: {e}")
+                raise
+
+    async def chat(
+        self,
+        messages: list[dict],
+        system_prompt: str | None = None,
+        model: str = "claude-3-5-sonnet-20241022",
+        max_tokens: int = 4096,
+    ) -> str:
+        """
+        Send a multi-turn conversation with an optional system prompt.
+
+        Args:
+            messages: [{"role": "user" | "assistant", "content": str}, ...]
+            system_prompt: System prompt
+            model: Claude model to use
+            max_tokens: Maximum tokens in response
+
+        Returns:
+            Claude's response text
+        """
+        with self._track(_call_site()) as call:
+            try:
+                response = await self.client.messages.create(
+                    model=model,
+                    max_tokens=max_tokens,
+                    messages=[{"role": m["role"], "content": m["content"]} for m in messages],
+                    **({"system": system_prompt} if system_prompt else {}),
+                )
+                call.usage(getattr(response, "usage", None))
+                return response.content[0].text
+            except Exception as e:
+                print(f"Error calling Claude API: {e}")
+                raise
+
+    async def chat_stream(
+        self,
+        messages: list[dict],
+        system_prompt: str | None = None,
+        model: str = "claude-3-5-sonnet-20241022",
+        max_tokens: int = 4096,
+    ):
+        """
+        Stream the response to a multi-turn conversation.
+
+        Yields:
+            Chunks of Claude's response text
+        """
+        with self._track(_call_site()) as call:
+            try:
+                async with self.client.messages.stream(
+                    model=model,
+                    max_tokens=max_tokens,
+                    messages=[{"role": m["role"], "content": m["content"]} for m in messages],
+                    **({"system": system_prompt} if system_prompt else {}),
+                ) as stream:
+                    async for text in stream.text_stream:
+                        call.first_token()
+                        yield text
+                    await call.stream_usage(stream)
+            except Exception as e:
+                print(f"Error calling Claude API stream: {e}")
+                raise
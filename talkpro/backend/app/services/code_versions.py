@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from app.core.code_diff import PatchError, apply_unified_diff, change_stats, format_change, unified_diff
+from app.database import async_session
+from app.models.code_version import CodeVersion
+
+# 每隔这么多个版本保存一次完整代码，限制还原时需要应用的补丁数
+KEYFRAME_INTERVAL = 10
+
+
+class CodeConflictError(Exception):
+    """提交的补丁无法应用到服务端的最新版本，客户端应重新提交完整代码"""
+
+    def __init__(self, message: str, latest_version: int):
+        super().__init__(message)
+        self.latest_version = latest_version
+
+
+@dataclass(frozen=True)
+class CodeSubmission:
+    version: int
+    code: str
+    previous_version: Optional[int] = None
+    summary: Optional[str] = None  # 相对上一版本的改动，首个版本为 None
+    changed: bool = True  # 与上一版本内容相同时为 False，不产生新版本
+
+
+class CodeVersionStore:
+    """算法面试的代码版本
+
+    客户端提交完整代码或相对最新版本的 unified diff；服务端还原出完整代码，
+    以关键版本 + 补丁链的形式落库。每个会话的最新版本缓存在内存中，
+    进程重启后从数据库还原。
+    """
+
+    def __init__(self, keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self._latest: Dict[str, Tuple[int, str]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def _load_latest(self, session_id: str) -> Optional[Tuple[int, str]]:
+        async with async_session() as db:
+            result = await db.execute(
+                select(CodeVersion.version)
+                .where(CodeVersion.session_id == session_id)
+                .order_by(CodeVersion.version.desc())
+                .limit(1)
+            )
+            version = result.scalar_one_or_none()
+        if version is None:
+            return None
+        return version, await self.get(session_id, version)
+
+    async def latest(self, session_id: str) -> Optional[Tuple[int, str]]:
+        """最新的 (版本号, 代码)，没有提交过代码时为 None"""
+        if session_id in self._latest:
+            self.hits += 1
+        else:
+            self.misses += 1
+            latest = await self._load_latest(session_id)
+            if latest is None:
+                return None
+            self._latest[session_id] = latest
+        return self._latest[session_id]
+
+    async def get(self, session_id: str, version: int) -> str:
+        """还原指定版本的完整代码"""
+        async with async_session() as db:
+            # 不晚于 version 的最近一个完整版本
+            keyframe = await db.execute(
+                select(func.max(CodeVersion.version))
+                .where(CodeVersion.session_id == session_id)
+                .where(CodeVersion.version <= version)
+                .where(CodeVersion.code.is_not(None))
+            )
+            start = keyframe.scalar()
+            if start is None:
+                raise KeyError(f"代码版本不存在: {session_id}@{version}")
+            result = await db.execute(
+                select(CodeVersion)
+                .where(CodeVersion.session_id == session_id)
+                .where(CodeVersion.version >= start)
+                .where(CodeVersion.version <= version)
+                .order_by(CodeVersion.version)
+            )
+            rows = result.scalars().all()
+
+        code = rows[0].code
+        for row in rows[1:]:
+            code = apply_unified_diff(code, row.diff)
+        return code
+
+    async def submit(
+        self,
+        session_id: str,
+        code: Optional[str] = None,
+        diff: Optional[str] = None,
+        base_version: Optional[int] = None,
+    ) -> CodeSubmission:
+        """提交完整代码，或相对 base_version 的补丁
+
+        Raises:
+            CodeConflictError: base_version 不是最新版本，或补丁无法应用
+        """
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            latest = await self.latest(session_id)
+            latest_version, latest_code = latest or (0, None)
+
+            if code is None:
+                if latest is None or base_version != latest_version:
+                    raise CodeConflictError(
+                        f"补丁基于版本 {base_version}，最新版本为 {latest_version}", latest_version
+                    )
+                try:
+                    code = apply_unified_diff(latest_code, diff or "")
+                except PatchError as e:
+                    raise CodeConflictError(str(e), latest_version)
+
+            if latest is not None and code == latest_code:
+                return CodeSubmission(
+                    version=latest_version,
+                    code=code,
+                    previous_version=latest_version,
+                    summary="no changes",
+                    changed=False,
+                )
+
+            version = latest_version + 1
+            stored_diff = unified_diff(latest_code, code) if latest is not None else None
+            # 补丁比完整代码还大时直接存完整代码
+            keyframe = (
+                stored_diff is None
+                or (version - 1) % self.keyframe_interval == 0
+                or len(stored_diff) >= len(code)
+            )
+            added, removed, ranges = change_stats(latest_code or "", code)
+            async with async_session() as db:
+                db.add(CodeVersion(
+                    session_id=session_id,
+                    version=version,
+                    code=code if keyframe else None,
+                    diff=None if keyframe else stored_diff,
+                    sha256=hashlib.sha256(code.encode()).hexdigest(),
+                    lines_added=added,
+                    lines_removed=removed,
+                ))
+                await db.commit()
+
+            self._latest[session_id] = (version, code)
+            return CodeSubmission(
+                version=version,
+                code=code,
+                previous_version=latest_version or None,
+                summary=format_change(added, removed, ranges) if latest is not None else None,
+            )
+
+    def forget(self, session_id: str) -> None:
+        """会话结束后释放内存中的最新版本"""
+        self._latest.pop(session_id, None)
+        self._locks.pop(session_id, None)
+
+
+code_versions = CodeVersionStore()
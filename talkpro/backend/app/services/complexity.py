@@ -0,0 +1,259 @@
+import hashlib
+import math
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.judge import JudgePool, judge
+from app.services.question_bank import question_bank
+
+# 复杂度类别：名称 -> (增长函数, 等级)。n 与 n log n 在实测中难以区分，等级只差 0.5
+COMPLEXITY_CLASSES: Dict[str, Tuple[Callable[[np.ndarray], np.ndarray], float]] = {
+    "1": (lambda n: np.zeros_like(n), 0),
+    "log n": (np.log2, 1),
+    "n": (lambda n: n, 2),
+    "n log n": (lambda n: n * np.log2(n), 2.5),
+    "n^2": (lambda n: n ** 2, 4),
+    "n^3": (lambda n: n ** 3, 5),
+}
+# 至少需要这么多个规模的测量才做拟合
+MIN_SAMPLES = 4
+# 残差不超过最优拟合的这个倍数时，取更简单的类别
+SIMPLER_TOLERANCE = 1.1
+# 增长类别的拟合相对常数拟合至少要解释这么多的方差
+MIN_R_SQUARED = 0.9
+# 测量范围内的相对增长至少是相对残差噪声的这么多倍
+GROWTH_NOISE_RATIO = 3.0
+# 额外内存（不含返回值）始终低于该值视为 O(1)（避免把几百字节的噪声拟合成增长）
+CONSTANT_MEMORY_BYTES = 4096
+PROFILE_CACHE_SIZE = 256
+
+# 候选人说的复杂度写法 -> 标准名称
+_CLAIM_ALIASES = {
+    "1": "1", "c": "1",
+    "logn": "log n", "lgn": "log n",
+    "n": "n", "m+n": "n", "n+m": "n",
+    "nlogn": "n log n", "nlgn": "n log n",
+    "n^2": "n^2", "n2": "n^2", "nn": "n^2",
+    "n^3": "n^3", "n3": "n^3",
+}
+_BIG_O_RE = re.compile(r"O\s*[(（]\s*([^)）]{1,20})[)）]", re.IGNORECASE)
+_SPACE_HINT_RE = re.compile(r"(空间|内存|space|memory)", re.IGNORECASE)
+_TIME_HINT_RE = re.compile(r"(时间|time|runtime)", re.IGNORECASE)
+
+
+def normalize_claim(expr: str) -> Optional[str]:
+    """把 "n log n"、"nlogn"、"n²"、"N*N" 等写法规范化，无法识别时返回 None"""
+    expr = expr.lower().replace("²", "^2").replace("³", "^3")
+    expr = re.sub(r"[\s*·×]", "", expr)
+    expr = expr.replace("log(n)", "logn").replace("log2n", "logn").replace("log_2n", "logn")
+    return _CLAIM_ALIASES.get(expr)
+
+
+def parse_claims(text: str) -> Dict[str, str]:
+    """从回答中提取声称的时间/空间复杂度
+
+    "空间/space" 出现在 O(...) 前面不远处的算空间复杂度，其余第一个算时间复杂度。
+    """
+    claims: Dict[str, str] = {}
+    for m in _BIG_O_RE.finditer(text or ""):
+        complexity = normalize_claim(m.group(1))
+        if complexity is None:
+            continue
+        context = text[max(0, m.start() - 12):m.start()]
+        space_at = max((h.end() for h in _SPACE_HINT_RE.finditer(context)), default=-1)
+        time_at = max((h.end() for h in _TIME_HINT_RE.finditer(context)), default=-1)
+        kind = "space" if space_at > time_at else "time"
+        claims.setdefault(kind, complexity)
+    return claims
+
+
+def fit_complexity(sizes: List[int], values: List[float]) -> Optional[str]:
+    """把 values ≈ a + b·f(n) 拟合到各复杂度类别，返回残差最小的类别
+
+    按相对误差加权（各规模同等重要，否则最大规模的缓存效应会主导拟合），
+    残差接近时取更简单的类别。选出增长类别后还要求增长显著：拟合比常数
+    好得多（R² 达到 MIN_R_SQUARED），且测量范围内的增长 b·(f(n_max) - f(n_min))
+    明显大于残差噪声；否则说明测量被噪声主导，返回 None。样本不足时也返回 None。
+    """
+    if len(sizes) < MIN_SAMPLES:
+        return None
+    n = np.asarray(sizes, dtype=float)
+    y = np.asarray(values, dtype=float)
+    w = 1 / np.maximum(y, 1e-9)
+
+    # 类别 -> (加权残差, a, b)
+    fits: Dict[str, Tuple[float, float, float]] = {}
+    for name, (f, _) in COMPLEXITY_CLASSES.items():
+        x = f(n)
+        if not np.any(x):
+            a = np.sum(y * w * w) / np.sum(w * w)
+            fits[name] = (float(np.sum(((y - a) * w) ** 2)), float(a), 0.0)
+            continue
+        design = np.column_stack([np.ones_like(x), x]) * w[:, None]
+        (a, b), *_ = np.linalg.lstsq(design, y * w, rcond=None)
+        # 随规模下降的拟合没有意义
+        residual = float(np.sum(((y - (a + b * x)) * w) ** 2)) if b >= 0 else math.inf
+        fits[name] = (residual, float(a), float(b))
+
+    best = min(residual for residual, _, _ in fits.values())
+    chosen = next(
+        name for name in COMPLEXITY_CLASSES  # 从简单到复杂
+        if fits[name][0] <= best * SIMPLER_TOLERANCE + 1e-12
+    )
+    if chosen == "1":
+        return chosen
+
+    residual, a, b = fits[chosen]
+    if 1 - residual / fits["1"][0] < MIN_R_SQUARED:
+        return None
+    # 加权后残差是相对误差，增长也换算成相对最小规模时的拟合值
+    x = COMPLEXITY_CLASSES[chosen][0](n)
+    relative_growth = b * (x.max() - x.min()) / max(a + b * x.min(), 1e-9)
+    relative_noise = math.sqrt(residual / max(len(n) - 2, 1))
+    if relative_growth < GROWTH_NOISE_RATIO * relative_noise:
+        return None
+    return chosen
+
+
+def mismatch(claimed: Optional[str], measured: Optional[str]) -> bool:
+    """声称的复杂度与实测明显不符（n 与 n log n 不算不符）"""
+    if claimed is None or measured is None:
+        return False
+    return abs(COMPLEXITY_CLASSES[claimed][1] - COMPLEXITY_CLASSES[measured][1]) > 0.5
+
+
+@dataclass
+class ComplexityProfile:
+    time: Optional[str]
+    space: Optional[str]
+    claimed_time: Optional[str] = None
+    claimed_space: Optional[str] = None
+    sizes: List[int] = field(default_factory=list)
+    times_ms: List[float] = field(default_factory=list)
+    memory_bytes: List[int] = field(default_factory=list)
+
+    @property
+    def time_mismatch(self) -> bool:
+        return mismatch(self.claimed_time, self.time)
+
+    @property
+    def space_mismatch(self) -> bool:
+        return mismatch(self.claimed_space, self.space)
+
+    def with_claims(self, claims: Dict[str, str]) -> "ComplexityProfile":
+        return ComplexityProfile(
+            time=self.time,
+            space=self.space,
+            claimed_time=claims.get("time"),
+            claimed_space=claims.get("space"),
+            sizes=self.sizes,
+            times_ms=self.times_ms,
+            memory_bytes=self.memory_bytes,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "time": self.time,
+            "space": self.space,
+            "claimed_time": self.claimed_time,
+            "claimed_space": self.claimed_space,
+            "time_mismatch": self.time_mismatch,
+            "space_mismatch": self.space_mismatch,
+            "sizes": self.sizes,
+            "times_ms": [round(t, 3) for t in self.times_ms],
+            "memory_bytes": self.memory_bytes,
+        }
+
+    def summary(self) -> str:
+        """给面试官模型的简短结论"""
+        def describe(kind: str, measured: Optional[str], claimed: Optional[str], wrong: bool) -> str:
+            text = f"{kind} ~ O({measured})" if measured else f"{kind} inconclusive"
+            if claimed:
+                text += f" (candidate claimed O({claimed})" + (", DOES NOT MATCH)" if wrong else ")")
+            return text
+
+        largest = f"n up to {self.sizes[-1]}" if self.sizes else "no samples"
+        return (
+            f"Profiler ({largest}): "
+            + describe("time", self.time, self.claimed_time, self.time_mismatch)
+            + "; "
+            + describe("extra space", self.space, self.claimed_space, self.space_mismatch)
+            + "."
+        )
+
+
+class ComplexityProfiler:
+    """在判题子进程中用逐步放大的输入运行解法，拟合时间和额外内存的增长类别
+
+    输入按题目 judge.profile 的描述生成；结果按题目和代码缓存，
+    候选人的复杂度说法每次重新解析。
+    """
+
+    def __init__(self, pool: JudgePool, budget_seconds: float):
+        self.pool = pool
+        self.budget_seconds = budget_seconds
+        self._cache: "OrderedDict[Tuple[str, Tuple[int, int], str], Optional[ComplexityProfile]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def supports(self, question_id: Optional[str]) -> bool:
+        question = question_bank.get(question_id) if question_id else None
+        return bool(question and (question.data.get("judge") or {}).get("profile"))
+
+    async def _measure(self, question_id: str, code: str) -> Optional[ComplexityProfile]:
+        spec = question_bank.get(question_id).data["judge"]
+        cpu_seconds = math.ceil(self.budget_seconds) + 1
+        result = await self.pool.execute(
+            {
+                "mode": "profile",
+                "code": code,
+                "entry": spec["entry"],
+                "types": spec.get("types"),
+                "profile": spec["profile"],
+                "budget_seconds": self.budget_seconds,
+            },
+            cpu_seconds=cpu_seconds,
+            wall_seconds=cpu_seconds * 2,
+        )
+        if result.get("status") != "ok":
+            print(f"Complexity profiling failed for {question_id}: {result.get('status')} {result.get('error')}")
+            return None
+
+        sizes, times_ms, memory = result["sizes"], result["times_ms"], result["memory_bytes"]
+        space = "1" if memory and max(memory) < CONSTANT_MEMORY_BYTES else fit_complexity(sizes, memory)
+        return ComplexityProfile(
+            time=fit_complexity(sizes, times_ms),
+            space=space if len(sizes) >= MIN_SAMPLES else None,
+            sizes=sizes,
+            times_ms=times_ms,
+            memory_bytes=memory,
+        )
+
+    async def profile(self, question_id: str, code: str, answer: str = "") -> Optional[ComplexityProfile]:
+        """测量解法的复杂度，并与回答中声称的复杂度对比；题目不支持时返回 None"""
+        if not self.supports(question_id):
+            return None
+
+        key = (question_id, question_bank.version, hashlib.sha256(code.encode()).hexdigest())
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            measured = self._cache[key]
+        else:
+            self.misses += 1
+            measured = await self._measure(question_id, code)
+            self._cache[key] = measured
+            if len(self._cache) > PROFILE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+        if measured is None:
+            return None
+        return measured.with_claims(parse_claims(answer))
+
+
+complexity_profiler = ComplexityProfiler(judge.pool, budget_seconds=settings.complexity_profile_seconds)
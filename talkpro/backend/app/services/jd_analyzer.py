@@ -0,0 +1,274 @@
+import asyncio
+import hashlib
+import json
+import re
+import unicodedata
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.dialects.sqlite import insert
+
+from app.agents.registry import agents
+from app.config import settings
+from app.database import async_session
+from app.models.jd_analysis import JDAnalysis
+from app.models.user_jd import UserJD
+from .claude import ClaudeService
+from .jd_dedupe import jd_near_duplicates
+
+
+def normalize_jd_text(jd_text: str) -> str:
+    """统一全角字符和空白，作为缓存键的输入"""
+    text = unicodedata.normalize("NFKC", jd_text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def jd_text_hash(jd_text: str) -> str:
+    return hashlib.sha256(normalize_jd_text(jd_text).encode("utf-8")).hexdigest()
+
+
+async def analyze_jd_text(
+    claude: ClaudeService,
+    jd_text: str,
+    company: Optional[str] = None,
+    position: Optional[str] = None,
+) -> dict:
+    """调用 AI 分析 JD 文本，返回结构化 JD 数据"""
+
+    system_prompt = """你是一位专业的招聘专家和职业顾问，擅长分析职位描述(JD)。
+你的任务是深入分析JD内容，提取关键信息，识别岗位要求。"""
+
+    user_prompt = f"""请分析以下职位描述(JD)，提取关键信息：
+
+公司：{company or '未指定'}
+职位：{position or '未指定'}
+
+JD内容：
+{jd_text}
+
+请返回以下JSON格式：
+{{
+    "company": "公司名称",
+    "position": "职位名称",
+    "basic_requirements": {{
+        "education": "学历要求",
+        "experience": "经验要求",
+        "location": "工作地点",
+        "salary": "薪资范围"
+    }},
+    "skills": {{
+        "required": ["必需技能1", "必需技能2"],
+        "preferred": ["加分技能1", "加分技能2"]
+    }},
+    "responsibilities": ["职责1", "职责2", "职责3"],
+    "requirements": {{
+        "technical": ["技术要求1", "技术要求2"],
+        "soft_skills": ["软技能要求1", "软技能要求2"],
+        "certifications": ["认证要求"]
+    }},
+    "team_info": {{
+        "team_size": "团队规模",
+        "team_structure": "团队结构",
+        "tech_stack": "技术栈"
+    }},
+    "highlights": ["亮点1", "亮点2", "亮点3"],
+    "keywords": ["关键词1", "关键词2", "关键词3"]
+}}
+
+注意：
+- 如果某项信息不存在，返回空数组或null
+- 技能要区分必需和加分项
+- 职责要具体可量化
+- 提取所有关键技能
+- 识别岗位亮点
+- 只返回JSON，不要有其他文字"""
+
+    response = await claude.chat(
+        messages=[{"role": "user", "content": user_prompt}],
+        system_prompt=system_prompt
+    )
+
+    # 提取JSON
+    json_match = re.search(r'\{.*\}', response, re.DOTALL)
+    if json_match:
+        jd_data = json.loads(json_match.group(0))
+    else:
+        raise ValueError("No JSON found in response")
+
+    # 确保所有字段存在
+    jd_data.setdefault("basic_requirements", {})
+    jd_data.setdefault("skills", {})
+    jd_data["skills"].setdefault("required", [])
+    jd_data["skills"].setdefault("preferred", [])
+    jd_data.setdefault("responsibilities", [])
+    jd_data.setdefault("requirements", {})
+    jd_data["requirements"].setdefault("technical", [])
+    jd_data["requirements"].setdefault("soft_skills", [])
+    jd_data["requirements"].setdefault("certifications", [])
+    jd_data.setdefault("team_info", {})
+    jd_data.setdefault("highlights", [])
+    jd_data.setdefault("keywords", [])
+
+    return jd_data
+
+
+class JDAnalyzer:
+    """带缓存和并发控制的JD分析
+
+    - 结果按规范化后的 jd_text 哈希持久化到 jd_analyses 表，相同JD只调用一次模型
+    - 同一JD的并发请求合并为一次调用（single flight）
+    - 与已分析JD近似重复时复用其结果（见 jd_dedupe）
+    - 模型调用总并发受信号量限制，批量提交不会打满模型配额
+    """
+
+    def __init__(self, max_concurrency: int):
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight: Dict[str, "asyncio.Task[Tuple[dict, bool]]"] = {}
+        self.hits = 0  # 命中已有结果、等待进行中的分析或复用近似重复 JD
+        self.misses = 0  # 调用模型分析
+
+    @property
+    def claude(self) -> ClaudeService:
+        """与面试 Agent 共用的 API 客户端"""
+        return agents.get("claude")
+
+    @staticmethod
+    def _with_overrides(jd_data: dict, company: Optional[str], position: Optional[str]) -> dict:
+        """缓存结果按请求中的公司和职位修正"""
+        jd_data = dict(jd_data)
+        if company:
+            jd_data["company"] = company
+        if position:
+            jd_data["position"] = position
+        return jd_data
+
+    async def _load(self, jd_hash: str) -> Optional[dict]:
+        async with async_session() as db:
+            analysis = await db.get(JDAnalysis, jd_hash)
+            if not analysis:
+                return None
+            await db.execute(
+                update(JDAnalysis)
+                .where(JDAnalysis.hash == jd_hash)
+                .values(hit_count=JDAnalysis.hit_count + 1)
+            )
+            await db.commit()
+            return analysis.jd_data
+
+    async def _store(self, jd_hash: str, jd_data: dict) -> None:
+        async with async_session() as db:
+            await db.execute(
+                insert(JDAnalysis)
+                .values(hash=jd_hash, jd_data=jd_data, hit_count=0, created_at=datetime.utcnow())
+                .on_conflict_do_update(index_elements=[JDAnalysis.hash], set_={"jd_data": jd_data})
+            )
+            await db.commit()
+
+    async def _reuse_near_duplicate(self, jd_hash: str, jd_text: str) -> Optional[dict]:
+        """近似重复的JD（只差公司名、空白或条目顺序）复用已有分析结果"""
+        near = await jd_near_duplicates.find(jd_text)
+        if near is None:
+            return None
+        jd_data = await self._load(near.jd_hash)
+        if jd_data is None:
+            return None
+
+        # 原结果中的公司、职位在新JD里找不到时清空，由请求参数或调用方补充
+        normalized = normalize_jd_text(jd_text)
+        jd_data = dict(jd_data)
+        for key in ("company", "position"):
+            value = jd_data.get(key)
+            if isinstance(value, str) and normalize_jd_text(value) not in normalized:
+                jd_data[key] = None
+
+        # 以新JD的哈希再存一份，之后相同文本直接命中
+        await self._store(jd_hash, jd_data)
+        print(f"Reused JD analysis {near.jd_hash[:12]} (similarity {near.similarity:.2f})")
+        return jd_data
+
+    async def analyze(
+        self,
+        jd_text: str,
+        company: Optional[str] = None,
+        position: Optional[str] = None,
+    ) -> Tuple[str, dict, bool]:
+        """分析JD，返回 (jd_hash, jd_data, 是否复用已有结果)"""
+        jd_hash = jd_text_hash(jd_text)
+
+        if jd_hash not in self._inflight:
+            cached = await self._load(jd_hash)
+            if cached is not None:
+                self.hits += 1
+                return jd_hash, self._with_overrides(cached, company, position), True
+
+        # 分析在独立任务中执行，发起者和等待者都通过 shield 等待：
+        # 任何一个调用方被取消都不会取消分析本身，也不会影响其他调用方
+        task = self._inflight.get(jd_hash)
+        joined = task is not None
+        if joined:
+            self.hits += 1
+        else:
+            task = asyncio.create_task(self._run(jd_hash, jd_text, company, position))
+            self._inflight[jd_hash] = task
+            task.add_done_callback(lambda t: self._finish(jd_hash, t))
+
+        jd_data, reused = await asyncio.shield(task)
+        return jd_hash, self._with_overrides(jd_data, company, position), joined or reused
+
+    async def _run(
+        self,
+        jd_hash: str,
+        jd_text: str,
+        company: Optional[str],
+        position: Optional[str],
+    ) -> Tuple[dict, bool]:
+        """复用近似重复JD的结果或调用模型分析，返回 (jd_data, 是否复用)"""
+        jd_data = await self._reuse_near_duplicate(jd_hash, jd_text)
+        if jd_data is not None:
+            self.hits += 1
+            return jd_data, True
+
+        self.misses += 1
+        async with self._semaphore:
+            jd_data = await analyze_jd_text(self.claude, jd_text, company, position)
+        await self._store(jd_hash, jd_data)
+        await jd_near_duplicates.add(jd_hash, jd_text)
+        return jd_data, False
+
+    def _finish(self, jd_hash: str, task: "asyncio.Task[Tuple[dict, bool]]") -> None:
+        if self._inflight.get(jd_hash) is task:
+            del self._inflight[jd_hash]
+        if not task.cancelled():
+            task.exception()  # 调用方都已取消时避免 "exception was never retrieved"
+
+async def save_user_jd(
+    user_id: str,
+    jd_hash: str,
+    jd_text: str,
+    jd_data: Dict[str, Any],
+    url: Optional[str] = None,
+) -> str:
+    """保存到用户JD库（同一用户的相同JD只保留一条），返回 user_jds.id"""
+    values = {
+        "company": jd_data.get("company"),
+        "position": jd_data.get("position"),
+        "url": url,
+        "jd_text": jd_text,
+        "jd_data": jd_data,
+        "created_at": datetime.utcnow(),
+    }
+    async with async_session() as db:
+        result = await db.execute(
+            insert(UserJD)
+            .values(id=str(uuid.uuid4()), user_id=user_id, jd_hash=jd_hash, **values)
+            .on_conflict_do_update(index_elements=[UserJD.user_id, UserJD.jd_hash], set_=values)
+            .returning(UserJD.id)
+        )
+        jd_id = result.scalar_one()
+        await db.commit()
+    return jd_id
+
+
+jd_analyzer = JDAnalyzer(max_concurrency=settings.jd_analyze_concurrency)
@@ -0,0 +1,304 @@
+import asyncio
+import re
+import unicodedata
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from app.config import settings
+from app.core.text_matcher import ascii_lower
+from app.database import async_session
+from app.models.jd_signature import JDSignature
+
+SHINGLE_SIZE = 5
+# 签名计算时每批处理的 shingle 数，控制中间矩阵大小
+SHINGLE_CHUNK = 2048
+# 新增签名先放在待合并区，超过该数量再合并进有序数组
+PENDING_LIMIT = 4096
+LOAD_BATCH_SIZE = 10000
+# 每次查询最多比较的候选签名数
+MAX_CANDIDATES = 100
+# 固定种子：持久化的签名在重启后仍然可比
+MINHASH_SEED = 20240601
+
+_BAND_MIX = np.random.default_rng(MINHASH_SEED + 1).integers(
+    1, np.iinfo(np.int64).max, size=256, dtype=np.uint64
+) | np.uint64(1)
+
+BULLET_RE = re.compile(r"^\s*(?:[-*•·●▪◆■]|\d{1,2}\s*[.、)）]|[（(]\d{1,2}[)）])\s*", re.MULTILINE)
+SEGMENT_RE = re.compile(r"[\n。；;！!？?]+")
+NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def jd_segments(text: str) -> List[str]:
+    """按行和句子切分，去掉列表符号、空白和标点
+
+    shingle 在每段内部生成，条目顺序调整或排版不同的JD得到几乎相同的 shingle 集合。
+    """
+    text = BULLET_RE.sub("", unicodedata.normalize("NFKC", text))
+    segments = (NON_WORD_RE.sub("", ascii_lower(segment)) for segment in SEGMENT_RE.split(text))
+    return [segment for segment in segments if segment]
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    shingles = []
+    for segment in jd_segments(text):
+        if len(segment) <= SHINGLE_SIZE:
+            shingles.append(segment)
+        else:
+            shingles.extend(segment[i:i + SHINGLE_SIZE] for i in range(len(segment) - SHINGLE_SIZE + 1))
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64)
+    return np.unique(hashes)
+
+
+class MinHasher:
+    """MinHash 签名：每个置换用 multiply-shift 哈希，取 shingle 哈希的最小值"""
+
+    def __init__(self, num_perm: int, seed: int = MINHASH_SEED):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, np.iinfo(np.int64).max, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = shingle_hashes(text)
+        signature = np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for start in range(0, len(hashes), SHINGLE_CHUNK):
+                chunk = hashes[start:start + SHINGLE_CHUNK, None]
+                permuted = (chunk * self._a + self._b) >> np.uint64(32)
+                np.minimum(signature, permuted.min(axis=0), out=signature)
+        return signature.astype(np.uint32)
+
+
+def band_keys(signatures: np.ndarray, bands: int) -> np.ndarray:
+    """把签名按段折叠为 uint32 键，返回形状 (n, bands)"""
+    signatures = np.atleast_2d(signatures)
+    rows = signatures.reshape(len(signatures), bands, -1).astype(np.uint64)
+    with np.errstate(over="ignore"):
+        keys = (rows * _BAND_MIX[:rows.shape[2]]).sum(axis=2, dtype=np.uint64)
+    return (keys ^ (keys >> np.uint64(32))).astype(np.uint32)
+
+
+class LSHIndex:
+    """按段分桶的 LSH 索引
+
+    每段一个有序 uint32 键数组和对应的 int32 文档编号数组，查询用二分查找；
+    100 万条 JD、16 段时约占 128MB。新增条目先进入待合并区，攒够后排序并插入有序数组。
+    """
+
+    def __init__(self, bands: int):
+        self.bands = bands
+        self._keys = [np.empty(0, dtype=np.uint32) for _ in range(bands)]
+        self._ids = [np.empty(0, dtype=np.int32) for _ in range(bands)]
+        self._pending_ids: List[int] = []
+        self._pending_keys: List[np.ndarray] = []
+        self._flushing = False
+
+    @classmethod
+    def build(cls, bands: int, ids: np.ndarray, keys: np.ndarray) -> "LSHIndex":
+        index = cls(bands)
+        index._keys, index._ids = index._merged(ids.astype(np.int32), keys)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._ids[0]) + len(self._pending_ids)
+
+    def _merged(self, ids: np.ndarray, keys: np.ndarray) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """只对新增条目排序，再按二分查找的位置插入有序数组，返回新数组，不修改当前索引"""
+        merged_keys, merged_ids = [], []
+        for band in range(self.bands):
+            order = np.argsort(keys[:, band], kind="stable")
+            new_keys = keys[order, band]
+            positions = np.searchsorted(self._keys[band], new_keys, side="right")
+            merged_keys.append(np.insert(self._keys[band], positions, new_keys))
+            merged_ids.append(np.insert(self._ids[band], positions, ids[order]))
+        return merged_keys, merged_ids
+
+    def add(self, doc_id: int, keys: np.ndarray) -> None:
+        self._pending_ids.append(doc_id)
+        self._pending_keys.append(keys)
+
+    @property
+    def needs_flush(self) -> bool:
+        return len(self._pending_ids) >= PENDING_LIMIT and not self._flushing
+
+    async def flush(self) -> None:
+        """在线程中把待合并区合并进有序数组
+
+        合并期间条目仍留在待合并区，查询不受影响；合并完成后在事件循环中
+        一次性替换数组并移出已合并的条目，查询不会看到合并到一半的索引。
+        """
+        if self._flushing or not self._pending_ids:
+            return
+        self._flushing = True
+        try:
+            count = len(self._pending_ids)
+            ids = np.asarray(self._pending_ids[:count], dtype=np.int32)
+            keys = np.stack(self._pending_keys[:count])
+            self._keys, self._ids = await asyncio.to_thread(self._merged, ids, keys)
+            del self._pending_ids[:count]
+            del self._pending_keys[:count]
+        finally:
+            self._flushing = False
+
+    def candidates(self, keys: np.ndarray) -> Counter:
+        """返回候选文档编号及其命中的段数"""
+        result: Counter = Counter()
+        for band in range(self.bands):
+            sorted_keys = self._keys[band]
+            lo = np.searchsorted(sorted_keys, keys[band], side="left")
+            hi = np.searchsorted(sorted_keys, keys[band], side="right")
+            result.update(self._ids[band][lo:hi].tolist())
+        for doc_id, pending in zip(self._pending_ids, self._pending_keys):
+            matched = int(np.count_nonzero(pending == keys))
+            if matched:
+                result[doc_id] += matched
+        return result
+
+
+@dataclass
+class NearDuplicate:
+    jd_hash: str
+    similarity: float
+
+
+class JDNearDuplicateIndex:
+    """已分析JD的近似重复检测（MinHash + LSH）
+
+    签名持久化在 jd_signatures 表，启动时在后台加载进内存索引；
+    加载完成前查询直接返回未命中。LSH 只用于找候选，最终按签名估计的
+    Jaccard 相似度与阈值比较。
+    """
+
+    def __init__(self, num_perm: int, bands: int, threshold: float):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.minhasher = MinHasher(num_perm)
+        self._index = LSHIndex(bands)
+        self._loader: Optional[asyncio.Task] = None
+        # 加载期间新增的签名；旧索引可能已把它们合并进有序数组，不能只看待合并区
+        self._added_during_load: Optional[List[Tuple[int, np.ndarray]]] = None
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def start(self) -> None:
+        if self._loader is None:
+            self._loader = asyncio.create_task(self._load())
+
+    async def stop(self) -> None:
+        if self._loader is not None and not self._loader.done():
+            self._loader.cancel()
+            await asyncio.gather(self._loader, return_exceptions=True)
+
+    async def _load(self) -> None:
+        self._added_during_load = []
+        try:
+            await self._load_signatures()
+        except Exception as e:
+            print(f"Failed to load JD signatures: {e}")
+        finally:
+            self._added_during_load = None
+        # 加载失败时以空索引继续工作，新分析的JD仍会加入
+        self.ready = True
+
+    async def _load_signatures(self) -> None:
+        ids, keys, last_id = [], [], 0
+        expected_bytes = self.minhasher.num_perm * 4
+        while True:
+            async with async_session() as db:
+                result = await db.execute(
+                    select(JDSignature.id, JDSignature.signature)
+                    .where(JDSignature.id > last_id)
+                    .order_by(JDSignature.id)
+                    .limit(LOAD_BATCH_SIZE)
+                )
+                rows = result.all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            # 签名长度与当前配置不同（修改过 permutations）的旧签名跳过
+            rows = [row for row in rows if len(row.signature) == expected_bytes]
+            if rows:
+                signatures = np.frombuffer(b"".join(row.signature for row in rows), dtype=np.uint32)
+                ids.append(np.fromiter((row.id for row in rows), dtype=np.int32, count=len(rows)))
+                keys.append(band_keys(signatures.reshape(len(rows), -1), self.bands))
+
+        if ids:
+            index = await asyncio.to_thread(LSHIndex.build, self.bands, np.concatenate(ids), np.concatenate(keys))
+            # 编号大于 last_id 的签名在最后一次查询之后才写入，没有被加载；
+            # 从这里到替换索引之间没有 await，不会再漏掉新增的签名
+            for doc_id, doc_keys in self._added_during_load:
+                if doc_id > last_id:
+                    index.add(doc_id, doc_keys)
+            self._index = index
+            if index.needs_flush:
+                await index.flush()
+        print(f"JD near-duplicate index loaded: {len(self._index)} signatures")
+
+    async def find(self, jd_text: str) -> Optional[NearDuplicate]:
+        """查找与 jd_text 近似重复的已分析JD"""
+        if not self.ready:
+            return None
+
+        signature = self.minhasher.signature(jd_text)
+        candidates = self._index.candidates(band_keys(signature, self.bands)[0])
+        if not candidates:
+            return None
+
+        async with async_session() as db:
+            result = await db.execute(
+                select(JDSignature.jd_hash, JDSignature.signature)
+                # 命中段数越多，相似度越可能高；只取最相似的一批比较签名
+                .where(JDSignature.id.in_([doc_id for doc_id, _ in candidates.most_common(MAX_CANDIDATES)]))
+            )
+            rows = result.all()
+
+        best: Optional[NearDuplicate] = None
+        for row in rows:
+            other = np.frombuffer(row.signature, dtype=np.uint32)
+            if len(other) != len(signature):
+                continue
+            similarity = float(np.mean(other == signature))
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = NearDuplicate(jd_hash=row.jd_hash, similarity=similarity)
+        return best
+
+    async def add(self, jd_hash: str, jd_text: str) -> None:
+        """记录新分析的JD签名"""
+        signature = self.minhasher.signature(jd_text)
+        async with async_session() as db:
+            result = await db.execute(
+                insert(JDSignature)
+                .values(jd_hash=jd_hash, signature=signature.tobytes())
+                .on_conflict_do_nothing(index_elements=[JDSignature.jd_hash])
+                .returning(JDSignature.id)
+            )
+            doc_id = result.scalar_one_or_none()
+            await db.commit()
+
+        if doc_id is not None:
+            keys = band_keys(signature, self.bands)[0]
+            if self._added_during_load is not None:
+                self._added_during_load.append((doc_id, keys))
+            index = self._index
+            index.add(doc_id, keys)
+            if index.needs_flush:
+                await index.flush()
+
+
+jd_near_duplicates = JDNearDuplicateIndex(
+    num_perm=settings.jd_minhash_permutations,
+    bands=settings.jd_lsh_bands,
+    threshold=settings.jd_near_duplicate_threshold,
+)
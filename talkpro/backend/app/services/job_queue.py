@@ -0,0 +1,371 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import select, update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.models.job import Job, JobStatus
+
+TERMINAL_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+
+@dataclass
+class JobContext:
+    """传给任务处理函数的上下文"""
+    queue: "JobQueue"
+    job_id: str
+    job_type: str
+    user_id: Optional[str]
+    payload: Dict[str, Any]
+    attempt: int
+
+    async def progress(self, progress: int, message: str = "") -> None:
+        """更新进度（0-100）并推送给订阅者"""
+        await self.queue._update(self.job_id, progress=progress, message=message)
+
+    def emit(self, data: Dict[str, Any]) -> None:
+        """推送一条中间结果给订阅者（不落库，只在本次执行期间保留）"""
+        self.queue._publish_partial(self.job_id, data)
+
+
+JobHandler = Callable[[JobContext], Awaitable[Any]]
+
+
+@dataclass
+class _HandlerSpec:
+    func: JobHandler
+    concurrency: int
+    max_attempts: int
+
+
+def job_to_event(job: Job) -> Dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "type": job.type,
+        "status": job.status.value if isinstance(job.status, JobStatus) else job.status,
+        "progress": job.progress,
+        "message": job.message,
+        "result": job.result,
+        "error": job.error,
+        "attempts": job.attempts,
+    }
+
+
+class JobQueue:
+    """基于 SQLite jobs 表的进程内持久化任务队列
+
+    - 任务先写入 jobs 表再执行，进程重启后未完成的任务会重新排队
+    - 每种任务类型有独立的并发上限，另有全局并发上限
+    - 失败按指数退避重试，超过 max_attempts 后标记为失败
+    - 进度和状态变化推送给 subscribe() 的订阅者（SSE 使用）
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        default_concurrency: int,
+        poll_interval: float,
+        retry_base_seconds: float,
+    ):
+        self.max_concurrency = max_concurrency
+        self.default_concurrency = default_concurrency
+        self.poll_interval = poll_interval
+        self.retry_base_seconds = retry_base_seconds
+
+        self._handlers: Dict[str, _HandlerSpec] = {}
+        self._running: Dict[str, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._partials: Dict[str, List[Dict[str, Any]]] = {}  # 运行中任务本次执行的中间结果
+        self._wakeup = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def handler(
+        self,
+        job_type: str,
+        concurrency: Optional[int] = None,
+        max_attempts: int = 3,
+    ) -> Callable[[JobHandler], JobHandler]:
+        """注册任务处理函数，处理函数的返回值保存为任务结果"""
+        def decorator(func: JobHandler) -> JobHandler:
+            self._handlers[job_type] = _HandlerSpec(
+                func=func,
+                concurrency=concurrency or self.default_concurrency,
+                max_attempts=max_attempts,
+            )
+            return func
+        return decorator
+
+    async def enqueue(
+        self,
+        job_type: str,
+        payload: Dict[str, Any],
+        user_id: Optional[str] = None,
+        dedupe_key: Optional[str] = None,
+    ) -> Job:
+        """提交任务；dedupe_key 相同的任务正在排队或运行时直接返回该任务，已结束的任务不影响重新提交"""
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        async with async_session() as db:
+            if dedupe_key:
+                existing = await self._find_active(db, dedupe_key)
+                if existing:
+                    return existing
+
+            job = Job(
+                type=job_type,
+                user_id=user_id,
+                dedupe_key=dedupe_key,
+                payload=payload,
+                status=JobStatus.QUEUED,
+                max_attempts=self._handlers[job_type].max_attempts,
+                run_after=datetime.utcnow(),
+            )
+            db.add(job)
+            try:
+                await db.commit()
+            except IntegrityError:
+                # 同一 dedupe_key 的任务被并发提交，返回先提交成功的那个
+                await db.rollback()
+                existing = await self._find_active(db, dedupe_key) if dedupe_key else None
+                if existing is None:
+                    raise
+                return existing
+            await db.refresh(job)
+
+        self._wakeup.set()
+        return job
+
+    async def _find_active(self, db: AsyncSession, dedupe_key: str) -> Optional[Job]:
+        result = await db.execute(
+            select(Job)
+            .where(Job.dedupe_key == dedupe_key)
+            .where(Job.status.in_((JobStatus.QUEUED, JobStatus.RUNNING)))
+            .order_by(Job.created_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        async with async_session() as db:
+            return await db.get(Job, job_id)
+
+    async def depth(self) -> int:
+        """排队中的任务数"""
+        async with async_session() as db:
+            result = await db.execute(
+                select(func.count(Job.id)).where(Job.status == JobStatus.QUEUED)
+            )
+            return result.scalar() or 0
+
+    @property
+    def running(self) -> int:
+        return sum(self._running.values())
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(job_id)
+        if subscribers:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[job_id]
+
+    async def events(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """依次产出任务的当前状态、之后的状态变化和中间结果，任务结束后停止
+
+        中间结果形如 {"job_id": ..., "partial": {...}}，其余为 job_to_event 的格式。
+        订阅前本次执行已产生的中间结果会先补发。
+        """
+        # 订阅和取已有中间结果之间没有 await，不会漏也不会重复
+        queue = self.subscribe(job_id)
+        missed = list(self._partials.get(job_id, ()))
+        try:
+            job = await self.get(job_id)
+            if job is None:
+                return
+            event = job_to_event(job)
+            if event["status"] not in {s.value for s in TERMINAL_STATUSES}:
+                for data in missed:
+                    yield {"job_id": job_id, "partial": data}
+            while True:
+                yield event
+                if event.get("status") in {s.value for s in TERMINAL_STATUSES}:
+                    return
+                event = await queue.get()
+        finally:
+            self.unsubscribe(job_id, queue)
+
+    async def wait(self, job_id: str) -> Optional[Job]:
+        """等待任务结束（成功或最终失败），返回结束时的任务"""
+        async for _ in self.events(job_id):
+            pass
+        return await self.get(job_id)
+
+    def _publish(self, job: Job) -> None:
+        event = job_to_event(job)
+        for queue in self._subscribers.get(job.id, ()):
+            queue.put_nowait(event)
+
+    def _publish_partial(self, job_id: str, data: Dict[str, Any]) -> None:
+        if job_id in self._partials:
+            self._partials[job_id].append(data)
+        event = {"job_id": job_id, "partial": data}
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait(event)
+
+    async def _update(self, job_id: str, **values) -> Optional[Job]:
+        async with async_session() as db:
+            job = await db.get(Job, job_id)
+            if not job:
+                return None
+            for key, value in values.items():
+                setattr(job, key, value)
+            await db.commit()
+            await db.refresh(job)
+
+        self._publish(job)
+        return job
+
+    async def start(self) -> None:
+        """启动调度；上次进程退出时仍在运行的任务重新排队"""
+        if self._dispatcher is not None:
+            return
+
+        async with async_session() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.status == JobStatus.RUNNING)
+                .values(status=JobStatus.QUEUED, run_after=datetime.utcnow())
+            )
+            await db.commit()
+
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def stop(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                await self._dispatch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Job dispatcher error: {e}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _dispatch(self) -> None:
+        for job_type, spec in self._handlers.items():
+            while (
+                self.running < self.max_concurrency
+                and self._running.get(job_type, 0) < spec.concurrency
+            ):
+                job = await self._claim(job_type)
+                if not job:
+                    break
+
+                self._running[job_type] = self._running.get(job_type, 0) + 1
+                task = asyncio.create_task(self._execute(job, spec))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _claim(self, job_type: str) -> Optional[Job]:
+        """原子地把一条到期的排队任务置为运行中"""
+        now = datetime.utcnow()
+        next_id = (
+            select(Job.id)
+            .where(Job.type == job_type)
+            .where(Job.status == JobStatus.QUEUED)
+            .where(Job.run_after <= now)
+            .order_by(Job.created_at)
+            .limit(1)
+            .scalar_subquery()
+        )
+        async with async_session() as db:
+            result = await db.execute(
+                update(Job)
+                .where(Job.id == next_id)
+                .where(Job.status == JobStatus.QUEUED)
+                .values(status=JobStatus.RUNNING, attempts=Job.attempts + 1, message=None, updated_at=now)
+                .returning(Job)
+                .execution_options(synchronize_session=False)
+            )
+            job = result.scalar_one_or_none()
+            await db.commit()
+        return job
+
+    async def _execute(self, job: Job, spec: _HandlerSpec) -> None:
+        self._partials[job.id] = []
+        self._publish(job)
+        context = JobContext(
+            queue=self,
+            job_id=job.id,
+            job_type=job.type,
+            user_id=job.user_id,
+            payload=job.payload or {},
+            attempt=job.attempts,
+        )
+        try:
+            result = await spec.func(context)
+            await self._update(
+                job.id,
+                status=JobStatus.SUCCEEDED,
+                result=result,
+                error=None,
+                progress=100,
+                finished_at=datetime.utcnow(),
+            )
+        except asyncio.CancelledError:
+            # 进程退出，保留 running 状态，下次启动时重新排队
+            raise
+        except Exception as e:
+            print(f"Job {job.id} ({job.type}) failed on attempt {job.attempts}: {e}")
+            if job.attempts < job.max_attempts:
+                delay = self.retry_base_seconds * (2 ** (job.attempts - 1))
+                await self._update(
+                    job.id,
+                    status=JobStatus.QUEUED,
+                    error=str(e),
+                    message=f"第{job.attempts}次执行失败，{delay:.0f}秒后重试",
+                    run_after=datetime.utcnow() + timedelta(seconds=delay),
+                )
+            else:
+                await self._update(
+                    job.id,
+                    status=JobStatus.FAILED,
+                    error=str(e),
+                    finished_at=datetime.utcnow(),
+                )
+        finally:
+            self._partials.pop(job.id, None)
+            self._running[job.type] -= 1
+            self._wakeup.set()
+
+
+job_queue = JobQueue(
+    max_concurrency=settings.job_max_concurrency,
+    default_concurrency=settings.job_default_concurrency,
+    poll_interval=settings.job_poll_interval_seconds,
+    retry_base_seconds=settings.job_retry_base_seconds,
+)
@@ -0,0 +1,396 @@
+import asyncio
+import hashlib
+import json
+import re
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.services.question_bank import Question, question_bank
+
+WORKER_SCRIPT = Path(__file__).resolve().parent / "judge_worker.py"
+# 子进程被 RLIMIT_CPU 杀掉时收到的信号
+SIGXCPU = 24
+# 子进程可以报告的失败状态；"passed" 只由父进程比较结果后给出
+WORKER_FAILURES = ("runtime_error", "time_limit", "memory_limit")
+# 同一份代码重复提交时直接返回缓存的结果
+VERDICT_CACHE_SIZE = 256
+
+# "nums = [2,7,11,15], target = 9" 按参数名切分
+_ARG_SPLIT_RE = re.compile(r",\s*(?=[A-Za-z_]\w*\s*=)")
+_NAMED_ARG_RE = re.compile(r"^\s*([A-Za-z_]\w*)\s*=\s*(.*?)\s*$", re.S)
+
+
+class JudgeError(Exception):
+    """题目不支持判题或判题配置有误"""
+
+
+def parse_value(text: str) -> Any:
+    """题目示例中的值：能按 JSON 解析的按 JSON（true/false/null），否则视为原样字符串"""
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def normalize(value: Any, compare: str) -> Any:
+    """按比较方式规整结果：unordered 忽略顺序，unordered_nested 内外层都忽略顺序"""
+    if compare == "unordered" and isinstance(value, list):
+        return sorted(value, key=repr)
+    if compare == "unordered_nested" and isinstance(value, list):
+        return sorted((sorted(v, key=repr) if isinstance(v, list) else v for v in value), key=repr)
+    return value
+
+
+def parse_input(text: str, params: List[str]) -> Dict[str, Any]:
+    """解析示例输入 "a = 1, b = [2]"；没有参数名时整个输入是第一个参数的值"""
+    if not _NAMED_ARG_RE.match(text.split(",", 1)[0]):
+        if len(params) != 1:
+            raise JudgeError(f"无法解析输入: {text}")
+        return {params[0]: parse_value(text)}
+
+    args = {}
+    for part in _ARG_SPLIT_RE.split(text):
+        m = _NAMED_ARG_RE.match(part)
+        if not m:
+            raise JudgeError(f"无法解析输入: {text}")
+        args[m.group(1)] = parse_value(m.group(2))
+    missing = [p for p in params if p not in args]
+    if missing:
+        raise JudgeError(f"输入缺少参数 {missing}: {text}")
+    return args
+
+
+@dataclass(frozen=True)
+class JudgeCase:
+    index: int
+    hidden: bool
+    input: str  # 原始输入文本，用于反馈
+    args: Dict[str, Any]
+    expected: Any
+
+
+@dataclass
+class CaseResult:
+    case: JudgeCase
+    status: str  # passed / wrong_answer / runtime_error / time_limit / memory_limit
+    runtime_ms: Optional[float] = None
+    peak_kb: Optional[int] = None
+    actual: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def passed(self) -> bool:
+        return self.status == "passed"
+
+
+@dataclass
+class Verdict:
+    status: str  # accepted / compile_error / 首个失败用例的状态
+    passed: int
+    total: int
+    max_runtime_ms: Optional[float] = None
+    peak_kb: Optional[int] = None
+    failure: Optional[CaseResult] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """发给候选人的结果；隐藏用例不包含输入和期望输出"""
+        failure = None
+        if self.failure:
+            case = self.failure.case
+            failure = {
+                "case": case.index,
+                "hidden": case.hidden,
+                "status": self.failure.status,
+                "input": None if case.hidden else case.input,
+                "expected": None if case.hidden else json.dumps(case.expected, ensure_ascii=False),
+                "actual": self.failure.actual,
+                "error": self.failure.error,
+            }
+        return {
+            "status": self.status,
+            "passed": self.passed,
+            "total": self.total,
+            "max_runtime_ms": self.max_runtime_ms,
+            "peak_kb": self.peak_kb,
+            "failure": failure,
+            "error": self.error,
+        }
+
+    def summary(self) -> str:
+        """给面试官模型的简短结论（英文，与面试官提示词一致）；隐藏用例只给编号和状态"""
+        if self.status == "compile_error":
+            return f"Judge: compile error - {self.error}"
+        parts = [f"Judge: {self.status}, {self.passed}/{self.total} tests passed"]
+        if self.failure:
+            f = self.failure
+            if f.case.hidden:
+                # 隐藏用例的输入、期望输出和实际输出都不给模型，避免转述给候选人
+                parts.append(f"first failure on hidden test {f.case.index + 1} ({f.status})")
+            else:
+                detail = f"first failure on example {f.case.index + 1} ({f.status}): input {f.case.input}"
+                detail += f", expected {json.dumps(f.case.expected, ensure_ascii=False)}"
+                if f.actual is not None:
+                    detail += f", got {f.actual}"
+                if f.error:
+                    detail += f", error {f.error}"
+                parts.append(detail)
+        if self.max_runtime_ms is not None:
+            parts.append(f"max runtime {self.max_runtime_ms:.1f} ms")
+        if self.peak_kb is not None:
+            parts.append(f"peak memory {self.peak_kb / 1024:.1f} MB")
+        return "; ".join(parts) + "."
+
+
+def build_cases(question: Question) -> Tuple[Dict[str, Any], List[JudgeCase]]:
+    """题目的判题配置和测试用例（示例在前，隐藏用例在后）"""
+    spec = question.data.get("judge")
+    if not spec:
+        raise JudgeError(f"题目 {question.id} 不支持判题")
+    params = spec["params"]
+    raw = [(ex, False) for ex in question.data.get("examples", [])]
+    raw += [(ex, True) for ex in spec.get("hidden_tests", [])]
+    cases = [
+        JudgeCase(
+            index=i,
+            hidden=hidden,
+            input=ex["input"],
+            args=parse_input(ex["input"], params),
+            expected=parse_value(ex["output"]),
+        )
+        for i, (ex, hidden) in enumerate(raw)
+    ]
+    return spec, cases
+
+
+class JudgePool:
+    """预先启动的判题子进程
+
+    保持 size 个空闲子进程（解释器和常用模块已加载），每个用例取一个执行，
+    用完即退出并在后台补充新进程，用例之间互不影响。子进程内由 rlimit
+    限制 CPU 时间、内存，禁止写文件和创建子进程；墙钟超时由父进程强制结束。
+    rlimit 不隔离网络和文件读取（以 root 运行时进程数限制也不生效），
+    部署时应让服务以低权限用户运行在容器中。
+    """
+
+    def __init__(self, size: int, cpu_seconds: int, memory_mb: int, wall_seconds: float):
+        self.size = size
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.wall_seconds = wall_seconds
+        self._idle: List[asyncio.subprocess.Process] = []
+        self._spawning = 0
+        self._tasks: Set[asyncio.Task] = set()
+        self._semaphore = asyncio.Semaphore(size)
+        self._stopped = False
+
+    async def _spawn(self) -> asyncio.subprocess.Process:
+        return await asyncio.create_subprocess_exec(
+            sys.executable, "-I", "-S", str(WORKER_SCRIPT),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            cwd="/",
+            env={},
+        )
+
+    async def _replenish(self) -> None:
+        try:
+            process = await self._spawn()
+        except Exception as e:
+            print(f"Failed to spawn judge worker: {e}")
+            return
+        finally:
+            self._spawning -= 1
+        if self._stopped:
+            process.kill()
+            await process.wait()
+        else:
+            self._idle.append(process)
+
+    def _fill(self) -> None:
+        for _ in range(self.size - len(self._idle) - self._spawning):
+            self._spawning += 1
+            task = asyncio.create_task(self._replenish())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def start(self) -> None:
+        self._stopped = False
+        self._fill()
+
+    async def stop(self) -> None:
+        self._stopped = True
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        idle, self._idle = self._idle, []
+        for process in idle:
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
+
+    async def _take(self) -> asyncio.subprocess.Process:
+        while self._idle:
+            process = self._idle.pop()
+            if process.returncode is None:
+                return process
+        return await self._spawn()
+
+    async def execute(
+        self,
+        job: Dict[str, Any],
+        cpu_seconds: Optional[int] = None,
+        wall_seconds: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """在一个子进程中执行任务，返回子进程输出的结果（总含 status）"""
+        cpu_seconds = cpu_seconds or self.cpu_seconds
+        job = {**job, "cpu_seconds": cpu_seconds, "memory_mb": self.memory_mb}
+        async with self._semaphore:
+            process = await self._take()
+            if not self._stopped:
+                self._fill()
+
+            try:
+                stdout, _ = await asyncio.wait_for(
+                    process.communicate(json.dumps(job).encode()),
+                    timeout=wall_seconds or self.wall_seconds,
+                )
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                return {"status": "time_limit"}
+            except asyncio.CancelledError:
+                process.kill()
+                await process.wait()
+                raise
+
+        if process.returncode == -SIGXCPU:
+            return {"status": "time_limit"}
+        try:
+            return json.loads(stdout.decode(errors="replace").strip().rsplit("\n", 1)[-1])
+        except (ValueError, IndexError):
+            # 没有输出结果：多半是超出内存被系统杀掉
+            return {
+                "status": "memory_limit" if process.returncode and process.returncode < 0 else "runtime_error",
+                "error": f"判题进程异常退出（{process.returncode}）",
+            }
+
+    async def run(self, job: Dict[str, Any], case: JudgeCase) -> CaseResult:
+        """运行一个测试用例
+
+        期望输出不发给子进程：子进程只返回结果，在这里比较。
+        """
+        result = await self.execute({**job, "args": case.args})
+        status = result.get("status")
+        if status == "ok":
+            compare = job.get("compare", "exact")
+            passed = normalize(result.get("value"), compare) == normalize(case.expected, compare)
+            status = "passed" if passed else "wrong_answer"
+        elif status not in WORKER_FAILURES:
+            result = {"error": f"判题进程输出无效（{str(status)[:40]}）"}
+            status = "runtime_error"
+        return CaseResult(
+            case=case,
+            status=status,
+            runtime_ms=result.get("runtime_ms"),
+            peak_kb=result.get("peak_kb"),
+            actual=result.get("actual"),
+            error=result.get("error"),
+        )
+
+
+class Judge:
+    """在本地沙箱中运行算法题提交，示例和隐藏用例并行执行"""
+
+    def __init__(self, pool: JudgePool):
+        self.pool = pool
+        self._cache: "OrderedDict[Tuple[str, Tuple[int, int], str], Verdict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def supports(self, question_id: Optional[str]) -> bool:
+        question = question_bank.get(question_id) if question_id else None
+        return bool(question and question.data.get("judge"))
+
+    async def judge(self, question_id: str, code: str) -> Verdict:
+        """运行全部用例并汇总结果
+
+        Raises:
+            JudgeError: 题目不存在或不支持判题
+        """
+        question = question_bank.get(question_id)
+        if question is None:
+            raise JudgeError(f"题目不存在: {question_id}")
+
+        key = (question_id, question_bank.version, hashlib.sha256(code.encode()).hexdigest())
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        self.misses += 1
+
+        spec, cases = build_cases(question)
+        try:
+            compile(code, "<submission>", "exec")
+        except (SyntaxError, ValueError) as e:
+            verdict = Verdict(status="compile_error", passed=0, total=len(cases), error=str(e))
+        else:
+            job = {
+                "code": code,
+                "entry": spec["entry"],
+                "types": spec.get("types"),
+                "returns": spec.get("returns"),
+                "result_arg": spec.get("result_arg"),
+                "compare": spec.get("compare", "exact"),
+            }
+            verdict = self._summarize(await self._run_cases(job, cases), len(cases))
+
+        self._cache[key] = verdict
+        if len(self._cache) > VERDICT_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return verdict
+
+    async def _run_cases(self, job: Dict[str, Any], cases: List[JudgeCase]) -> List[CaseResult]:
+        """并行运行用例；出现超时后取消其余用例，不再等它们逐个超时"""
+        pending = {asyncio.create_task(self.pool.run(job, case)) for case in cases}
+        results: List[CaseResult] = []
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                results.extend(task.result() for task in done)
+                if any(r.status == "time_limit" for r in results):
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        return sorted(results, key=lambda r: r.case.index)
+
+    @staticmethod
+    def _summarize(results: List[CaseResult], total: int) -> Verdict:
+        """total 为全部用例数，提前结束时未运行的用例算作未通过"""
+        failure = next((r for r in results if not r.passed), None)
+        runtimes = [r.runtime_ms for r in results if r.runtime_ms is not None]
+        peaks = [r.peak_kb for r in results if r.peak_kb is not None]
+        return Verdict(
+            status=failure.status if failure else "accepted",
+            passed=sum(r.passed for r in results),
+            total=total,
+            max_runtime_ms=max(runtimes) if runtimes else None,
+            peak_kb=max(peaks) if peaks else None,
+            failure=failure,
+        )
+
+
+judge = Judge(JudgePool(
+    size=settings.judge_workers,
+    cpu_seconds=settings.judge_cpu_seconds,
+    memory_mb=settings.judge_memory_mb,
+    wall_seconds=settings.judge_wall_seconds,
+))
@@ -0,0 +1,368 @@
+"""判题子进程
+
+由 judge.JudgePool 预先启动（python -I -S 运行本文件，不导入 app），启动后阻塞在
+stdin 上等待一个测试用例，执行完输出一行 JSON 结果后退出，每个用例一个进程。
+
+输入（stdin，一个 JSON 对象）：
+    code, entry, args, types, returns, result_arg, cpu_seconds, memory_mb
+输出（结果通道的最后一行）：
+    {"status", "runtime_ms", "peak_kb", "value", "actual", "error"}
+
+status 为 "ok" 表示正常返回，value 是转换为 JSON 的返回值。期望输出不发给子进程，
+由父进程比较：提交代码和本进程共享内存与文件描述符，子进程给出的任何结论都可以
+被伪造，不知道期望输出就无法伪造出通过。结果通道是启动时复制出的原 stdout，
+执行提交代码前 fd 0/1 已指向 /dev/null，写 stdout（包括 sys.__stdout__、os.write(1)）
+不会混入结果。
+
+mode 为 "profile" 时不跑测试用例，而是按 profile 描述生成规模逐步翻倍的输入，
+输出每个规模的耗时和额外内存（调用期间的内存峰值减去返回后仍占用的部分，
+即不含返回值）：{"status", "sizes", "times_ms", "memory_bytes"}
+"""
+import io
+import json
+import os
+import random
+import resource
+import signal
+import sys
+import time
+import tracemalloc
+import traceback
+
+# 提交代码里常用的模块预先导入，执行时直接可用（与常见判题平台一致）
+import bisect
+import collections
+import functools
+import heapq
+import itertools
+import math
+import re
+import string
+import typing
+
+MAX_REPR = 200
+
+# 复杂度测量：输入规模从 PROFILE_MIN_SIZE 开始翻倍，单个规模重复 2 到 PROFILE_REPEATS 次取最小值
+PROFILE_MIN_SIZE = 64
+PROFILE_MAX_SIZE = 1 << 16
+PROFILE_REPEATS = 5
+PROFILE_MIN_SAMPLE_SECONDS = 0.005
+
+
+class ListNode:
+    def __init__(self, val=0, next=None):
+        self.val = val
+        self.next = next
+
+
+class TreeNode:
+    def __init__(self, val=0, left=None, right=None):
+        self.val = val
+        self.left = left
+        self.right = right
+
+
+def to_linked_list(values):
+    head = None
+    for value in reversed(values or []):
+        head = ListNode(value, head)
+    return head
+
+
+def from_linked_list(node):
+    values = []
+    while node is not None and len(values) < 100000:
+        values.append(node.val)
+        node = node.next
+    return values
+
+
+def to_tree(values):
+    """按层序（null 表示空节点）构造二叉树"""
+    if not values or values[0] is None:
+        return None
+    root = TreeNode(values[0])
+    queue = collections.deque([root])
+    i = 1
+    while queue and i < len(values):
+        node = queue.popleft()
+        if i < len(values) and values[i] is not None:
+            node.left = TreeNode(values[i])
+            queue.append(node.left)
+        i += 1
+        if i < len(values) and values[i] is not None:
+            node.right = TreeNode(values[i])
+            queue.append(node.right)
+        i += 1
+    return root
+
+
+def from_tree(root):
+    values, queue = [], collections.deque([root])
+    while queue:
+        node = queue.popleft()
+        if node is None:
+            values.append(None)
+            continue
+        values.append(node.val)
+        queue.append(node.left)
+        queue.append(node.right)
+    while values and values[-1] is None:
+        values.pop()
+    return values
+
+
+TO_VALUE = {
+    "linked_list": to_linked_list,
+    "linked_lists": lambda lists: [to_linked_list(values) for values in lists],
+    "tree": to_tree,
+}
+FROM_VALUE = {
+    "linked_list": from_linked_list,
+    "tree": from_tree,
+}
+
+
+def to_json(value):
+    """返回值转换为 JSON 可表示的值（元组转为列表，无法表示的对象用 repr）"""
+    return json.loads(json.dumps(value, ensure_ascii=False, default=repr))
+
+
+def short_repr(value):
+    text = json.dumps(value, ensure_ascii=False, default=repr)
+    return text if len(text) <= MAX_REPR else text[:MAX_REPR] + "..."
+
+
+def set_limits(cpu_seconds, memory_mb):
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    memory = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))  # 不允许写文件
+    try:
+        resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))  # 不允许创建子进程
+    except (ValueError, OSError):
+        pass
+
+
+def peak_memory_kb():
+    """进程内存峰值；ru_maxrss 会继承 fork 前父进程的值，优先用 VmHWM"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def resolve_entry(namespace, entry):
+    solution = namespace.get("Solution")
+    if isinstance(solution, type) and hasattr(solution, entry):
+        return getattr(solution(), entry)
+    func = namespace.get(entry)
+    if callable(func):
+        return func
+    raise NameError(f"未找到函数 {entry}（应定义 class Solution 的方法或同名函数）")
+
+
+def load(job):
+    """执行提交的代码，返回其全局命名空间"""
+    namespace = {"__name__": "__submission__", "ListNode": ListNode, "TreeNode": TreeNode}
+    namespace.update({name: getattr(typing, name) for name in typing.__all__})
+    for module in (bisect, collections, functools, heapq, itertools, math, re, string):
+        namespace[module.__name__] = module
+    stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        exec(compile(job["code"], "<submission>", "exec"), namespace)
+    finally:
+        sys.stdout = stdout
+    return namespace
+
+
+def run(job):
+    namespace = load(job)
+    types = job.get("types") or {}
+    args = {
+        name: TO_VALUE[types[name]](value) if name in types else value
+        for name, value in job["args"].items()
+    }
+
+    stdout = sys.stdout
+    sys.stdout = io.StringIO()  # 提交代码的 print 不进入结果通道
+    try:
+        func = resolve_entry(namespace, job["entry"])
+        start = time.perf_counter()
+        returned = func(**args)
+        runtime_ms = (time.perf_counter() - start) * 1000
+    finally:
+        sys.stdout = stdout
+
+    if job.get("result_arg"):
+        returned = args[job["result_arg"]]  # 原地修改参数的题目
+    if job.get("returns") in FROM_VALUE:
+        returned = FROM_VALUE[job["returns"]](returned)
+
+    return {
+        "status": "ok",
+        "runtime_ms": round(runtime_ms, 3),
+        "value": to_json(returned),
+        "actual": short_repr(returned),
+    }
+
+
+def balanced_brackets(n, rng):
+    pairs = ("()", "[]", "{}")
+    out, stack = [], []
+    for i in range(n - n % 2):
+        if stack and (len(stack) >= n - n % 2 - i or rng.random() < 0.5):
+            out.append(stack.pop())
+        else:
+            pair = rng.choice(pairs)
+            out.append(pair[0])
+            stack.append(pair[1])
+    return "".join(out)
+
+
+def balanced_bst(n):
+    """值为 1..n 的平衡二叉搜索树，层序表示"""
+    values, queue = [], collections.deque([(1, n)])
+    while queue:
+        lo, hi = queue.popleft()
+        if lo > hi:
+            values.append(None)
+            continue
+        mid = (lo + hi) // 2
+        values.append(mid)
+        queue.append((lo, mid - 1))
+        queue.append((mid + 1, hi))
+    while values and values[-1] is None:
+        values.pop()
+    return values
+
+
+def sorted_int_lists(n, lo, hi, rng):
+    """约 sqrt(n) 个升序列表，合计 n 个元素"""
+    k = max(1, int(math.isqrt(n)))
+    values = [rng.randint(lo, hi) for _ in range(n)]
+    return [sorted(values[i::k]) for i in range(k)]
+
+
+# 输入生成：参数描述为 [kind, *options]，n 为当前规模
+GENERATE = {
+    "const": lambda n, rng, value: value,
+    "size": lambda n, rng: n,
+    "ints": lambda n, rng, lo, hi: [rng.randint(lo, hi) for _ in range(n)],
+    "sorted_ints": lambda n, rng, lo, hi: sorted(rng.randint(lo, hi) for _ in range(n)),
+    "padded_sorted_ints": lambda n, rng, lo, hi: sorted(rng.randint(lo, hi) for _ in range(n)) + [0] * n,
+    "string": lambda n, rng, alphabet: "".join(rng.choice(alphabet) for _ in range(n)),
+    "brackets": lambda n, rng: balanced_brackets(n, rng),
+    "bst": lambda n, rng: balanced_bst(n),
+    "sorted_int_lists": lambda n, rng, lo, hi: sorted_int_lists(n, lo, hi, rng),
+}
+
+
+class CPUTimeExceeded(Exception):
+    pass
+
+
+def cpu_time_exceeded(signum, frame):
+    raise CPUTimeExceeded()
+
+
+def profile(job):
+    """逐步放大输入规模测量耗时和额外内存，直到单次耗时或总耗时超出预算"""
+    namespace = load(job)
+    func = resolve_entry(namespace, job["entry"])
+    types = job.get("types") or {}
+    spec = job["profile"]
+    budget = job["budget_seconds"]
+
+    def make_args(n, seed):
+        rng = random.Random(seed)
+        raw = {name: GENERATE[desc[0]](n, rng, *desc[1:]) for name, desc in spec.items()}
+        return {name: TO_VALUE[types[name]](value) if name in types else value for name, value in raw.items()}
+
+    # 到达 CPU 软限制时保留已有的测量，而不是直接被杀掉
+    signal.signal(signal.SIGXCPU, cpu_time_exceeded)
+
+    sizes, times_ms, memory_bytes = [], [], []
+    started = time.perf_counter()
+    n = PROFILE_MIN_SIZE
+    stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        while n <= PROFILE_MAX_SIZE:
+            size_started = time.perf_counter()
+            # 每次调用都重新生成输入，原地修改参数的解法不影响下一次测量
+            best = float("inf")
+            spent = 0.0
+            for repeat in range(PROFILE_REPEATS):
+                args = make_args(n, repeat)
+                start = time.perf_counter()
+                func(**args)
+                elapsed = time.perf_counter() - start
+                best = min(best, elapsed)
+                spent += elapsed
+                if repeat >= 1 and spent >= PROFILE_MIN_SAMPLE_SECONDS:
+                    break
+
+            args = make_args(n, 0)
+            tracemalloc.start()
+            # 取内存时返回值仍被引用，current 即返回值占用的内存，不计入额外内存
+            held = [func(**args)]
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            held.clear()
+
+            sizes.append(n)
+            times_ms.append(best * 1000)
+            memory_bytes.append(peak - current)
+            # 下一个规模按平方增长估算，预计超出预算就停止
+            now = time.perf_counter()
+            if now - started + (now - size_started) * 4 > budget:
+                break
+            n *= 2
+    except Exception as e:
+        # 规模变大后才出现的错误（如递归过深）：保留已有的测量
+        if not sizes:
+            raise
+        print(f"stopped at n={n}: {type(e).__name__}", file=sys.stderr)
+    finally:
+        sys.stdout = stdout
+    return {"status": "ok", "sizes": sizes, "times_ms": times_ms, "memory_bytes": memory_bytes}
+
+
+def private_channel():
+    """复制 stdout 作为结果通道，fd 0/1 改为指向 /dev/null"""
+    channel = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    return channel
+
+
+def main():
+    job = json.loads(sys.stdin.read())
+    channel = private_channel()
+    set_limits(job["cpu_seconds"], job["memory_mb"])
+    try:
+        result = profile(job) if job.get("mode") == "profile" else run(job)
+    except MemoryError:
+        result = {"status": "memory_limit"}
+    except RecursionError:
+        result = {"status": "runtime_error", "error": "RecursionError: maximum recursion depth exceeded"}
+    except Exception as e:
+        tb = traceback.extract_tb(e.__traceback__)
+        line = next((f.lineno for f in reversed(tb) if f.filename == "<submission>"), None)
+        where = f"（第 {line} 行）" if line else ""
+        result = {"status": "runtime_error", "error": f"{type(e).__name__}: {e}{where}"[:MAX_REPR]}
+    result["peak_kb"] = peak_memory_kb()
+    channel.write("\n" + json.dumps(result, ensure_ascii=False) + "\n")
+    channel.flush()
+
+
+if __name__ == "__main__":
+    main()
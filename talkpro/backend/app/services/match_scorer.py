@@ -0,0 +1,375 @@
+import itertools
+import re
+import unicodedata
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.text_matcher import ascii_lower
+from .skill_taxonomy import SkillTaxonomy, skill_taxonomy
+
+# 哈希特征空间大小（2 的幂）；实际计算时只保留批次中出现过的列
+N_FEATURES = 1 << 20
+# 余弦相似度达到该值即认为该要求被完全覆盖
+FULL_MATCH_SIMILARITY = 0.35
+# 低于该值不作为证据返回
+MIN_EVIDENCE_SIMILARITY = 0.08
+
+REQUIREMENT_WEIGHTS = {
+    "required_skill": 3.0,
+    "technical": 2.0,
+    "responsibility": 1.5,
+    "preferred_skill": 1.0,
+}
+
+ASCII_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+CJK_RUN_RE = re.compile(r"[一-鿿]+")
+STOP_WORDS = {
+    "and", "or", "the", "of", "to", "in", "for", "with", "a", "an", "on", "is", "are", "be",
+    "experience", "years", "year", "etc",
+}
+STOP_BIGRAMS = {
+    "熟悉", "掌握", "了解", "精通", "负责", "参与", "相关", "以上", "经验", "能力", "良好",
+    "具备", "优先", "具有", "以及", "进行", "工作", "使用", "开发",
+}
+
+
+@dataclass
+class Section:
+    """简历中可作为证据的一段内容"""
+    label: str
+    text: str
+
+
+@dataclass
+class Requirement:
+    """JD中的一条要求"""
+    kind: str
+    text: str
+    weight: float
+    skills: List[str] = field(default_factory=list)
+
+
+@dataclass
+class RequirementScore:
+    requirement: Requirement
+    score: float
+    similarity: float
+    skill_matched: bool
+    evidence: Optional[Section] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requirement": self.requirement.text,
+            "kind": self.requirement.kind,
+            "weight": self.requirement.weight,
+            "score": round(self.score, 3),
+            "similarity": round(self.similarity, 3),
+            "skill_matched": self.skill_matched,
+            "evidence": {
+                "section": self.evidence.label,
+                "text": self.evidence.text[:160],
+            } if self.evidence else None,
+        }
+
+
+@dataclass
+class SparseRows:
+    """按行排列的稀疏矩阵，每个 (行, 列) 只出现一次"""
+    rows: np.ndarray
+    cols: np.ndarray
+    values: np.ndarray
+    n_rows: int
+
+
+@dataclass
+class MatchResult:
+    match_score: int
+    requirements: List[RequirementScore]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "match_score": self.match_score,
+            "requirements": [r.to_dict() for r in self.requirements],
+        }
+
+
+def _join(*parts: Any) -> str:
+    values = []
+    for part in parts:
+        if isinstance(part, (list, tuple)):
+            values.extend(str(p) for p in part if p)
+        elif part:
+            values.append(str(part))
+    return "；".join(values)
+
+
+def resume_sections(resume_data: Optional[Dict[str, Any]]) -> List[Section]:
+    """把结构化简历拆成工作经历、项目、技能、教育等可作为证据的段落"""
+    resume_data = resume_data or {}
+    sections = []
+
+    for item in resume_data.get("work_experience") or []:
+        if isinstance(item, dict):
+            sections.append(Section(
+                label=f"工作经历：{item.get('company') or ''} {item.get('position') or ''}".strip(),
+                text=_join(item.get("position"), item.get("description"), item.get("achievements")),
+            ))
+    for item in resume_data.get("projects") or []:
+        if isinstance(item, dict):
+            sections.append(Section(
+                label=f"项目：{item.get('name') or ''}".strip(),
+                text=_join(item.get("name"), item.get("role"), item.get("tech_stack"),
+                           item.get("description"), item.get("achievements")),
+            ))
+
+    skills = resume_data.get("skills") or {}
+    if isinstance(skills, dict):
+        skill_text = _join(*[v for v in skills.values() if isinstance(v, list)])
+    else:
+        skill_text = _join(list(skills))
+    if skill_text:
+        sections.append(Section(label="技能", text=skill_text))
+
+    for item in resume_data.get("education") or []:
+        if isinstance(item, dict):
+            sections.append(Section(
+                label="教育背景",
+                text=_join(item.get("school"), item.get("major"), item.get("degree")),
+            ))
+
+    return [s for s in sections if s.text]
+
+
+def jd_requirements(jd_data: Dict[str, Any], taxonomy: SkillTaxonomy) -> List[Requirement]:
+    """把结构化JD拆成带权重的要求列表"""
+    skills = jd_data.get("skills") or {}
+    requirements = jd_data.get("requirements") or {}
+    items: List[Tuple[str, Iterable[Any]]] = [
+        ("required_skill", skills.get("required") or []),
+        ("preferred_skill", skills.get("preferred") or []),
+        ("technical", requirements.get("technical") or []),
+        ("responsibility", jd_data.get("responsibilities") or []),
+    ]
+
+    result, seen = [], set()
+    for kind, texts in items:
+        for text in texts:
+            if not isinstance(text, str) or not text.strip() or text.strip() in seen:
+                continue
+            seen.add(text.strip())
+            names = taxonomy.scan(text) if kind in ("technical", "responsibility") else taxonomy.normalize(text)
+            result.append(Requirement(
+                kind=kind,
+                text=text.strip(),
+                weight=REQUIREMENT_WEIGHTS[kind],
+                skills=[n for n in names if n in taxonomy.category_of],
+            ))
+    return result
+
+
+class MatchScorer:
+    """本地简历-JD匹配评分
+
+    简历段落和JD要求都转换为哈希 n-gram 的 TF-IDF 向量（英文词、词二元组、中文字二元组、
+    标准技能名），一次矩阵乘法得到 段落 × 要求 的相似度矩阵。每条要求取最相似的段落作为证据，
+    技能类要求命中技能分类体系即视为满足；按要求权重加权得到 0-100 的匹配分。
+    批量评分时所有简历的段落合并为一个矩阵计算。
+    """
+
+    def __init__(self, taxonomy: SkillTaxonomy, n_features: int = N_FEATURES):
+        self.taxonomy = taxonomy
+        self.n_features = n_features
+
+    def _tokens(self, text: str, with_ancestors: bool = False) -> List[str]:
+        text = unicodedata.normalize("NFKC", text)
+        lowered = ascii_lower(text)
+        words = [w.rstrip(".") for w in ASCII_TOKEN_RE.findall(lowered)]
+        words = [w for w in words if w and w not in STOP_WORDS]
+        tokens = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+        for run in CJK_RUN_RE.findall(lowered):
+            if len(run) == 1:
+                tokens.append(run)
+            tokens.extend(b for b in (run[i:i + 2] for i in range(len(run) - 1)) if b not in STOP_BIGRAMS)
+
+        # 标准技能名作为额外特征，简历一侧附带上级技能
+        skills = self.taxonomy.scan(text)
+        if with_ancestors:
+            skills = [a for name in skills for a in [name] + self.taxonomy.ancestors(name)]
+        tokens.extend(f"skill:{name}" for name in skills for _ in range(2))
+        return tokens
+
+    def _hash(self, token: str) -> int:
+        return zlib.crc32(token.encode("utf-8")) & (self.n_features - 1)
+
+    def _vectorize(self, docs: Iterable[List[str]]) -> "SparseRows":
+        """L2 归一化的稀疏 TF-IDF 矩阵（行 = 文档，列 = 批次内出现过的哈希特征）
+
+        只保存非零项，内存与 token 数成正比；稠密的 文档数 × 特征数 矩阵在
+        上千份简历时会占用数 GB。docs 可以是生成器，每个文档的 token 哈希后即丢弃。
+        """
+        hashed = [
+            np.fromiter((self._hash(t) for t in tokens), dtype=np.int64, count=len(tokens))
+            for tokens in docs
+        ]
+        n_docs = len(hashed)
+        if not any(len(h) for h in hashed):
+            empty = np.zeros(0, dtype=np.int64)
+            return SparseRows(empty, empty, np.zeros(0, dtype=np.float32), n_docs)
+
+        rows = np.repeat(np.arange(n_docs, dtype=np.int64), [len(h) for h in hashed])
+        columns, inverse = np.unique(np.concatenate(hashed), return_inverse=True)
+        del hashed
+        # 同一 (行, 列) 合并为一项，并按行排列
+        cells, counts = np.unique(rows * len(columns) + inverse, return_counts=True)
+        row_ids, col_ids = np.divmod(cells, len(columns))
+
+        df = np.bincount(col_ids, minlength=len(columns))
+        idf = np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+        values = ((np.log(counts) + 1.0) * idf[col_ids]).astype(np.float32)
+
+        norms = np.sqrt(np.bincount(row_ids, weights=values.astype(np.float64) ** 2, minlength=n_docs))
+        values /= norms[row_ids].astype(np.float32)
+        return SparseRows(row_ids, col_ids, values, n_docs)
+
+    @staticmethod
+    def _similarity(matrix: "SparseRows", n_section_rows: int) -> np.ndarray:
+        """段落 × 要求 的余弦相似度
+
+        要求行数很少，展开为只含要求中出现过的列的稠密矩阵；段落一侧保持稀疏，
+        只有落在这些列上的项参与计算。
+        """
+        is_requirement = matrix.rows >= n_section_rows
+        req_rows = matrix.rows[is_requirement] - n_section_rows
+        req_cols, req_col_index = np.unique(matrix.cols[is_requirement], return_inverse=True)
+        n_requirements = matrix.n_rows - n_section_rows
+        requirements = np.zeros((len(req_cols), n_requirements), dtype=np.float32)
+        requirements[req_col_index, req_rows] = matrix.values[is_requirement]
+
+        section_rows = matrix.rows[~is_requirement]
+        section_cols = matrix.cols[~is_requirement]
+        section_values = matrix.values[~is_requirement]
+        position = np.searchsorted(req_cols, section_cols)
+        shared = position < len(req_cols)
+        shared[shared] = req_cols[position[shared]] == section_cols[shared]
+        section_rows, position, section_values = section_rows[shared], position[shared], section_values[shared]
+
+        similarity = np.zeros((n_section_rows, n_requirements), dtype=np.float32)
+        for j in range(n_requirements):
+            similarity[:, j] = np.bincount(
+                section_rows, weights=section_values * requirements[position, j], minlength=n_section_rows
+            )
+        return similarity
+
+    def _resume_skill_keys(self, resume_data: Optional[Dict[str, Any]], sections: List[Section]) -> set:
+        names = self.taxonomy.resume_skills(resume_data)
+        for section in sections:
+            names.extend(self.taxonomy.scan(section.text))
+        return self.taxonomy.expand(names)
+
+    def _score_batch(
+        self,
+        requirements: List[Requirement],
+        resumes: List[Tuple[Optional[Dict[str, Any]], List[Section]]],
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[int]]:
+        """返回 (得分矩阵, 相似度矩阵, 技能命中矩阵, 证据段落下标, 每份简历的段落起始行)
+
+        前三个矩阵形状均为 简历数 × 要求数。
+        """
+        # 没有段落的简历补一个空行，保证 reduceat 分组非空
+        resumes = [(data, sections or [Section("", "")]) for data, sections in resumes]
+        offsets, n_section_rows = [], 0
+        for _, sections in resumes:
+            offsets.append(n_section_rows)
+            n_section_rows += len(sections)
+        docs = itertools.chain(
+            (self._tokens(s.text, with_ancestors=True) for _, sections in resumes for s in sections),
+            (self._tokens(r.text) for r in requirements),
+        )
+
+        similarity = self._similarity(self._vectorize(docs), n_section_rows)
+
+        best = np.maximum.reduceat(similarity, offsets, axis=0)
+        bounds = offsets + [n_section_rows]
+        evidence = np.stack([
+            similarity[start:end].argmax(axis=0) + start for start, end in zip(bounds, bounds[1:])
+        ])
+
+        skill_hit = np.zeros((len(resumes), len(requirements)), dtype=bool)
+        for i, (resume_data, sections) in enumerate(resumes):
+            keys = self._resume_skill_keys(resume_data, sections)
+            for j, requirement in enumerate(requirements):
+                if requirement.skills:
+                    skill_hit[i, j] = all(self.taxonomy.key(name) in keys for name in requirement.skills)
+
+        scores = np.clip(best / FULL_MATCH_SIMILARITY, 0.0, 1.0)
+        scores = np.where(skill_hit, 1.0, scores)
+        return scores, best, skill_hit, evidence, offsets
+
+    @staticmethod
+    def _overall(scores: np.ndarray, requirements: List[Requirement]) -> np.ndarray:
+        weights = np.asarray([r.weight for r in requirements], dtype=np.float32)
+        return np.rint(100.0 * (scores @ weights) / weights.sum()).astype(int)
+
+    def score(self, resume_data: Optional[Dict[str, Any]], jd_data: Dict[str, Any]) -> MatchResult:
+        """单份简历对JD的匹配分和逐条要求的证据"""
+        return self.score_many(resume_data, [("", jd_data)])[0][1]
+
+    def score_many(
+        self,
+        resume_data: Optional[Dict[str, Any]],
+        jds: Sequence[Tuple[str, Dict[str, Any]]],
+    ) -> List[Tuple[str, MatchResult]]:
+        """单份简历同时对多个JD评分
+
+        所有JD的要求合并为一个矩阵，与简历段落只做一次向量化和矩阵乘法。
+        """
+        per_jd = [jd_requirements(jd_data, self.taxonomy) for _, jd_data in jds]
+        requirements = [r for reqs in per_jd for r in reqs]
+        if not requirements:
+            return [(jd_id, MatchResult(match_score=0, requirements=[])) for jd_id, _ in jds]
+
+        sections = resume_sections(resume_data)
+        scores, best, skill_hit, evidence, offsets = self._score_batch(requirements, [(resume_data, sections)])
+
+        results, start = [], 0
+        for (jd_id, _), reqs in zip(jds, per_jd):
+            end = start + len(reqs)
+            details = []
+            for j in range(start, end):
+                has_evidence = sections and best[0, j] >= MIN_EVIDENCE_SIMILARITY
+                details.append(RequirementScore(
+                    requirement=requirements[j],
+                    score=float(scores[0, j]),
+                    similarity=float(best[0, j]),
+                    skill_matched=bool(skill_hit[0, j]),
+                    evidence=sections[evidence[0, j] - offsets[0]] if has_evidence else None,
+                ))
+            match_score = int(self._overall(scores[:, start:end], reqs)[0]) if reqs else 0
+            results.append((jd_id, MatchResult(match_score=match_score, requirements=details)))
+            start = end
+        return results
+
+    def rank(
+        self,
+        jd_data: Dict[str, Any],
+        resumes: Sequence[Tuple[str, Optional[Dict[str, Any]]]],
+    ) -> List[Tuple[str, int]]:
+        """批量给多份简历打分，按匹配分从高到低返回 (简历ID, 匹配分)"""
+        requirements = jd_requirements(jd_data, self.taxonomy)
+        if not resumes:
+            return []
+        if not requirements:
+            return [(resume_id, 0) for resume_id, _ in resumes]
+
+        prepared = [(data, resume_sections(data)) for _, data in resumes]
+        scores = self._score_batch(requirements, prepared)[0]
+        overall = self._overall(scores, requirements)
+        order = np.argsort(-overall, kind="stable")
+        return [(resumes[i][0], int(overall[i])) for i in order]
+
+
+match_scorer = MatchScorer(skill_taxonomy)
@@ -0,0 +1,108 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterable, List, Set
+
+# 后台补充失败后，同一场景至少间隔这么久再重试，避免模型故障时反复调用
+REFILL_RETRY_SECONDS = 30.0
+
+
+@dataclass
+class _Opener:
+    text: str
+    expires_at: float
+
+
+class OpenerPool:
+    """按场景预生成的开场白池
+
+    每个场景保留最多 variety 条开场白，开始面试时从中随机取一条，不消耗；
+    每条开场白 ttl 秒后过期。数量不足或有过期时在后台补充，补充完成前
+    仍可使用过期的开场白，模型调用只发生在后台，开始面试不再等待模型。
+    池为空（刚启动且补充尚未完成）时才同步生成一条。
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[str], Awaitable[str]],
+        variety: int,
+        ttl_seconds: float,
+        max_concurrency: int = 2,
+    ):
+        self.generate = generate
+        self.variety = variety
+        self.ttl_seconds = ttl_seconds
+        self._pools: Dict[str, List[_Opener]] = {}
+        self._refilling: Dict[str, asyncio.Task] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.hits = 0  # take() 直接从池中取到
+        self.misses = 0  # take() 同步生成
+
+    def size(self, key: str) -> int:
+        """未过期的开场白数量"""
+        return len(self._fresh(key))
+
+    def _fresh(self, key: str) -> List[_Opener]:
+        now = time.monotonic()
+        return [o for o in self._pools.get(key, ()) if o.expires_at > now]
+
+    def _add(self, key: str, text: str) -> None:
+        pool = self._pools.setdefault(key, [])
+        pool.append(_Opener(text=text, expires_at=time.monotonic() + self.ttl_seconds))
+        # 超出数量时淘汰最早过期的
+        if len(pool) > self.variety:
+            pool.sort(key=lambda o: o.expires_at)
+            del pool[:len(pool) - self.variety]
+
+    async def _generate(self, key: str) -> str:
+        async with self._semaphore:
+            return await self.generate(key)
+
+    async def _refill(self, key: str) -> None:
+        try:
+            while self.size(key) < self.variety:
+                self._add(key, await self._generate(key))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._failed_at[key] = time.monotonic()
+            print(f"Failed to pre-generate opener for {key}: {e}")
+        finally:
+            self._refilling.pop(key, None)
+
+    def refill(self, key: str) -> None:
+        """需要时在后台补充 key 的开场白（同一 key 同时只有一个补充任务）"""
+        if key in self._refilling or self.size(key) >= self.variety:
+            return
+        if time.monotonic() - self._failed_at.get(key, float("-inf")) < REFILL_RETRY_SECONDS:
+            return
+        task = asyncio.create_task(self._refill(key))
+        self._refilling[key] = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def start(self, keys: Iterable[str]) -> None:
+        """启动时为所有场景预热"""
+        for key in keys:
+            self.refill(key)
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def take(self, key: str) -> str:
+        """取一条开场白，优先未过期的；池为空时同步生成"""
+        pool = self._fresh(key) or self._pools.get(key)
+        if pool:
+            self.hits += 1
+            text = random.choice(pool).text
+        else:
+            self.misses += 1
+            text = await self._generate(key)
+            self._add(key, text)
+        self.refill(key)
+        return text
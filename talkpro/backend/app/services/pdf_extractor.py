@@ -0,0 +1,159 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Set
+
+from app.config import settings
+
+
+class PDFExtractionError(Exception):
+    """PDF 文本提取失败"""
+
+
+def _process_context():
+    """按需启动子进程的 multiprocessing 上下文
+
+    fork 方式下进程池创建时就启动全部子进程；forkserver 按提交的任务启动，
+    并预先导入本模块，新进程不必重新导入。没有 forkserver 的平台使用 spawn。
+    """
+    try:
+        context = multiprocessing.get_context("forkserver")
+    except ValueError:
+        return multiprocessing.get_context("spawn")
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+_mp_context = _process_context()
+
+
+def _open_reader(pdf_path: str):
+    try:
+        import PyPDF2
+    except ImportError:
+        raise PDFExtractionError("PDF库未安装，请安装PyPDF2或pdfplumber")
+    return PyPDF2.PdfReader(pdf_path)
+
+
+def _open_plumber(pdf_path: str):
+    # 如果PyPDF2不可用，尝试pdfplumber
+    try:
+        import pdfplumber
+    except ImportError:
+        raise PDFExtractionError("PDF库未安装，请安装PyPDF2或pdfplumber")
+    return pdfplumber.open(pdf_path)
+
+
+def _count_pages(pdf_path: str) -> int:
+    """子进程中执行：获取页数"""
+    try:
+        return len(_open_reader(pdf_path).pages)
+    except PDFExtractionError:
+        with _open_plumber(pdf_path) as pdf:
+            return len(pdf.pages)
+
+
+def _extract_pages(pdf_path: str, start: int, end: int) -> List[str]:
+    """子进程中执行：提取 [start, end) 页的文本"""
+    try:
+        reader = _open_reader(pdf_path)
+        return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+    except PDFExtractionError:
+        with _open_plumber(pdf_path) as pdf:
+            return [pdf.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+class PDFExtractor:
+    """在子进程中提取 PDF 文本，长 PDF 按页分片并行，整体受超时限制
+
+    每次提取使用自己的进程池，超时时只结束这次提取的子进程，不影响其他用户的提取；
+    所有提取共用 workers 个进程名额。
+    """
+
+    def __init__(self, workers: int, pages_per_task: int, timeout: float):
+        self.workers = workers
+        self.pages_per_task = pages_per_task
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(workers)
+        self._executors: Set[ProcessPoolExecutor] = set()
+
+    async def extract_text(self, pdf_path: str) -> str:
+        """提取 PDF 全文
+
+        Raises:
+            PDFExtractionError: 提取失败或超时
+        """
+        loop = asyncio.get_running_loop()
+        # 子进程按需启动，同时执行的分片数不超过占用的名额，进程数也就不超过名额
+        executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context)
+        self._executors.add(executor)
+        held = 0
+        finished = False
+
+        async def extract() -> str:
+            nonlocal held
+            page_count = await loop.run_in_executor(executor, _count_pages, pdf_path)
+
+            ranges = [
+                (start, min(start + self.pages_per_task, page_count))
+                for start in range(0, page_count, self.pages_per_task)
+            ]
+            # 长 PDF 再占用当前空闲的名额并行提取；有人排队时 locked() 为 True，不抢在等待者前面
+            while held < len(ranges) and not self._slots.locked():
+                await self._slots.acquire()
+                held += 1
+            limit = asyncio.Semaphore(held)
+
+            async def extract_range(start: int, end: int) -> List[str]:
+                async with limit:
+                    return await loop.run_in_executor(executor, _extract_pages, pdf_path, start, end)
+
+            chunks = await asyncio.gather(*[extract_range(start, end) for start, end in ranges])
+            return "\n".join(page for chunk in chunks for page in chunk)
+
+        try:
+            await self._slots.acquire()
+            held = 1
+            text = await asyncio.wait_for(extract(), timeout=self.timeout)
+            finished = True
+            return text
+        except asyncio.TimeoutError:
+            raise PDFExtractionError(f"PDF解析超时（{self.timeout}秒）")
+        except PDFExtractionError:
+            raise
+        except Exception as e:
+            raise PDFExtractionError(f"PDF解析失败: {str(e)}")
+        finally:
+            # 超时或被取消时子进程可能还卡在这个 PDF 上，直接结束；只影响这次提取
+            self._executors.discard(executor)
+            _shutdown_executor(executor, kill=not finished)
+            for _ in range(held):
+                self._slots.release()
+
+    def shutdown(self) -> None:
+        """结束所有仍在进行的提取（进程退出时调用）"""
+        for executor in list(self._executors):
+            _shutdown_executor(executor, kill=True)
+        self._executors.clear()
+
+
+def _shutdown_executor(executor: ProcessPoolExecutor, kill: bool) -> None:
+    """关闭进程池；kill=True 时同时结束仍在运行的子进程
+
+    shutdown(wait=False) 不会中断正在执行的任务，卡在某个 PDF 上的子进程
+    会一直占着 CPU 和内存，因此超时时需要直接结束它们。
+    """
+    # 子进程列表在 shutdown 之后会被清空，先取出来
+    processes = list((executor._processes or {}).values()) if kill else []
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.kill()
+    for process in processes:
+        process.join(timeout=1)
+
+pdf_extractor = PDFExtractor(
+    workers=settings.pdf_extract_workers,
+    pages_per_task=settings.pdf_pages_per_task,
+    timeout=settings.pdf_extract_timeout_seconds,
+)
@@ -0,0 +1,210 @@
+import asyncio
+import json
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from app.config import DATA_DIR
+from app.database import async_session
+from app.models.session import InterviewSession, SessionType
+
+# 排除已做过的题目时，先随机抽样若干次，都命中已做题目再退化为过滤整个列表
+SAMPLE_ATTEMPTS = 8
+
+
+def render_opening(question: Dict[str, Any]) -> str:
+    """题目开场白（Markdown）：标题、描述、示例和判题用的函数签名"""
+    examples = "\n".join(
+        f"- 输入: {ex['input']}\n  输出: {ex['output']}"
+        + (f"\n  说明: {ex.get('explanation', '')}" if ex.get("explanation") else "")
+        for ex in question.get("examples", [])
+    )
+    opening = f"## {question['title']}\n\n{question['content']}\n\n### 示例:\n" + examples
+    judge = question.get("judge")
+    if judge:
+        # 提交的代码按该签名在本地判题
+        params = ", ".join(["self"] + judge["params"])
+        opening += f"\n\n### 函数签名:\n```python\nclass Solution:\n    def {judge['entry']}({params}):\n```"
+    return opening
+
+
+@dataclass(frozen=True)
+class Question:
+    id: str
+    title: str
+    difficulty: str
+    tags: Tuple[str, ...]
+    opening: str  # 预先渲染的开场白
+    data: Dict[str, Any] = field(compare=False, repr=False)  # 原始题目数据
+
+
+@dataclass
+class _Snapshot:
+    """某一版本题库文件的全部题目及索引"""
+    version: Tuple[int, int]  # (mtime_ns, size)
+    questions: Tuple[Question, ...] = ()
+    by_id: Dict[str, Question] = field(default_factory=dict)
+    by_difficulty: Dict[str, Tuple[Question, ...]] = field(default_factory=dict)
+    by_tag: Dict[str, Tuple[Question, ...]] = field(default_factory=dict)
+    by_difficulty_tag: Dict[Tuple[str, str], Tuple[Question, ...]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, version: Tuple[int, int], raw: Iterable[Dict[str, Any]]) -> "_Snapshot":
+        questions = []
+        for item in raw:
+            try:
+                questions.append(Question(
+                    id=item["id"],
+                    title=item["title"],
+                    difficulty=item["difficulty"].lower(),
+                    tags=tuple(item.get("tags", [])),
+                    opening=render_opening(item),
+                    data=item,
+                ))
+            except (KeyError, AttributeError, TypeError) as e:
+                print(f"Skipping malformed question {item.get('id') if isinstance(item, dict) else item}: {e}")
+
+        by_difficulty: Dict[str, List[Question]] = {}
+        by_tag: Dict[str, List[Question]] = {}
+        by_difficulty_tag: Dict[Tuple[str, str], List[Question]] = {}
+        for q in questions:
+            by_difficulty.setdefault(q.difficulty, []).append(q)
+            for tag in q.tags:
+                by_tag.setdefault(tag, []).append(q)
+                by_difficulty_tag.setdefault((q.difficulty, tag), []).append(q)
+
+        return cls(
+            version=version,
+            questions=tuple(questions),
+            by_id={q.id: q for q in questions},
+            by_difficulty={k: tuple(v) for k, v in by_difficulty.items()},
+            by_tag={k: tuple(v) for k, v in by_tag.items()},
+            by_difficulty_tag={k: tuple(v) for k, v in by_difficulty_tag.items()},
+        )
+
+
+class QuestionBank:
+    """算法题库
+
+    进程内只加载一份，按难度、标签建好索引并预先渲染开场白。
+    访问时最多每 check_interval 秒检查一次文件 mtime，文件变化后在线程中
+    重新加载，加载完成前继续使用旧版本；新文件解析失败时也继续使用旧版本。
+    """
+
+    def __init__(self, path, check_interval: float = 2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._snapshot = _Snapshot(version=(0, 0))
+        self._checked_at = 0.0
+        self._reloading: Optional[asyncio.Task] = None
+        self._reload()
+
+    def _file_version(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _reload(self) -> None:
+        version = self._file_version()
+        if version is None:
+            print(f"Question bank not found: {self.path}")
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            self._snapshot = _Snapshot.build(version, raw)
+            print(f"Loaded {len(self._snapshot.questions)} questions from {self.path}")
+        except Exception as e:
+            # 记下该版本，文件再次变化前不重复解析
+            self._snapshot.version = version
+            print(f"Error loading questions: {e}")
+
+    def _schedule_reload(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 不在事件循环中（启动、脚本）时直接加载
+            self._reload()
+            return
+        # 读取和解析整个文件不占用事件循环，加载完成后再替换快照
+        self._reloading = loop.create_task(asyncio.to_thread(self._reload))
+        self._reloading.add_done_callback(lambda _: setattr(self, "_reloading", None))
+
+    def _current(self) -> _Snapshot:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval and self._reloading is None:
+            self._checked_at = now
+            version = self._file_version()
+            if version is not None and version != self._snapshot.version:
+                self._schedule_reload()
+        return self._snapshot
+
+    def __len__(self) -> int:
+        return len(self._current().questions)
+
+    @property
+    def version(self) -> Tuple[int, int]:
+        """当前加载的题库文件版本，用于让依赖题库的缓存失效"""
+        return self._current().version
+
+    def all(self) -> Tuple[Question, ...]:
+        return self._current().questions
+
+    def get(self, question_id: str) -> Optional[Question]:
+        return self._current().by_id.get(question_id)
+
+    def by_difficulty(self, difficulty: str) -> Tuple[Question, ...]:
+        return self._current().by_difficulty.get(difficulty.lower(), ())
+
+    def by_tag(self, tag: str) -> Tuple[Question, ...]:
+        return self._current().by_tag.get(tag, ())
+
+    def select(
+        self,
+        difficulty: str,
+        exclude_ids: Optional[Set[str]] = None,
+        tag: Optional[str] = None,
+    ) -> Optional[Question]:
+        """随机选一道题，尽量避开 exclude_ids（用户做过的题）
+
+        该难度的题全部做过时允许重复。
+        """
+        snapshot = self._current()
+        if tag:
+            candidates = snapshot.by_difficulty_tag.get((difficulty.lower(), tag), ())
+        else:
+            candidates = snapshot.by_difficulty.get(difficulty.lower(), ())
+        if not candidates:
+            return None
+        if not exclude_ids:
+            return random.choice(candidates)
+
+        for _ in range(SAMPLE_ATTEMPTS):
+            question = random.choice(candidates)
+            if question.id not in exclude_ids:
+                return question
+
+        remaining = [q for q in candidates if q.id not in exclude_ids]
+        return random.choice(remaining or candidates)
+
+
+async def answered_question_ids(user_id: str) -> Set[str]:
+    """用户做过的算法题"""
+    async with async_session() as db:
+        result = await db.execute(
+            select(InterviewSession.question_id)
+            .where(InterviewSession.user_id == user_id)
+            .where(InterviewSession.type == SessionType.ALGORITHM)
+            .where(InterviewSession.question_id.is_not(None))
+            .distinct()
+        )
+        return set(result.scalars())
+
+
+question_bank = QuestionBank(DATA_DIR / "questions.json")
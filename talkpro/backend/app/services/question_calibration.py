@@ -0,0 +1,308 @@
+import math
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from app.config import settings
+from app.database import async_session
+from app.models.question_stat import QuestionStat
+from app.models.session import InterviewSession, SessionStatus, SessionType
+from app.models.user_ability import UserAbility
+from .job_queue import job_queue
+from .question_bank import Question, question_bank
+
+# 题目标注难度对应的先验难度（logit 尺度），未校准的题目直接使用
+DIFFICULTY_PRIORS = {"easy": -1.0, "medium": 0.0, "hard": 1.0}
+SCORE_DIMENSIONS = ("algorithm", "code_quality", "complexity", "edge_cases", "communication")
+# 不限难度，按能力在全部题目中选
+ADAPTIVE = "adaptive"
+
+FIT_ITERATIONS = 30
+# L2 正则：能力以 0 为中心、难度以标注先验为中心，数据少的题目和用户不会漂到极端值
+FIT_REGULARIZATION = 0.5
+# 在难度最接近用户能力的若干道题中随机选一道，避免所有同水平用户拿到同一道题
+NEAREST_CANDIDATES = 5
+# 向两侧查找未做过的题目时最多检查的题数，超过后退化为题库随机选题
+MAX_PROBE = 256
+UPSERT_BATCH_SIZE = 500
+# 内存中缓存能力估计的用户数，超出后淘汰最久未访问的用户
+ABILITY_CACHE_SIZE = 10000
+
+
+def session_outcome(score: Optional[Dict[str, Any]]) -> Optional[float]:
+    """面试报告各维度得分（0-10）的均值，归一化到 [0, 1]"""
+    if not isinstance(score, dict):
+        return None
+    values = [score[d] for d in SCORE_DIMENSIONS if isinstance(score.get(d), (int, float))]
+    if not values:
+        return None
+    return min(max(sum(values) / len(values) / 10.0, 0.0), 1.0)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def fit_rasch(
+    user_idx: np.ndarray,
+    question_idx: np.ndarray,
+    outcomes: np.ndarray,
+    n_users: int,
+    n_questions: int,
+    prior_difficulty: np.ndarray,
+    iterations: int = FIT_ITERATIONS,
+    reg: float = FIT_REGULARIZATION,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """带 L2 先验的 Rasch 模型拟合，返回 (能力 θ, 难度 b)
+
+    P(得分) = sigmoid(θ[u] - b[q])，outcomes 取 [0, 1] 的连续得分。
+    能力和难度交替做对角 Newton 更新，每步对全部记录用 bincount 聚合，
+    复杂度 O(记录数 × 迭代次数)。
+    """
+    theta = np.zeros(n_users)
+    b = prior_difficulty.astype(float).copy()
+    for _ in range(iterations):
+        p = _sigmoid(theta[user_idx] - b[question_idx])
+        residual = outcomes - p
+        info = p * (1.0 - p)
+        theta += (
+            (np.bincount(user_idx, weights=residual, minlength=n_users) - reg * theta)
+            / (np.bincount(user_idx, weights=info, minlength=n_users) + reg)
+        )
+
+        p = _sigmoid(theta[user_idx] - b[question_idx])
+        residual = outcomes - p
+        info = p * (1.0 - p)
+        b -= (
+            (np.bincount(question_idx, weights=residual, minlength=n_questions) + reg * (b - prior_difficulty))
+            / (np.bincount(question_idx, weights=info, minlength=n_questions) + reg)
+        )
+    return theta, b
+
+
+@dataclass
+class _DifficultyIndex:
+    """某一难度范围内按校准难度排序的题目"""
+    difficulties: np.ndarray
+    questions: Tuple[Question, ...]
+
+
+class QuestionCalibration:
+    """根据历史得分自适应选题
+
+    - 后台任务定期用全部已完成的算法面试拟合 Rasch 模型，得到题目难度和用户能力
+    - 每场面试结束后用 Elo 式在线更新修正该用户和该题，两次全量校准之间也能跟上
+    - 选题时在按难度排好序的数组上二分查找用户能力，取难度最接近的题目
+      （答对概率接近 50%，信息量最大）；索引在题库或校准结果变化时重建
+    """
+
+    def __init__(self, k_factor: float, interval_minutes: int):
+        self.k_factor = k_factor
+        self.interval_minutes = interval_minutes
+        self._difficulties: Dict[str, float] = {}
+        self._abilities: "OrderedDict[str, Optional[float]]" = OrderedDict()
+        self._version = 0
+        self._indexes: Dict[str, _DifficultyIndex] = {}
+        self._index_key: Optional[Tuple[Any, int]] = None
+        self._scheduled_bucket: Optional[int] = None
+
+    def difficulty(self, question: Question) -> float:
+        return self._difficulties.get(question.id, DIFFICULTY_PRIORS.get(question.difficulty, 0.0))
+
+    async def load(self) -> None:
+        """启动时加载已保存的题目难度"""
+        async with async_session() as db:
+            result = await db.execute(select(QuestionStat.question_id, QuestionStat.difficulty))
+            self._difficulties = {row.question_id: row.difficulty for row in result}
+        self._version += 1
+
+    async def ability(self, user_id: str) -> Optional[float]:
+        """用户能力估计，没有历史记录时返回 None"""
+        if user_id in self._abilities:
+            self._abilities.move_to_end(user_id)
+            return self._abilities[user_id]
+        async with async_session() as db:
+            record = await db.get(UserAbility, user_id)
+        ability = record.ability if record else None
+        self._remember(user_id, ability)
+        return ability
+
+    def _remember(self, user_id: str, ability: Optional[float]) -> None:
+        self._abilities[user_id] = ability
+        self._abilities.move_to_end(user_id)
+        if len(self._abilities) > ABILITY_CACHE_SIZE:
+            self._abilities.popitem(last=False)
+
+    def _index(self, difficulty: str) -> Optional[_DifficultyIndex]:
+        key = (question_bank.version, self._version)
+        if key != self._index_key:
+            self._indexes, self._index_key = {}, key
+        if difficulty not in self._indexes:
+            questions = question_bank.all() if difficulty == ADAPTIVE else question_bank.by_difficulty(difficulty)
+            if not questions:
+                return None
+            values = np.fromiter((self.difficulty(q) for q in questions), dtype=float, count=len(questions))
+            order = np.argsort(values, kind="stable")
+            self._indexes[difficulty] = _DifficultyIndex(
+                difficulties=values[order],
+                questions=tuple(questions[i] for i in order),
+            )
+        return self._indexes[difficulty]
+
+    def select(
+        self,
+        difficulty: str,
+        ability: float,
+        exclude_ids: Optional[Set[str]] = None,
+    ) -> Optional[Question]:
+        """选难度最接近 ability 的题目之一，跳过 exclude_ids
+
+        找不到（该范围的题都做过）时返回 None，由调用方退化为随机选题。
+        """
+        index = self._index(difficulty.lower())
+        if index is None:
+            return None
+
+        values, questions = index.difficulties, index.questions
+        hi = int(np.searchsorted(values, ability))
+        lo = hi - 1
+        picked: List[Question] = []
+        for _ in range(min(MAX_PROBE, len(questions))):
+            if lo < 0 and hi >= len(questions):
+                break
+            if hi >= len(questions) or (lo >= 0 and ability - values[lo] <= values[hi] - ability):
+                question, lo = questions[lo], lo - 1
+            else:
+                question, hi = questions[hi], hi + 1
+            if not exclude_ids or question.id not in exclude_ids:
+                picked.append(question)
+                if len(picked) >= NEAREST_CANDIDATES:
+                    break
+        return random.choice(picked) if picked else None
+
+    def _elo_update(self, ability: float, difficulty: float, outcome: float) -> Tuple[float, float]:
+        expected = 1.0 / (1.0 + math.exp(difficulty - ability))
+        delta = self.k_factor * (outcome - expected)
+        return ability + delta, difficulty - delta
+
+    async def record(self, user_id: str, question_id: str, score: Optional[Dict[str, Any]]) -> None:
+        """面试结束后在线更新用户能力和题目难度，并安排一次全量校准"""
+        outcome = session_outcome(score)
+        question = question_bank.get(question_id)
+        if outcome is None or question is None:
+            return
+
+        ability = await self.ability(user_id)
+        if ability is None:
+            # 第一次作答：从题目难度附近起步，比从 0 更快接近真实水平
+            ability = self.difficulty(question)
+        ability, difficulty = self._elo_update(ability, self.difficulty(question), outcome)
+
+        await self._save(
+            [{"user_id": user_id, "ability": ability, "observations": 1}],
+            [{"question_id": question_id, "difficulty": difficulty, "observations": 1}],
+            increment=True,
+        )
+        self._remember(user_id, ability)
+        # 不提升版本号：单题的小幅修正等下次全量校准再重建选题索引
+        self._difficulties[question_id] = difficulty
+
+        await self.schedule()
+
+    async def schedule(self) -> None:
+        """提交全量校准任务；同一时间段内只执行一次"""
+        bucket = int(time.time() // (self.interval_minutes * 60))
+        # dedupe_key 只对排队中或运行中的任务生效，已完成的时间段在这里跳过
+        if bucket == self._scheduled_bucket:
+            return
+        await job_queue.enqueue("question_calibrate", payload={}, dedupe_key=f"question_calibrate:{bucket}")
+        self._scheduled_bucket = bucket
+
+    async def _save(
+        self,
+        users: List[Dict[str, Any]],
+        questions: List[Dict[str, Any]],
+        increment: bool = False,
+    ) -> None:
+        now = datetime.utcnow()
+        async with async_session() as db:
+            for model, key, value, rows in (
+                (UserAbility, "user_id", "ability", users),
+                (QuestionStat, "question_id", "difficulty", questions),
+            ):
+                for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+                    stmt = insert(model).values([{**row, "updated_at": now} for row in rows[start:start + UPSERT_BATCH_SIZE]])
+                    observations = stmt.excluded.observations
+                    if increment:
+                        observations = getattr(model, "observations") + observations
+                    await db.execute(stmt.on_conflict_do_update(
+                        index_elements=[getattr(model, key)],
+                        set_={value: getattr(stmt.excluded, value), "observations": observations, "updated_at": now},
+                    ))
+            await db.commit()
+
+    async def _load_outcomes(self) -> List[Tuple[str, str, float]]:
+        async with async_session() as db:
+            result = await db.stream(
+                select(InterviewSession.user_id, InterviewSession.question_id, InterviewSession.score)
+                .where(InterviewSession.type == SessionType.ALGORITHM)
+                .where(InterviewSession.status == SessionStatus.COMPLETED)
+                .where(InterviewSession.user_id.is_not(None))
+                .where(InterviewSession.question_id.is_not(None))
+            )
+            rows = []
+            async for row in result:
+                outcome = session_outcome(row.score)
+                if outcome is not None:
+                    rows.append((row.user_id, row.question_id, outcome))
+            return rows
+
+    async def recalibrate(self) -> Dict[str, int]:
+        """用全部历史面试重新拟合题目难度和用户能力"""
+        rows = await self._load_outcomes()
+        if not rows:
+            return {"sessions": 0, "users": 0, "questions": 0}
+
+        users = sorted({r[0] for r in rows})
+        question_ids = sorted({r[1] for r in rows})
+        user_pos = {u: i for i, u in enumerate(users)}
+        question_pos = {q: i for i, q in enumerate(question_ids)}
+
+        user_idx = np.fromiter((user_pos[r[0]] for r in rows), dtype=np.int64, count=len(rows))
+        question_idx = np.fromiter((question_pos[r[1]] for r in rows), dtype=np.int64, count=len(rows))
+        outcomes = np.fromiter((r[2] for r in rows), dtype=float, count=len(rows))
+        priors = np.array([
+            DIFFICULTY_PRIORS.get(q.difficulty, 0.0) if (q := question_bank.get(qid)) else 0.0
+            for qid in question_ids
+        ])
+
+        theta, b = fit_rasch(user_idx, question_idx, outcomes, len(users), len(question_ids), priors)
+        user_counts = np.bincount(user_idx, minlength=len(users))
+        question_counts = np.bincount(question_idx, minlength=len(question_ids))
+
+        await self._save(
+            [{"user_id": u, "ability": float(theta[i]), "observations": int(user_counts[i])} for i, u in enumerate(users)],
+            [{"question_id": q, "difficulty": float(b[i]), "observations": int(question_counts[i])}
+             for i, q in enumerate(question_ids)],
+        )
+
+        self._difficulties = {q: float(b[i]) for i, q in enumerate(question_ids)}
+        # 只更新已缓存的用户，其余用户用到时再从数据库读取
+        for user_id in self._abilities:
+            if user_id in user_pos:
+                self._abilities[user_id] = float(theta[user_pos[user_id]])
+        self._version += 1
+        return {"sessions": len(rows), "users": len(users), "questions": len(question_ids)}
+
+
+question_calibration = QuestionCalibration(
+    k_factor=settings.elo_k_factor,
+    interval_minutes=settings.calibration_interval_minutes,
+)
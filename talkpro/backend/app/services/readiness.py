@@ -0,0 +1,114 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.agents.registry import agents
+from app.config import settings
+from app.core.connections import connections
+from app.core.loop_monitor import loop_monitor
+from app.core.warmup import warmup
+from app.database import engine
+from app.services.job_queue import job_queue
+
+Check = Dict[str, Any]
+
+
+class ReadinessProbe:
+    """就绪检查：依赖是否可用，以及实例是否已经过载
+
+    数据库不可用、预热未完成，或事件循环延迟、排队任务数、进行中的模型请求数、
+    websocket 连接数超过上限时返回未就绪，让负载均衡在延迟崩溃之前把流量
+    分给其他实例。结果缓存 cache_seconds 秒，探针频繁轮询时不会反复查询数据库。
+    """
+
+    def __init__(
+        self,
+        db_timeout: float,
+        cache_seconds: float,
+        max_loop_lag_ms: float,
+        max_job_queue_depth: int,
+        max_llm_in_flight: int,
+        max_websockets: int,
+    ):
+        self.db_timeout = db_timeout
+        self.cache_seconds = cache_seconds
+        self.max_loop_lag_ms = max_loop_lag_ms
+        self.max_job_queue_depth = max_job_queue_depth
+        self.max_llm_in_flight = max_llm_in_flight
+        self.max_websockets = max_websockets
+        self._cached: Optional[Tuple[float, bool, Dict[str, Check]]] = None
+        self._lock = asyncio.Lock()
+
+    async def _check_database(self) -> Check:
+        started = time.perf_counter()
+        try:
+            async with engine.connect() as conn:
+                await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout=self.db_timeout)
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": f"timed out after {self.db_timeout}s"}
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    async def _check_job_queue(self) -> Check:
+        try:
+            depth = await asyncio.wait_for(job_queue.depth(), timeout=self.db_timeout)
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        return {
+            "ok": depth <= self.max_job_queue_depth,
+            "depth": depth,
+            "running": job_queue.running,
+            "limit": self.max_job_queue_depth,
+        }
+
+    def _check_llm(self) -> Check:
+        # 尚未创建客户端时没有进行中的请求；不为探针去创建它
+        claude = agents.get("claude") if agents.constructed("claude") else None
+        in_flight = claude.in_flight if claude else 0
+        return {
+            "ok": in_flight <= self.max_llm_in_flight,
+            "client": bool(claude and claude.client_created),
+            "in_flight": in_flight,
+            "limit": self.max_llm_in_flight,
+        }
+
+    def _check_event_loop(self) -> Check:
+        lag = loop_monitor.recent_max_ms
+        return {"ok": lag <= self.max_loop_lag_ms, "lag_ms": round(lag, 1), "limit_ms": self.max_loop_lag_ms}
+
+    def _check_websockets(self) -> Check:
+        count = connections.websockets
+        return {"ok": count <= self.max_websockets, "open": count, "limit": self.max_websockets}
+
+    async def _check(self) -> Tuple[bool, Dict[str, Check]]:
+        database, job_depth = await asyncio.gather(self._check_database(), self._check_job_queue())
+        checks = {
+            "warmup": {"ok": warmup.ready, "status": warmup.status, "errors": warmup.errors},
+            "database": database,
+            "job_queue": job_depth,
+            "llm": self._check_llm(),
+            "event_loop": self._check_event_loop(),
+            "websockets": self._check_websockets(),
+        }
+        return all(check["ok"] for check in checks.values()), checks
+
+    async def check(self) -> Tuple[bool, Dict[str, Check]]:
+        """(是否就绪, 各项检查结果)"""
+        async with self._lock:
+            now = time.monotonic()
+            if self._cached is None or now - self._cached[0] >= self.cache_seconds:
+                self._cached = (now, *await self._check())
+            return self._cached[1], self._cached[2]
+
+
+readiness_probe = ReadinessProbe(
+    db_timeout=settings.readiness_db_timeout_seconds,
+    cache_seconds=settings.readiness_cache_seconds,
+    max_loop_lag_ms=settings.readiness_max_loop_lag_ms,
+    max_job_queue_depth=settings.readiness_max_job_queue_depth,
+    max_llm_in_flight=settings.readiness_max_llm_in_flight,
+    max_websockets=settings.readiness_max_websockets,
+)
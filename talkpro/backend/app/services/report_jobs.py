@@ -0,0 +1,41 @@
+from typing import Awaitable, Callable, Dict
+
+from app.config import settings
+from app.models.job import Job
+from .job_queue import job_queue, JobContext
+
+# 按会话 ID 生成报告并保存，返回报告；重复调用时应直接返回已保存的报告。
+# 可以通过 ctx.emit 推送报告片段
+ReportGenerator = Callable[[str, JobContext], Awaitable[dict]]
+
+_generators: Dict[str, ReportGenerator] = {}
+
+
+def report_generator(kind: str) -> Callable[[ReportGenerator], ReportGenerator]:
+    """注册某类面试的报告生成函数"""
+    def decorator(func: ReportGenerator) -> ReportGenerator:
+        _generators[kind] = func
+        return func
+    return decorator
+
+
+async def enqueue_report(kind: str, session_id: str, user_id: str) -> Job:
+    """提交报告生成任务；报告生成中重复提交返回同一个任务，已保存的报告由生成函数直接返回"""
+    if kind not in _generators:
+        raise ValueError(f"Unknown report kind: {kind}")
+    return await job_queue.enqueue(
+        "report_generate",
+        payload={"kind": kind, "session_id": session_id},
+        user_id=user_id,
+        dedupe_key=f"report:{session_id}",
+    )
+
+
+@job_queue.handler("report_generate", concurrency=settings.report_generate_concurrency)
+async def run_report_generate(ctx: JobContext) -> dict:
+    """后台任务：生成面试评估报告，结果即报告内容"""
+    generator = _generators.get(ctx.payload["kind"])
+    if generator is None:
+        raise ValueError(f"Unknown report kind: {ctx.payload['kind']}")
+    await ctx.progress(10, "正在生成评估报告")
+    return await generator(ctx.payload["session_id"], ctx)
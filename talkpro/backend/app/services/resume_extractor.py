@@ -0,0 +1,212 @@
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from .skill_taxonomy import SKILL_CATEGORIES, SkillTaxonomy, skill_taxonomy
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+# 中国大陆手机号（可带 +86 和分隔符）或国际格式号码
+PHONE_RE = re.compile(
+    r"(?<!\d)(?:\+?86[\s-]?)?1[3-9]\d[\s-]?\d{4}[\s-]?\d{4}(?!\d)"
+    r"|(?<!\d)\+\d{1,3}[\s-]?\d{2,4}[\s-]?\d{3,4}[\s-]?\d{3,4}(?!\d)"
+)
+NAME_RE = re.compile(r"姓\s*名\s*[:：]\s*([一-龥·]{2,6}|[A-Za-z][A-Za-z .]{1,40})")
+LOCATION_RE = re.compile(r"(?:现居|居住地|所在地|现居地|城市|Location)\s*[:：]\s*([^\s|,，/]{2,20})")
+
+# 日期区间：2018.09 - 2022.06 / 2018年9月-2022年6月 / 2020-至今
+DATE_RANGE_RE = re.compile(
+    r"((?:19|20)\d{2})(?:\s*[./年-]\s*(\d{1,2})\s*月?)?"
+    r"\s*(?:-|–|—|~|～|至|to)\s*"
+    r"(?:((?:19|20)\d{2})(?:\s*[./年-]\s*(\d{1,2})\s*月?)?|(至今|现在|今|Present|Now))",
+    re.IGNORECASE,
+)
+SCHOOL_RE = re.compile(r"([一-龥A-Za-z&.' ]{2,40}?(?:大学|学院|University|College|Institute of Technology|Institute))")
+DEGREE_PATTERNS = [
+    ("博士", re.compile(r"博士|Ph\.?D|Doctor", re.IGNORECASE)),
+    ("硕士", re.compile(r"硕士|研究生|Master|M\.S\.|M\.Eng|MBA", re.IGNORECASE)),
+    ("本科", re.compile(r"本科|学士|Bachelor|B\.S\.|B\.Eng|B\.A\.", re.IGNORECASE)),
+    ("专科", re.compile(r"专科|大专|Associate", re.IGNORECASE)),
+]
+MAJOR_RE = re.compile(r"(?:专业\s*[:：]\s*)?([一-龥]{2,15}(?:专业|工程|科学|技术|管理|数学|物理|设计))")
+
+# 简历常见分节标题
+SECTION_HEADINGS = {
+    "education": ["教育背景", "教育经历", "学历", "Education"],
+    "skills": ["专业技能", "技能特长", "技术栈", "技能", "Skills", "Technical Skills"],
+    "work": ["工作经历", "工作经验", "实习经历", "Work Experience", "Experience", "Employment"],
+    "projects": ["项目经验", "项目经历", "Projects", "Project Experience"],
+    "summary": ["自我评价", "个人总结", "个人简介", "Summary", "About Me"],
+    "basic": ["基本信息", "个人信息", "联系方式", "Contact"],
+}
+HEADING_RE = re.compile(
+    r"^\s*[#【\[]?\s*(" + "|".join(
+        re.escape(h) for hs in SECTION_HEADINGS.values() for h in sorted(hs, key=len, reverse=True)
+    ) + r")\s*[】\]]?\s*[:：]?\s*$",
+    re.IGNORECASE,
+)
+HEADING_TO_SECTION = {h.lower(): name for name, hs in SECTION_HEADINGS.items() for h in hs}
+
+# 分页、模板水印等样板行
+BOILERPLATE_RE = re.compile(
+    r"^\s*(?:第\s*\d+\s*页.*|Page\s+\d+(?:\s+of\s+\d+)?|\d+\s*/\s*\d+|-\s*\d+\s*-|个人简历|简\s*历|Resume|Curriculum Vitae|CV)\s*$",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class LocalExtraction:
+    """本地抽取结果"""
+    data: Dict[str, Any]
+    residual_text: str
+    confident_fields: List[str] = field(default_factory=list)
+
+
+def clean_text(text: str) -> List[str]:
+    """统一全角字符、去掉空行、分页样板和每页重复的页眉页脚"""
+    text = unicodedata.normalize("NFKC", text)
+    lines = [re.sub(r"[ \t　]+", " ", line).strip() for line in text.splitlines()]
+    lines = [line for line in lines if line and not BOILERPLATE_RE.match(line)]
+
+    # 多页 PDF 中重复出现 3 次以上的短行视为页眉页脚
+    counts = Counter(line for line in lines if len(line) <= 40)
+    return [line for line in lines if counts.get(line, 0) < 3]
+
+
+def split_sections(lines: List[str]) -> Dict[str, List[str]]:
+    """按分节标题切分；标题之前的内容归入 header"""
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for line in lines:
+        m = HEADING_RE.match(line)
+        if m:
+            current = HEADING_TO_SECTION[m.group(1).lower()]
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return sections
+
+
+def _format_time(year: Optional[str], month: Optional[str]) -> Optional[str]:
+    if not year:
+        return None
+    return f"{year}年{int(month)}月" if month else f"{year}年"
+
+
+def extract_education(lines: List[str]) -> List[Dict[str, Any]]:
+    """逐行识别 学校 + 学历 + 时间，学校和学历都识别到才认为可信"""
+    education = []
+    for i, line in enumerate(lines):
+        school = SCHOOL_RE.search(line)
+        if not school:
+            continue
+
+        # 学历和时间可能在同一行或下一行
+        window = line + " " + (lines[i + 1] if i + 1 < len(lines) else "")
+        degree = next((name for name, pattern in DEGREE_PATTERNS if pattern.search(window)), None)
+        if not degree:
+            continue
+
+        dates = DATE_RANGE_RE.search(window)
+        graduation_time = None
+        if dates:
+            graduation_time = dates.group(5) or _format_time(dates.group(3), dates.group(4))
+        major = MAJOR_RE.search(window.replace(school.group(1), ""))
+
+        education.append({
+            "school": school.group(1).strip(),
+            "major": major.group(1) if major else None,
+            "degree": degree,
+            "graduation_time": graduation_time,
+        })
+    return education
+
+
+class ResumeExtractor:
+    """简历的本地确定性抽取
+
+    用正则和技能分类体系抽取高置信度字段（联系方式、教育背景、已知技能），
+    去掉样板内容，只把剩余的工作和项目等段落交给模型。
+    """
+
+    def __init__(self, skills: SkillTaxonomy, max_residual_chars: int):
+        self.skills = skills
+        self.max_residual_chars = max_residual_chars
+
+    def extract(self, resume_text: str) -> LocalExtraction:
+        lines = clean_text(resume_text)
+        full_text = "\n".join(lines)
+        sections = split_sections(lines)
+        confident = []
+
+        basic_info: Dict[str, Any] = {"name": None, "email": None, "phone": None, "location": None}
+        for key, pattern in (("email", EMAIL_RE), ("phone", PHONE_RE)):
+            m = pattern.search(full_text)
+            if m:
+                basic_info[key] = re.sub(r"[\s-]", "", m.group(0)) if key == "phone" else m.group(0)
+                confident.append(f"basic_info.{key}")
+        for key, pattern in (("name", NAME_RE), ("location", LOCATION_RE)):
+            m = pattern.search(full_text)
+            if m:
+                basic_info[key] = m.group(1).strip()
+                confident.append(f"basic_info.{key}")
+
+        education = extract_education(sections.get("education") or lines)
+        if education:
+            confident.append("education")
+
+        data = {
+            "basic_info": basic_info,
+            "skills": self.skills.tag(full_text),
+            "work_experience": [],
+            "projects": [],
+            "education": education,
+        }
+
+        # 剩余文本：去掉已抽取的联系方式行、教育背景段
+        residual = []
+        for name, section_lines in sections.items():
+            if name == "education" and education:
+                continue
+            if name in ("header", "basic"):
+                section_lines = [
+                    line for line in section_lines
+                    if not any(p.search(line) for p in (EMAIL_RE, PHONE_RE, NAME_RE, LOCATION_RE))
+                ]
+            residual.extend(section_lines)
+
+        residual_text = "\n".join(residual)[: self.max_residual_chars]
+        return LocalExtraction(data=data, residual_text=residual_text, confident_fields=confident)
+
+
+def merge_resume_data(local: Dict[str, Any], remote: Dict[str, Any]) -> Dict[str, Any]:
+    """合并本地抽取和模型结果：本地高置信字段优先，技能按标准名取并集"""
+    merged = dict(local)
+
+    basic_info = dict(remote.get("basic_info") or {})
+    basic_info.update({k: v for k, v in local["basic_info"].items() if v})
+    merged["basic_info"] = basic_info
+
+    # 模型返回的技能先归一化为标准名，已知技能按分类体系归类
+    skills: Dict[str, List[str]] = {c: [] for c in SKILL_CATEGORIES}
+    remote_skills = remote.get("skills") or {}
+    seen = set()
+    for category in SKILL_CATEGORIES + [c for c in remote_skills if c not in SKILL_CATEGORIES]:
+        remote_names = remote_skills.get(category) or []
+        for term in (local["skills"].get(category) or []) + (remote_names if isinstance(remote_names, list) else []):
+            for name in skill_taxonomy.normalize(term):
+                if name.lower() in seen:
+                    continue
+                seen.add(name.lower())
+                skills.setdefault(skill_taxonomy.category_of.get(name, category), []).append(name)
+    merged["skills"] = skills
+
+    merged["work_experience"] = remote.get("work_experience") or []
+    merged["projects"] = remote.get("projects") or []
+    merged["education"] = local["education"] or remote.get("education") or []
+    return merged
+
+
+resume_extractor = ResumeExtractor(skill_taxonomy, settings.resume_llm_max_chars)
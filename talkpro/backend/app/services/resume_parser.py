@@ -1,57 +1,78 @@
 import os
 import json
-from typing import Dict, Any, List
-from ..core.claude import ClaudeClient
+from typing import Dict, Any, List, Optional
+from .claude import ClaudeService
+from .pdf_extractor import pdf_extractor
+from .resume_extractor import resume_extractor, merge_resume_data
+from .skill_taxonomy import SkillCoverage, skill_taxonomy
+from .match_scorer import MatchResult, match_scorer
 
 
 class ResumeParser:
     """简历解析器"""
 
-    def __init__(self):
-        self.claude = ClaudeClient()
+    def __init__(self, claude: Optional[ClaudeService] = None):
+        self.claude = claude or ClaudeService()
 
     async def parse_resume(self, resume_text: str) -> Dict[str, Any]:
         """解析简历文本内容
 
+        先在本地抽取联系方式、教育背景和已知技能，只把剩余段落交给模型；
+        模型调用失败时返回本地抽取的结果。
+
         Args:
             resume_text: 简历的文本内容
 
         Returns:
             解析后的结构化简历数据
         """
+        local = resume_extractor.extract(resume_text)
+        if not local.residual_text.strip():
+            return local.data
 
         system_prompt = """你是一位专业的简历分析专家，擅长从简历中提取关键信息。
-你的任务是分析简历内容，提取出以下信息并以JSON格式返回：
-
-1. 基本信息：姓名、邮箱、电话、居住地
-2. 技能栈：编程语言、框架、数据库、工具、中间件等
-3. 工作经历：公司名称、职位、时间、职责描述、主要成果
-4. 项目经验：项目名称、技术栈、项目描述、担任角色、项目成果
-5. 教育背景：学校、专业、学历、毕业时间
+你的任务是分析简历中尚未结构化的部分，提取工作经历、项目经验和补充技能，以JSON格式返回。
 
 请仔细分析简历，确保提取的信息准确完整。
-对于技能，请按照熟练度分类：精通、熟练、了解。
 对于工作经历和项目经验，请提取具体的成果和数据（如性能提升、用户量等）。"""
 
-        user_prompt = f"""请分析以下简历内容，提取关键信息并以JSON格式返回：
+        known = {
+            "basic_info": {k: v for k, v in local.data["basic_info"].items() if v},
+            "skills": [name for names in local.data["skills"].values() for name in names],
+            "education": local.data["education"],
+        }
+
+        # 本地未识别出教育背景时才让模型提取
+        education_template = "" if local.data["education"] else """,
+    "education": [
+        {
+            "school": "学校名称",
+            "major": "专业",
+            "degree": "学历（本科/硕士/博士）",
+            "graduation_time": "毕业时间"
+        }
+    ]"""
+
+        user_prompt = f"""以下信息已经从简历中提取，无需重复：
+{json.dumps(known, ensure_ascii=False)}
+
+请分析以下简历内容，提取其余关键信息并以JSON格式返回：
 
 简历内容：
-{resume_text}
+{local.residual_text}
 
 请返回以下JSON格式：
 {{
     "basic_info": {{
-        "name": "姓名",
-        "email": "邮箱",
-        "phone": "电话",
-        "location": "居住地"
+        "name": "姓名（已提取则省略）",
+        "location": "居住地（已提取则省略）"
     }},
     "skills": {{
-        "programming_languages": ["语言1", "语言2"],
-        "frameworks": ["框架1", "框架2"],
-        "databases": ["数据库1", "数据库2"],
-        "tools": ["工具1", "工具2"],
-        "cloud_platforms": ["云平台1"]
+        "programming_languages": ["未在已提取列表中的语言"],
+        "frameworks": ["框架"],
+        "databases": ["数据库"],
+        "tools": ["工具"],
+        "cloud_platforms": ["云平台"]
     }},
     "work_experience": [
         {{
@@ -71,21 +92,13 @@ class ResumeParser:
             "description": "项目描述",
             "achievements": ["成果1", "成果2"]
         }}
-    ],
-    "education": [
-        {{
-            "school": "学校名称",
-            "major": "专业",
-            "degree": "学历（本科/硕士/博士）",
-            "graduation_time": "毕业时间"
-        }}
-    ]
+    ]{education_template}
 }}
 
 注意：
 - 如果某项信息不存在，返回空数组或null
 - 时间格式尽量统一
-- 技能要分类清楚
+- skills 只返回已提取列表之外的技能
 - 工作经历按时间倒序排列
 - 只返回JSON，不要有其他文字"""
 
@@ -99,44 +112,30 @@ class ResumeParser:
             import re
             json_match = re.search(r'\{.*\}', response, re.DOTALL)
             if json_match:
-                resume_data = json.loads(json_match.group(0))
+                remote_data = json.loads(json_match.group(0))
             else:
                 raise ValueError("No JSON found in response")
 
-            # 确保所有必需字段存在
-            resume_data.setdefault("basic_info", {})
-            resume_data.setdefault("skills", {})
-            resume_data.setdefault("skills", {})
-            resume_data["skills"].setdefault("programming_languages", [])
-            resume_data["skills"].setdefault("frameworks", [])
-            resume_data["skills"].setdefault("databases", [])
-            resume_data["skills"].setdefault("tools", [])
-            resume_data["skills"].setdefault("cloud_platforms", [])
-            resume_data.setdefault("work_experience", [])
-            resume_data.setdefault("projects", [])
-            resume_data.setdefault("education", [])
-
-            return resume_data
+            return merge_resume_data(local.data, remote_data)
 
         except Exception as e:
             print(f"Failed to parse resume: {e}")
-            # 返回默认结构
-            return {
-                "basic_info": {},
-                "skills": {
-                    "programming_languages": [],
-                    "frameworks": [],
-                    "databases": [],
-                    "tools": [],
-                    "cloud_platforms": []
-                },
-                "work_experience": [],
-                "projects": [],
-                "education": []
-            }
+            # 返回本地抽取的结果
+            return local.data
+
+    async def extract_text(self, pdf_path: str) -> str:
+        """在进程池中从PDF文件提取文本，不阻塞事件循环
+
+        Args:
+            pdf_path: PDF文件路径
+
+        Returns:
+            提取的文本内容
+        """
+        return await pdf_extractor.extract_text(pdf_path)
 
     def extract_text_from_pdf(self, pdf_path: str) -> str:
-        """从PDF文件中提取文本
+        """从PDF文件中提取文本（同步版本，会阻塞调用方）
 
         Args:
             pdf_path: PDF文件路径
@@ -146,21 +145,15 @@ class ResumeParser:
         """
         try:
             import PyPDF2
-            text = ""
             with open(pdf_path, 'rb') as file:
                 reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-            return text
+                return "\n".join(page.extract_text() or "" for page in reader.pages)
         except ImportError:
             # 如果PyPDF2不可用，尝试pdfplumber
             try:
                 import pdfplumber
-                text = ""
                 with pdfplumber.open(pdf_path) as pdf:
-                    for page in pdf.pages:
-                        text += page.extract_text() + "\n"
-                return text
+                    return "\n".join(page.extract_text() or "" for page in pdf.pages)
             except ImportError:
                 raise Exception("PDF库未安装，请安装PyPDF2或pdfplumber")
         except Exception as e:
@@ -173,6 +166,9 @@ class ResumeParser:
     ) -> Dict[str, Any]:
         """对比简历和JD，生成差距分析
 
+        匹配分、逐条要求的证据和技能匹配都在本地计算（match_scorer、skill_taxonomy），
+        模型只根据这些结果撰写差距描述和改进建议。
+
         Args:
             resume_data: 简历数据
             jd_data: JD数据
@@ -180,23 +176,46 @@ class ResumeParser:
         Returns:
             差距分析结果
         """
+        coverage = skill_taxonomy.jd_coverage(resume_data, jd_data)
+        match = match_scorer.score(resume_data, jd_data)
+
+        requirement_summary = [
+            {
+                "requirement": r.requirement.text,
+                "kind": r.requirement.kind,
+                "score": round(r.score, 2),
+                "evidence": r.evidence.label if r.evidence else None,
+            }
+            for r in match.requirements
+        ]
+        background = {
+            "work_experience": [
+                {k: item.get(k) for k in ("company", "position", "start_time", "end_time")}
+                for item in resume_data.get("work_experience") or [] if isinstance(item, dict)
+            ],
+            "education": resume_data.get("education") or [],
+        }
 
         system_prompt = """你是一位专业的职业规划顾问，擅长分析简历和职位要求之间的差距。
-你的任务是对比简历和JD，识别能力差距，并给出改进建议。"""
+你的任务是根据已计算的匹配结果，描述能力差距并给出改进建议。"""
+
+        user_prompt = f"""以下是简历与职位描述（JD）的匹配结果（已计算，直接使用）：
 
-        user_prompt = f"""请对比以下简历和职位描述（JD），生成差距分析：
+匹配度评分：{match.match_score}
+逐条要求匹配情况（score 为 0-1，evidence 为简历中最相关的段落）：
+{json.dumps(requirement_summary, ensure_ascii=False)}
 
-简历数据：
-{json.dumps(resume_data, ensure_ascii=False, indent=2)}
+技能匹配：
+{json.dumps(coverage.to_dict(), ensure_ascii=False)}
 
-职位描述数据：
-{json.dumps(jd_data, ensure_ascii=False, indent=2)}
+JD基本要求：
+{json.dumps(jd_data.get("basic_requirements") or {}, ensure_ascii=False)}
+
+候选人背景：
+{json.dumps(background, ensure_ascii=False)}
 
 请返回以下JSON格式：
 {{
-    "match_score": 匹配度评分（0-100），
-    "matched_skills": ["匹配的技能1", "匹配的技能2"],
-    "missing_skills": ["缺少的技能1", "缺少的技能2"],
     "gap_analysis": {{
         "technical_gap": "技术差距描述",
         "experience_gap": "经验差距描述",
@@ -217,8 +236,7 @@ class ResumeParser:
 }}
 
 注意：
-- 匹配度评分要客观（0-100分）
-- 差距分析要具体
+- 差距分析要具体，优先说明得分低的要求
 - 改进建议要可操作
 - 推荐训练要基于实际需求
 """
@@ -238,22 +256,16 @@ class ResumeParser:
                 raise ValueError("No JSON found in response")
 
             # 确保所有字段存在
-            gap_analysis.setdefault("match_score", 70)
-            gap_analysis.setdefault("matched_skills", [])
-            gap_analysis.setdefault("missing_skills", [])
             gap_analysis.setdefault("gap_analysis", {})
             gap_analysis.setdefault("improvement_suggestions", [])
             gap_analysis.setdefault("recommended_training", [])
 
-            return gap_analysis
+            return self._apply_local_match(gap_analysis, coverage, match)
 
         except Exception as e:
             print(f"Failed to analyze gap: {e}")
-            # 返回默认分析
-            return {
-                "match_score": 70,
-                "matched_skills": [],
-                "missing_skills": [],
+            # 返回默认分析（匹配分和技能匹配仍使用本地结果）
+            return self._apply_local_match({
                 "gap_analysis": {
                     "technical_gap": "",
                     "experience_gap": "",
@@ -261,4 +273,17 @@ class ResumeParser:
                 },
                 "improvement_suggestions": ["建议加强技术深度", "建议积累更多项目经验"],
                 "recommended_training": []
-            }
+            }, coverage, match)
+
+    @staticmethod
+    def _apply_local_match(
+        gap_analysis: Dict[str, Any],
+        coverage: SkillCoverage,
+        match: MatchResult,
+    ) -> Dict[str, Any]:
+        gap_analysis["match_score"] = match.match_score
+        gap_analysis["requirement_scores"] = match.to_dict()["requirements"]
+        gap_analysis["matched_skills"] = coverage.matched_required + coverage.matched_preferred
+        gap_analysis["missing_skills"] = coverage.missing_required
+        gap_analysis["skill_coverage"] = coverage.to_dict()
+        return gap_analysis
@@ -0,0 +1,133 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from typing import Optional
+
+from fastapi import UploadFile
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session
+from app.models.resume_blob import ResumeBlob
+
+
+class UploadTooLarge(Exception):
+    """上传文件超过大小限制"""
+
+
+class ResumeBlobStore:
+    """按内容哈希寻址的简历文件存储
+
+    文件路径为 <root>/<hash[:2]>/<hash[2:4]>/<hash>.pdf，相同内容只保存一份；
+    resume_blobs 表记录引用计数，计数归零并提交后由 purge 删除记录和文件。
+    """
+
+    def __init__(self, root: str, chunk_size: int = 64 * 1024):
+        self.root = root
+        self.chunk_size = chunk_size
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def blob_path(self, content_hash: str) -> str:
+        return os.path.join(self.root, content_hash[:2], content_hash[2:4], f"{content_hash}.pdf")
+
+    async def receive(self, file: UploadFile, max_size: int) -> tuple[str, str, int]:
+        """分块写入临时文件并计算 sha256，超过大小限制立即中止
+
+        Returns:
+            (content_hash, tmp_path, size)
+        """
+        tmp_path = os.path.join(self.tmp_dir, f"{uuid.uuid4()}.part")
+        digest = hashlib.sha256()
+        size = 0
+        out = await asyncio.to_thread(open, tmp_path, "wb")
+        try:
+            while True:
+                chunk = await file.read(self.chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLarge()
+                digest.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+        except BaseException:
+            await asyncio.to_thread(out.close)
+            await asyncio.to_thread(os.remove, tmp_path)
+            raise
+
+        await asyncio.to_thread(out.close)
+        return digest.hexdigest(), tmp_path, size
+
+    async def commit(self, db: AsyncSession, content_hash: str, tmp_path: str, size: int) -> ResumeBlob:
+        """增加引用计数并把临时文件放入内容寻址路径（调用方负责 db.commit）
+
+        先写记录再放文件：写记录会拿到数据库写锁，与 purge 的检查和删除串行，
+        purge 不会删掉刚放好的文件。
+        """
+        path = self.blob_path(content_hash)
+
+        await db.execute(
+            insert(ResumeBlob)
+            .values(hash=content_hash, path=path, size=size, ref_count=1)
+            .on_conflict_do_update(
+                index_elements=[ResumeBlob.hash],
+                set_={"ref_count": ResumeBlob.ref_count + 1, "path": path},
+            )
+        )
+
+        def _place():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 内容相同，直接原子替换即可，同时修复可能缺失的文件
+            os.replace(tmp_path, path)
+
+        await asyncio.to_thread(_place)
+        return await self.get(db, content_hash)
+
+    async def get(self, db: AsyncSession, content_hash: str) -> Optional[ResumeBlob]:
+        result = await db.execute(
+            select(ResumeBlob)
+            .where(ResumeBlob.hash == content_hash)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def release(self, db: AsyncSession, content_hash: str) -> None:
+        """减少引用计数（调用方负责 db.commit，提交后再调用 purge）"""
+        await db.execute(
+            update(ResumeBlob)
+            .where(ResumeBlob.hash == content_hash)
+            .values(ref_count=ResumeBlob.ref_count - 1)
+        )
+
+    async def purge(self, content_hash: str) -> None:
+        """引用计数归零时删除记录和文件
+
+        在引用计数的修改提交之后调用；在同一个事务里重新检查计数，
+        期间又有上传引用了同一文件时保留。
+        """
+        async with async_session() as db:
+            result = await db.execute(
+                delete(ResumeBlob)
+                .where(ResumeBlob.hash == content_hash)
+                .where(ResumeBlob.ref_count <= 0)
+                .returning(ResumeBlob.path)
+            )
+            path = result.scalar_one_or_none()
+            if path:
+                try:
+                    await asyncio.to_thread(os.remove, path)
+                except OSError:
+                    pass  # 忽略删除失败
+            await db.commit()
+
+    async def discard(self, tmp_path: str) -> None:
+        try:
+            await asyncio.to_thread(os.remove, tmp_path)
+        except OSError:
+            pass
+
+
+resume_store = ResumeBlobStore("uploads/resumes")
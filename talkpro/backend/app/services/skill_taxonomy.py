@@ -0,0 +1,191 @@
+import json
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config import DATA_DIR
+from app.core.text_matcher import MultiPatternMatcher, ascii_lower
+
+SKILL_CATEGORIES = ["programming_languages", "frameworks", "databases", "tools", "cloud_platforms"]
+
+
+@dataclass
+class SkillCoverage:
+    """简历对JD技能要求的覆盖情况"""
+    matched_required: List[str] = field(default_factory=list)
+    missing_required: List[str] = field(default_factory=list)
+    matched_preferred: List[str] = field(default_factory=list)
+    missing_preferred: List[str] = field(default_factory=list)
+    extra: List[str] = field(default_factory=list)
+
+    @property
+    def required_ratio(self) -> float:
+        total = len(self.matched_required) + len(self.missing_required)
+        return len(self.matched_required) / total if total else 1.0
+
+    @property
+    def preferred_ratio(self) -> float:
+        total = len(self.matched_preferred) + len(self.missing_preferred)
+        return len(self.matched_preferred) / total if total else 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "matched_required": self.matched_required,
+            "missing_required": self.missing_required,
+            "matched_preferred": self.matched_preferred,
+            "missing_preferred": self.missing_preferred,
+            "extra": self.extra,
+            "required_ratio": round(self.required_ratio, 3),
+            "preferred_ratio": round(self.preferred_ratio, 3),
+        }
+
+
+def _normalize_term(term: str) -> str:
+    """词典外的技能名：统一全角、大小写和空白后作为比较键"""
+    return re.sub(r"\s+", " ", ascii_lower(unicodedata.normalize("NFKC", term))).strip()
+
+
+class SkillTaxonomy:
+    """技能分类体系：标准名、同义词和上下级关系
+
+    所有同义词编译为一个多模式匹配自动机，简历和JD文本各扫描一遍即可得到标准技能集合；
+    会某项技能视为也会它的上级技能（Spring Boot → Spring → Java），
+    差距分析在标准名集合上做集合运算。
+    """
+
+    def __init__(self, entries: Dict[str, List[Dict[str, Any]]]):
+        self.category_of: Dict[str, str] = {}
+        self.parent_of: Dict[str, str] = {}
+        self._by_key: Dict[str, str] = {}
+
+        patterns = []
+        for category, items in entries.items():
+            for item in items:
+                name = item["name"]
+                self.category_of[name] = category
+                if item.get("parent"):
+                    self.parent_of[name] = item["parent"]
+
+                exact = set(item.get("case_sensitive") or [])
+                for surface in [name] + item.get("aliases", []):
+                    patterns.append((surface, name, surface in exact))
+                    if surface not in exact:
+                        self._by_key[_normalize_term(surface)] = name
+
+        self._matcher = MultiPatternMatcher(patterns)
+        self._ancestors: Dict[str, List[str]] = {name: self._walk_up(name) for name in self.category_of}
+
+    def _walk_up(self, name: str) -> List[str]:
+        ancestors, seen = [], {name}
+        parent = self.parent_of.get(name)
+        while parent and parent not in seen:
+            ancestors.append(parent)
+            seen.add(parent)
+            parent = self.parent_of.get(parent)
+        return ancestors
+
+    @staticmethod
+    def key(name: str) -> str:
+        """技能集合比较用的键"""
+        return _normalize_term(name)
+
+    def ancestors(self, name: str) -> List[str]:
+        return self._ancestors.get(name, [])
+
+    @classmethod
+    def load(cls, path=None) -> "SkillTaxonomy":
+        path = path or DATA_DIR / "skills.json"
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(json.load(f))
+        except Exception as e:
+            print(f"Error loading skill taxonomy: {e}")
+            return cls({})
+
+    def scan(self, text: str) -> List[str]:
+        """在文本中找出所有已知技能，返回标准名（保持首次出现顺序）"""
+        found: Dict[str, None] = {}
+        for m in self._matcher.find_all(unicodedata.normalize("NFKC", text)):
+            found.setdefault(m.value)
+        return list(found)
+
+    def tag(self, text: str) -> Dict[str, List[str]]:
+        """按分类整理文本中出现的技能"""
+        skills: Dict[str, List[str]] = {c: [] for c in SKILL_CATEGORIES}
+        for name in self.scan(text):
+            skills.setdefault(self.category_of[name], []).append(name)
+        return skills
+
+    def normalize(self, term: str) -> List[str]:
+        """把一条技能描述归一化为标准名
+
+        "Golang" → ["Go"]；"熟悉Java及Spring框架" → ["Java", "Spring"]；
+        词典中没有的技能原样保留（去掉首尾空白）。
+        """
+        if not isinstance(term, str) or not term.strip():
+            return []
+        name = self._by_key.get(_normalize_term(term))
+        if name:
+            return [name]
+        return self.scan(term) or [term.strip()]
+
+    def normalize_all(self, terms: Iterable[str]) -> List[str]:
+        result: Dict[str, None] = {}
+        for term in terms or []:
+            for name in self.normalize(term):
+                result.setdefault(name)
+        return list(result)
+
+    def expand(self, names: Iterable[str]) -> set:
+        """技能集合加上所有上级技能，用于判断是否满足要求"""
+        expanded = set()
+        for name in names:
+            expanded.add(_normalize_term(name))
+            expanded.update(_normalize_term(a) for a in self._ancestors.get(name, ()))
+        return expanded
+
+    def resume_skills(self, resume_data: Optional[Dict[str, Any]]) -> List[str]:
+        """简历中所有分类的技能（已归一化）"""
+        skills = (resume_data or {}).get("skills") or {}
+        if isinstance(skills, dict):
+            terms = [s for values in skills.values() if isinstance(values, list) for s in values]
+        else:
+            terms = list(skills)
+        return self.normalize_all(terms)
+
+    def coverage(
+        self,
+        resume_skills: Iterable[str],
+        required: Iterable[str],
+        preferred: Iterable[str] = (),
+    ) -> SkillCoverage:
+        """计算简历对必需/加分技能的覆盖"""
+        have = self.normalize_all(resume_skills)
+        have_keys = self.expand(have)
+        required_names = self.normalize_all(required)
+        preferred_names = [s for s in self.normalize_all(preferred) if s not in required_names]
+
+        result = SkillCoverage()
+        for name in required_names:
+            bucket = result.matched_required if _normalize_term(name) in have_keys else result.missing_required
+            bucket.append(name)
+        for name in preferred_names:
+            bucket = result.matched_preferred if _normalize_term(name) in have_keys else result.missing_preferred
+            bucket.append(name)
+
+        wanted = {_normalize_term(s) for s in required_names + preferred_names}
+        result.extra = [s for s in have if _normalize_term(s) not in wanted]
+        return result
+
+    def jd_coverage(self, resume_data: Optional[Dict[str, Any]], jd_data: Dict[str, Any]) -> SkillCoverage:
+        """简历数据对JD结构化数据的技能覆盖"""
+        jd_skills = jd_data.get("skills") or {}
+        return self.coverage(
+            self.resume_skills(resume_data),
+            jd_skills.get("required") or [],
+            jd_skills.get("preferred") or [],
+        )
+
+
+skill_taxonomy = SkillTaxonomy.load()
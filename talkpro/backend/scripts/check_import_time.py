@@ -0,0 +1,76 @@
+"""检查应用的导入耗时
+
+在子进程中用 python -X importtime 导入应用，列出累计耗时最多的顶层模块。
+总耗时超出预算，或本应首次使用时才导入的重量级依赖在导入阶段就被加载时，
+以非零状态退出。在 backend 目录下运行：
+
+    python scripts/check_import_time.py [--budget-ms 1500] [--module app.main] [--top 15]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# 只应在首次使用时导入的模块
+LAZY_MODULES = ("anthropic", "PyPDF2", "pdfplumber")
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def measure(module: str) -> list[tuple[int, int, str]]:
+    """(缩进层级, 累计耗时微秒, 模块名)，按导入顺序"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            entries.append((len(m.group(3)) // 2, int(m.group(2)), m.group(4)))
+    return entries
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    entries = measure(args.module)
+    total_ms = sum(cumulative for depth, cumulative, _ in entries if depth == 0) / 1000
+
+    # 每个顶层包第一次被导入时的累计耗时（包含其子模块）
+    packages: dict[str, int] = {}
+    for _, cumulative, name in entries:
+        if "." not in name:
+            packages.setdefault(name, cumulative)
+
+    print(f"import {args.module}: {total_ms:.0f}ms (budget {args.budget_ms:.0f}ms)")
+    for name, cumulative in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}ms  {name}")
+
+    failed = False
+    eager = sorted(name for name in packages if name in LAZY_MODULES)
+    if eager:
+        print(f"FAIL: imported eagerly, should be deferred to first use: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: over budget by {total_ms - args.budget_ms:.0f}ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
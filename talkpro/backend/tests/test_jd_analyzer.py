@@ -0,0 +1,77 @@
+"""JDAnalyzer 并发请求合并测试（模型调用和存储替换为内存实现）
+
+在 backend 目录下运行：python -m pytest tests
+"""
+import asyncio
+import os
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+os.environ.setdefault("SECRET_KEY", "test")
+
+from app.services import jd_analyzer as jd_analyzer_module  # noqa: E402
+from app.services.jd_analyzer import JDAnalyzer  # noqa: E402
+
+JD_TEXT = "后端工程师：负责订单服务，熟悉 Python 和 MySQL"
+
+
+class FakeNearDuplicates:
+    async def add(self, jd_hash, jd_text):
+        pass
+
+
+def make_analyzer(monkeypatch, release: asyncio.Event, calls: list) -> JDAnalyzer:
+    async def fake_analyze_jd_text(claude, jd_text, company=None, position=None):
+        calls.append(jd_text)
+        await release.wait()
+        return {"company": None, "position": "后端工程师", "skills": {"required": ["Python"]}}
+
+    monkeypatch.setattr(jd_analyzer_module, "analyze_jd_text", fake_analyze_jd_text)
+    monkeypatch.setattr(jd_analyzer_module, "jd_near_duplicates", FakeNearDuplicates())
+    monkeypatch.setattr(JDAnalyzer, "claude", None)
+
+    analyzer = JDAnalyzer(max_concurrency=2)
+    stored = {}
+
+    async def load(jd_hash):
+        return stored.get(jd_hash)
+
+    async def store(jd_hash, jd_data):
+        stored[jd_hash] = jd_data
+
+    async def no_near_duplicate(jd_hash, jd_text):
+        return None
+
+    analyzer._load = load
+    analyzer._store = store
+    analyzer._reuse_near_duplicate = no_near_duplicate
+    return analyzer
+
+
+def test_cancelled_leader_does_not_cancel_waiters(monkeypatch):
+    async def scenario():
+        release = asyncio.Event()
+        calls = []
+        analyzer = make_analyzer(monkeypatch, release, calls)
+
+        leader = asyncio.create_task(analyzer.analyze(JD_TEXT, company="甲公司"))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(analyzer.analyze(JD_TEXT, company="乙公司"))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        jd_hash, jd_data, reused = await asyncio.wait_for(waiter, 5)
+        assert leader.cancelled()
+        assert jd_data["company"] == "乙公司"
+        assert reused is True
+        assert calls == [JD_TEXT]  # 只调用一次模型
+        assert not analyzer._inflight
+
+        # 结果已保存，之后的请求直接命中
+        _, _, cached = await analyzer.analyze(JD_TEXT)
+        assert cached is True
+        assert calls == [JD_TEXT]
+
+    asyncio.run(scenario())
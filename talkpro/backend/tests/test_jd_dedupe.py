@@ -0,0 +1,68 @@
+"""JDNearDuplicateIndex 加载测试：加载期间新增的签名不能丢（使用临时 SQLite 数据库）
+
+在 backend 目录下运行：python -m pytest tests
+"""
+import asyncio
+import os
+import time
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+os.environ.setdefault("SECRET_KEY", "test")
+
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+from app import database  # noqa: E402
+from app.services import jd_dedupe  # noqa: E402
+from app.services.jd_dedupe import JDNearDuplicateIndex, LSHIndex  # noqa: E402
+
+JDS = [
+    f"岗位{i}：负责{topic}系统的设计与开发\n熟悉 {lang} 和分布式存储\n有{i}年以上相关经验"
+    for i, (topic, lang) in enumerate([
+        ("订单", "Python"), ("支付", "Go"), ("推荐", "C++"), ("搜索", "Java"),
+        ("风控", "Rust"), ("广告", "Scala"), ("客服", "Kotlin"),
+    ], start=1)
+]
+
+
+def test_signatures_added_during_load_are_kept(tmp_path, monkeypatch):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jd.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(database.Base.metadata.create_all)
+        database.async_session.configure(bind=engine)
+
+        # 旧索引攒够 2 条就合并，模拟加载期间发生的 flush
+        monkeypatch.setattr(jd_dedupe, "PENDING_LIMIT", 2)
+        building = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        original_build = LSHIndex.build
+
+        def slow_build(bands, ids, keys):
+            loop.call_soon_threadsafe(building.set)
+            time.sleep(0.5)
+            return original_build(bands, ids, keys)
+
+        monkeypatch.setattr(LSHIndex, "build", staticmethod(slow_build))
+
+        try:
+            seeded = JDNearDuplicateIndex(num_perm=64, bands=16, threshold=0.8)
+            seeded.ready = True
+            for i, text in enumerate(JDS[:3]):
+                await seeded.add(f"hash-{i}", text)
+
+            index = JDNearDuplicateIndex(num_perm=64, bands=16, threshold=0.8)
+            index.start()
+            await asyncio.wait_for(building.wait(), 5)
+            for i, text in enumerate(JDS[3:], start=3):
+                await index.add(f"hash-{i}", text)
+            await asyncio.wait_for(index._loader, 5)
+
+            assert len(index) == len(JDS)
+            for i, text in enumerate(JDS):
+                found = await index.find(text)
+                assert found is not None and found.jd_hash == f"hash-{i}"
+        finally:
+            database.async_session.configure(bind=database.engine)
+            await engine.dispose()
+
+    asyncio.run(scenario())
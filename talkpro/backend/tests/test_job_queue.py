@@ -0,0 +1,58 @@
+"""JobQueue dedupe_key 去重测试（使用临时 SQLite 数据库）
+
+在 backend 目录下运行：python -m pytest tests
+"""
+import asyncio
+import os
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+os.environ.setdefault("SECRET_KEY", "test")
+
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+from app import database  # noqa: E402
+from app.models.job import JobStatus  # noqa: E402
+from app.services.job_queue import JobQueue  # noqa: E402
+
+
+def test_dedupe_key_allows_resubmission_after_job_finished(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(database.Base.metadata.create_all)
+        database.async_session.configure(bind=engine)
+
+        queue = JobQueue(max_concurrency=2, default_concurrency=1, poll_interval=0.05, retry_base_seconds=0.01)
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        @queue.handler("echo")
+        async def echo(ctx):
+            started.set()
+            await release.wait()
+            return ctx.payload
+
+        try:
+            first = await queue.enqueue("echo", {"n": 1}, dedupe_key="echo:1")
+            assert (await queue.enqueue("echo", {"n": 1}, dedupe_key="echo:1")).id == first.id
+
+            await queue.start()
+            await asyncio.wait_for(started.wait(), 5)
+            running = await queue.enqueue("echo", {"n": 1}, dedupe_key="echo:1")
+            assert running.id == first.id
+
+            release.set()
+            finished = await asyncio.wait_for(queue.wait(first.id), 5)
+            assert finished.status == JobStatus.SUCCEEDED
+
+            # 已结束的任务不再占用 dedupe_key：查询和部分唯一索引都要放行
+            second = await queue.enqueue("echo", {"n": 1}, dedupe_key="echo:1")
+            assert second.id != first.id
+            assert second.status == JobStatus.QUEUED
+            assert (await asyncio.wait_for(queue.wait(second.id), 5)).status == JobStatus.SUCCEEDED
+        finally:
+            await queue.stop()
+            database.async_session.configure(bind=database.engine)
+            await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,30 @@
+"""Verdict.summary() 测试：隐藏用例的内容不能出现在给面试官模型的结论里
+
+在 backend 目录下运行：python -m pytest tests
+"""
+import os
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+os.environ.setdefault("SECRET_KEY", "test")
+
+from app.services.judge import CaseResult, JudgeCase, Verdict  # noqa: E402
+
+
+def make_verdict(hidden: bool) -> Verdict:
+    case = JudgeCase(index=3, hidden=hidden, input="nums = [9, 8, 7], target = 15", args={}, expected=[0, 2])
+    failure = CaseResult(case=case, status="wrong_answer", actual="[1, 2]", error=None)
+    return Verdict(status="wrong_answer", passed=3, total=5, failure=failure)
+
+
+def test_summary_hides_hidden_case_details():
+    summary = make_verdict(hidden=True).summary()
+    assert "hidden test 4 (wrong_answer)" in summary
+    for secret in ("[9, 8, 7]", "[0, 2]", "[1, 2]"):
+        assert secret not in summary
+
+
+def test_summary_shows_failing_example():
+    summary = make_verdict(hidden=False).summary()
+    assert "example 4 (wrong_answer): input nums = [9, 8, 7], target = 15" in summary
+    assert "expected [0, 2]" in summary
+    assert "got [1, 2]" in summary
@@ -0,0 +1,46 @@
+"""PDFExtractor 超时测试：一个 PDF 超时被结束时，其他用户正在进行的提取不受影响
+
+子进程中执行的函数替换为本模块的函数（按文件名决定耗时），不需要真实的 PDF。
+在 backend 目录下运行：python -m pytest tests
+"""
+import asyncio
+import os
+import time
+
+import pytest
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+os.environ.setdefault("SECRET_KEY", "test")
+
+from app.services import pdf_extractor as pdf_extractor_module  # noqa: E402
+from app.services.pdf_extractor import PDFExtractionError, PDFExtractor  # noqa: E402
+
+
+def fake_count_pages(pdf_path: str) -> int:
+    # stuck.pdf 模拟卡死的解析，其余文件耗时 2.5 秒
+    time.sleep(60 if pdf_path == "stuck.pdf" else 2.5)
+    return 1
+
+
+def fake_extract_pages(pdf_path: str, start: int, end: int) -> list:
+    return [f"{pdf_path} page {i + 1}" for i in range(start, end)]
+
+
+def test_timeout_only_kills_its_own_extraction(monkeypatch):
+    monkeypatch.setattr(pdf_extractor_module, "_count_pages", fake_count_pages)
+    monkeypatch.setattr(pdf_extractor_module, "_extract_pages", fake_extract_pages)
+
+    async def scenario():
+        extractor = PDFExtractor(workers=2, pages_per_task=10, timeout=3)
+        stuck = asyncio.create_task(extractor.extract_text("stuck.pdf"))
+        await asyncio.sleep(1)
+        # 第二个提取在第一个超时（约 3 秒）时仍在进行，约 3.5 秒完成
+        other = asyncio.create_task(extractor.extract_text("resume.pdf"))
+
+        with pytest.raises(PDFExtractionError, match="超时"):
+            await stuck
+        assert await other == "resume.pdf page 1"
+        assert not extractor._executors
+        assert not extractor._slots.locked()
+
+    asyncio.run(scenario())
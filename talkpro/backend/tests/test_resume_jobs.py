@@ -0,0 +1,43 @@
+"""简历解析任务的去重测试（使用临时 SQLite 数据库，不执行任务）
+
+在 backend 目录下运行：python -m pytest tests
+"""
+import asyncio
+import os
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+os.environ.setdefault("SECRET_KEY", "test")
+
+from sqlalchemy import update  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+from app import database  # noqa: E402
+from app.api.resume import _enqueue_parse  # noqa: E402
+from app.models.job import Job, JobStatus  # noqa: E402
+
+
+def test_reupload_after_finished_parse_enqueues_new_job(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(database.Base.metadata.create_all)
+        database.async_session.configure(bind=engine)
+
+        try:
+            # 第一次上传：解析任务排队中，重复提交（/resume/parse）返回同一个任务
+            first = await _enqueue_parse("user-1", "hash-1")
+            assert (await _enqueue_parse("user-1", "hash-1")).id == first.id
+
+            async with database.async_session() as db:
+                await db.execute(update(Job).where(Job.id == first.id).values(status=JobStatus.SUCCEEDED))
+                await db.commit()
+
+            # 删除后重新上传同一文件：解析结果已随文件释放，必须重新解析
+            second = await _enqueue_parse("user-1", "hash-1")
+            assert second.id != first.id
+            assert second.status == JobStatus.QUEUED
+        finally:
+            database.async_session.configure(bind=database.engine)
+            await engine.dispose()
+
+    asyncio.run(scenario())
@@ -10,6 +10,7 @@ import {
   createAlgorithmWebSocketV2,
   endAlgorithmInterviewV2,
 } from '../services/api';
+import { unifiedDiff } from '../services/codeDiff';
 
 export default function AlgorithmPage() {
   const navigate = useNavigate();
@@ -21,6 +22,10 @@ export default function AlgorithmPage() {
   const [difficulty, setDifficulty] = useState<'easy' | 'medium' | 'hard'>('medium');
   const [showReport, setShowReport] = useState(false);
   const wsRef = useRef<WebSocket | null>(null);
+  // Last code version accepted by the server; later edits are sent as diffs against it
+  const lastCodeRef = useRef<{ version: number; code: string } | null>(null);
+  // Code sent and not yet accepted, resent in full on a conflict
+  const pendingRef = useRef<{ content: string; code: string } | null>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
 
   useEffect(() => {
@@ -63,10 +68,24 @@ export default function AlgorithmPage() {
         console.log('WebSocket connected');
       };
 
+      lastCodeRef.current = null;
+      pendingRef.current = null;
+
       ws.onmessage = (event) => {
         const data = JSON.parse(event.data);
 
-        if (data.type === 'message_start') {
+        if (data.type === 'code_accepted') {
+          if (pendingRef.current) {
+            lastCodeRef.current = { version: data.version, code: pendingRef.current.code };
+            pendingRef.current = null;
+          }
+        } else if (data.type === 'code_conflict') {
+          // The server has a different base version: resend the whole code
+          lastCodeRef.current = null;
+          if (pendingRef.current) {
+            ws.send(JSON.stringify(pendingRef.current));
+          }
+        } else if (data.type === 'message_start') {
           setStreaming(true);
           addMessage({ role: 'assistant', content: '', timestamp: Date.now() });
         } else if (data.type === 'message_chunk') {
@@ -110,13 +129,21 @@ export default function AlgorithmPage() {
   const handleSend = () => {
     if (!input.trim() || !wsRef.current || session?.isStreaming) return;
 
-    const message = { content: input, code: showCode ? code : undefined };
+    let message: Record<string, unknown> = { content: input };
+    if (showCode && code) {
+      pendingRef.current = { content: input, code };
+      const last = lastCodeRef.current;
+      const diff = last ? unifiedDiff(last.code, code) : null;
+      message = last && diff !== null
+        ? { content: input, code_diff: diff, base_version: last.version }
+        : { content: input, code };
+    }
     addMessage({ role: 'user', content: input, timestamp: Date.now() });
 
     wsRef.current.send(JSON.stringify(message));
 
+    // The code stays in the editor so the next submission is an edit of it
     setInput('');
-    setCode('');
   };
 
   const handleEnd = async () => {
@@ -122,8 +122,32 @@ export default function WorkplacePage() {
             ...prev,
             isStreaming: false,
           }));
+        } else if (data.type === 'evaluating' || data.type === 'report_start') {
+          // 评估报告边生成边展示，重试时从头开始
+          setSession((prev: any) => ({ ...prev, score: {} }));
+          setShowReport(true);
+        } else if (data.type === 'report_score') {
+          setSession((prev: any) => ({
+            ...prev,
+            score: { ...prev.score, [data.dimension]: data.score },
+          }));
+        } else if (data.type === 'report_item') {
+          setSession((prev: any) => ({
+            ...prev,
+            score: {
+              ...prev.score,
+              [data.field]: [...(prev.score?.[data.field] || []), data.content],
+            },
+          }));
+        } else if (data.type === 'report_feedback') {
+          setSession((prev: any) => ({
+            ...prev,
+            score: { ...prev.score, feedback: data.content },
+          }));
         } else if (data.type === 'session_complete') {
-          handleEnd(data.evaluation);
+          // 以校验后的完整报告为准
+          setSession((prev: any) => ({ ...prev, score: data.evaluation }));
+          setShowReport(true);
         } else if (data.type === 'error') {
           console.error('WebSocket error:', data.message);
           setSession((prev: any) => ({ ...prev, isStreaming: false }));
@@ -269,25 +293,25 @@ export default function WorkplacePage() {
               <div className="bg-gray-50 p-4 rounded-lg">
                 <div className="text-sm text-gray-600">技术深度</div>
                 <div className={`text-2xl font-bold ${getScoreColor(session.score.technical_depth)}`}>
-                  {session.score.technical_depth}/10
+                  {session.score.technical_depth ?? '-'}/10
                 </div>
               </div>
               <div className="bg-gray-50 p-4 rounded-lg">
                 <div className="text-sm text-gray-600">业务理解</div>
                 <div className={`text-2xl font-bold ${getScoreColor(session.score.business_understanding)}`}>
-                  {session.score.business_understanding}/10
+                  {session.score.business_understanding ?? '-'}/10
                 </div>
               </div>
               <div className="bg-gray-50 p-4 rounded-lg">
                 <div className="text-sm text-gray-600">沟通表达</div>
                 <div className={`text-2xl font-bold ${getScoreColor(session.score.communication)}`}>
-                  {session.score.communication}/10
+                  {session.score.communication ?? '-'}/10
                 </div>
               </div>
               <div className="bg-gray-50 p-4 rounded-lg">
                 <div className="text-sm text-gray-600">逻辑思维</div>
                 <div className={`text-2xl font-bold ${getScoreColor(session.score.logical_thinking)}`}>
-                  {session.score.logical_thinking}/10
+                  {session.score.logical_thinking ?? '-'}/10
                 </div>
               </div>
             </div>
@@ -295,7 +319,7 @@ export default function WorkplacePage() {
             <div className="bg-gray-50 p-4 rounded-lg mb-6">
               <div className="text-sm text-gray-600">总体评分</div>
               <div className={`text-3xl font-bold ${getScoreColor(session.score.overall)}`}>
-                {session.score.overall}/10
+                {session.score.overall ?? '-'}/10
               </div>
             </div>
 
@@ -1,5 +1,46 @@
 const API_BASE = '/api';
 
+// Jobs API
+// Waits for a background job over SSE and resolves with its result
+export async function waitForJob(token: string, jobId: string) {
+  const response = await fetch(`${API_BASE}/jobs/${jobId}/events`, {
+    headers: {
+      'Authorization': `Bearer ${token}`,
+    },
+  });
+  if (!response.ok || !response.body) {
+    throw new Error('Failed to follow job');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      const data = frame.split('\n').find((line) => line.startsWith('data: '));
+      if (!data) continue;
+
+      const event = JSON.parse(data.slice(6));
+      if (event.status === 'succeeded') {
+        reader.cancel();
+        return event.result;
+      }
+      if (event.status === 'failed') {
+        reader.cancel();
+        throw new Error(event.error || 'Job failed');
+      }
+    }
+  }
+  throw new Error('Job stream closed before completion');
+}
+
 // Auth API
 export async function register(name: string, email: string, password: string) {
   const response = await fetch(`${API_BASE}/auth/register`, {
@@ -85,6 +126,38 @@ export async function getSessionDetail(token: string, sessionId: string) {
   return response.json();
 }
 
+export async function getSessionHeader(token: string, sessionId: string) {
+  const response = await fetch(`${API_BASE}/history/${sessionId}/header`, {
+    headers: {
+      'Authorization': `Bearer ${token}`,
+    },
+  });
+  if (!response.ok) {
+    throw new Error('Failed to fetch session header');
+  }
+  return response.json();
+}
+
+export async function getSessionMessages(
+  token: string,
+  sessionId: string,
+  limit: number = 20,
+  beforeSeq?: number,
+) {
+  const params = new URLSearchParams({ limit: limit.toString() });
+  if (beforeSeq !== undefined) params.append('before_seq', beforeSeq.toString());
+
+  const response = await fetch(`${API_BASE}/history/${sessionId}/messages?${params}`, {
+    headers: {
+      'Authorization': `Bearer ${token}`,
+    },
+  });
+  if (!response.ok) {
+    throw new Error('Failed to fetch session messages');
+  }
+  return response.json();
+}
+
 export async function deleteSession(token: string, sessionId: string) {
   const response = await fetch(`${API_BASE}/history/${sessionId}`, {
     method: 'DELETE',
@@ -112,7 +185,7 @@ export async function startAlgorithmInterview(difficulty: 'easy' | 'medium' | 'h
 }
 
 export function createAlgorithmWebSocket(sessionId: string): WebSocket {
-  return new WebSocket(`ws://localhost:8000${API_BASE}/algorithm/${sessionId}/ws`);
+  return new WebSocket(`ws://localhost:8000/ws/algorithm/${sessionId}`);
 }
 
 export async function endAlgorithmInterview(sessionId: string) {
@@ -142,7 +215,8 @@ export async function startAlgorithmInterviewV2(token: string, difficulty: 'easy
 }
 
 export function createAlgorithmWebSocketV2(sessionId: string, token: string): WebSocket {
-  return new WebSocket(`ws://localhost:8000${API_BASE}/algorithm/v2/${sessionId}/ws?token=${token}`);
+  // Served by the algorithm router next to /answer; authenticated by the token parameter
+  return new WebSocket(`ws://localhost:8000${API_BASE}/algorithm/${sessionId}/ws?token=${token}`);
 }
 
 export async function endAlgorithmInterviewV2(token: string, sessionId: string) {
@@ -155,7 +229,9 @@ export async function endAlgorithmInterviewV2(token: string, sessionId: string)
   if (!response.ok) {
     throw new Error('Failed to end interview');
   }
-  return response.json();
+  // The report is generated in the background; wait for it
+  const { job_id } = await response.json();
+  return waitForJob(token, job_id);
 }
 
 // System Design APIs (v1 - no auth)
@@ -223,7 +299,9 @@ export async function endSystemDesignInterviewV2(token: string, sessionId: strin
   if (!response.ok) {
     throw new Error('Failed to end interview');
   }
-  return response.json();
+  // The report is generated in the background; wait for it
+  const { job_id } = await response.json();
+  return waitForJob(token, job_id);
 }
 
 // Stats API
@@ -293,7 +371,9 @@ export async function endWorkplaceInterview(token: string, sessionId: string) {
   if (!response.ok) {
     throw new Error('Failed to end interview');
   }
-  return response.json();
+  // The report is generated in the background; wait for it
+  const { job_id } = await response.json();
+  return waitForJob(token, job_id);
 }
 
 // Resume APIs
@@ -394,6 +474,78 @@ export async function compareResumeJD(token: string) {
   return response.json();
 }
 
+export async function analyzeJDBatch(
+  token: string,
+  items: { jd_text: string; company?: string; position?: string; url?: string }[],
+  onResult: (result: any) => void,
+) {
+  const response = await fetch(`${API_BASE}/jd/batch`, {
+    method: 'POST',
+    headers: {
+      'Authorization': `Bearer ${token}`,
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ items }),
+  });
+  if (!response.ok || !response.body) {
+    throw new Error('Batch analysis failed');
+  }
+
+  // NDJSON：每完成一个JD返回一行
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop() || '';
+    for (const line of lines) {
+      if (line.trim()) onResult(JSON.parse(line));
+    }
+  }
+}
+
+export async function getJDLibrary(token: string) {
+  const response = await fetch(`${API_BASE}/jd/library`, {
+    headers: {
+      'Authorization': `Bearer ${token}`,
+    },
+  });
+  if (!response.ok) {
+    throw new Error('Failed to fetch JD library');
+  }
+  return response.json();
+}
+
+export async function deleteLibraryJD(token: string, jdId: string) {
+  const response = await fetch(`${API_BASE}/jd/library/${jdId}`, {
+    method: 'DELETE',
+    headers: {
+      'Authorization': `Bearer ${token}`,
+    },
+  });
+  if (!response.ok) {
+    throw new Error('Failed to delete JD');
+  }
+  return response.json();
+}
+
+export async function compareResumeJDLibrary(token: string) {
+  const response = await fetch(`${API_BASE}/jd/library/compare`, {
+    method: 'POST',
+    headers: {
+      'Authorization': `Bearer ${token}`,
+    },
+  });
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Comparison failed');
+  }
+  return response.json();
+}
+
 export async function deleteJD(token: string) {
   const response = await fetch(`${API_BASE}/jd`, {
     method: 'DELETE',
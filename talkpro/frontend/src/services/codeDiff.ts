@@ -0,0 +1,112 @@
+// Line-based unified diff, used to send code edits instead of the full code.
+// The backend applies it strictly (app/core/code_diff.py) and answers with a
+// code_conflict frame when it does not apply, so the full code is resent.
+
+const CONTEXT = 3;
+// Above this many cells the LCS table is too large; the caller sends the full code instead
+const MAX_LCS_CELLS = 4_000_000;
+const NO_NEWLINE = '\\ No newline at end of file';
+
+type Op = { tag: ' ' | '-' | '+'; line: string };
+
+function splitLines(text: string): string[] {
+  return text.match(/[^\n]*\n|[^\n]+$/g) ?? [];
+}
+
+function diffLines(a: string[], b: string[]): Op[] | null {
+  // Only the middle part between the common prefix and suffix needs the LCS table
+  let start = 0;
+  while (start < a.length && start < b.length && a[start] === b[start]) start++;
+  let endA = a.length;
+  let endB = b.length;
+  while (endA > start && endB > start && a[endA - 1] === b[endB - 1]) {
+    endA--;
+    endB--;
+  }
+
+  const n = endA - start;
+  const m = endB - start;
+  if (n * m > MAX_LCS_CELLS) return null;
+
+  // lcs[i][j]: LCS length of a[start+i..endA) and b[start+j..endB)
+  const lcs = Array.from({ length: n + 1 }, () => new Uint32Array(m + 1));
+  for (let i = n - 1; i >= 0; i--) {
+    for (let j = m - 1; j >= 0; j--) {
+      lcs[i][j] = a[start + i] === b[start + j]
+        ? lcs[i + 1][j + 1] + 1
+        : Math.max(lcs[i + 1][j], lcs[i][j + 1]);
+    }
+  }
+
+  const ops: Op[] = a.slice(0, start).map((line) => ({ tag: ' ', line }));
+  let i = 0;
+  let j = 0;
+  while (i < n || j < m) {
+    if (i < n && j < m && a[start + i] === b[start + j]) {
+      ops.push({ tag: ' ', line: a[start + i] });
+      i++;
+      j++;
+    } else if (j < m && (i === n || lcs[i][j + 1] >= lcs[i + 1][j])) {
+      ops.push({ tag: '+', line: b[start + j] });
+      j++;
+    } else {
+      ops.push({ tag: '-', line: a[start + i] });
+      i++;
+    }
+  }
+  for (let k = endA; k < a.length; k++) ops.push({ tag: ' ', line: a[k] });
+  return ops;
+}
+
+function formatRange(start: number, count: number): string {
+  // An empty side points at the line before it
+  const first = count === 0 ? start - 1 : start;
+  return count === 1 ? `${first}` : `${first},${count}`;
+}
+
+/**
+ * Unified diff turning oldText into newText ('' when they are equal), or null
+ * when the change is too large to diff; send the full code in that case.
+ */
+export function unifiedDiff(oldText: string, newText: string): string | null {
+  const ops = diffLines(splitLines(oldText), splitLines(newText));
+  if (ops === null) return null;
+
+  const changed = ops.flatMap((op, k) => (op.tag === ' ' ? [] : [k]));
+  if (changed.length === 0) return '';
+
+  // Group changes whose context windows overlap into hunks
+  const hunks: [number, number][] = [];
+  for (const k of changed) {
+    const from = Math.max(0, k - CONTEXT);
+    const to = Math.min(ops.length, k + CONTEXT + 1);
+    const last = hunks[hunks.length - 1];
+    if (last && from <= last[1]) last[1] = to;
+    else hunks.push([from, to]);
+  }
+
+  const out = ['--- a\n', '+++ b\n'];
+  let oldLine = 1;
+  let newLine = 1;
+  let k = 0;
+  for (const [from, to] of hunks) {
+    for (; k < from; k++) {
+      oldLine++;
+      newLine++;
+    }
+    const body: string[] = [];
+    let oldCount = 0;
+    let newCount = 0;
+    for (; k < to; k++) {
+      const op = ops[k];
+      if (op.tag !== '+') oldCount++;
+      if (op.tag !== '-') newCount++;
+      body.push(op.tag + op.line);
+      if (!op.line.endsWith('\n')) body.push('\n' + NO_NEWLINE + '\n');
+    }
+    out.push(`@@ -${formatRange(oldLine, oldCount)} +${formatRange(newLine, newCount)} @@\n`, ...body);
+    oldLine += oldCount;
+    newLine += newCount;
+  }
+  return out.join('');
+}